@@ -0,0 +1,116 @@
+# Aynı worker'da eşzamanlı sohbetlerin birbirini bekletmediğini (asenkron grafik düğümleri) doğrular.
+# Çalıştırma (depo kök dizininden): python -m ai-service.benchmarks.benchmark_concurrent_chats
+#   --chats 10            Aynı anda başlatılan sohbet sayısı
+#   --llm-ms 500          Bir model çağrısının gecikmesi
+#   --tool-ms 200         Bir araç çağrısının gecikmesi
+#   --tolerance 1.5       N sohbetin toplam süresi, tek sohbetin süresinin en fazla bu katı olabilir
+#
+# Gemini ve araçlar (veritabanı, belge araması) asyncio.sleep ile benzetilir; ağ veya veritabanı gerekmez ve
+# sonuçlar tekrarlanabilir. Her sohbet: model -> araç -> model (iki model çağrısı, bir araç çağrısı).
+# Düğümlerden biri event loop'u bloklasaydı N sohbet sırayla çalışır ve toplam süre N katına çıkardı.
+# Not: grafiğin kendi CPU maliyeti (sohbet başına birkaç ms - on ms) eşzamanlı sohbetlerde üst üste eklenir;
+# çok büyük --chats değerlerinde gecikmeler de büyütülmeli, aksi halde ölçülen şey bekleme değil CPU süresi olur.
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any
+
+# Benzetim için: import sırasında model oluşturulabilsin, önbellek diske yazmasın, anlamsal önbellek API'ye gitmesin.
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ["FAQ_CACHE_BACKEND"] = "memory"
+os.environ["SEMANTIC_CACHE_ENABLED"] = "false"
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ..services import langgraph_agent as agent
+from ..services.langgraph_agent.nodes import route_intent, tool_executor
+
+
+class SimulatedChatModel(BaseChatModel):
+    """Son kullanıcı mesajından sonra araç cevabı yoksa bir araç çağrısı, varsa nihai cevap döndürür."""
+    delay: float
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "simulated"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _respond(self, messages) -> AIMessage:
+        self.calls += 1
+        turn_start = max(index for index, message in enumerate(messages) if isinstance(message, HumanMessage))
+        question = messages[turn_start]
+        if any(isinstance(message, ToolMessage) for message in messages[turn_start:]):
+            return AIMessage(content=f"Cevap: {question.content}")
+        return AIMessage(content="", tool_calls=[{"name": "search_documents_tool", "args": {"query": question.content},
+                                                  "id": f"call_{self.calls}"}])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+
+def simulated_tool_call(delay: float):
+    async def run_tool_call(tool_call: dict, user_id: str, semaphore: asyncio.Semaphore, state) -> ToolMessage:
+        async with semaphore:
+            await asyncio.sleep(delay)
+        return ToolMessage(content="Belge parçası", name=tool_call["name"], tool_call_id=tool_call["id"])
+    return run_tool_call
+
+
+async def chat(index: int) -> float:
+    # Her sohbetin sorusu farklıdır; böylece önbellek veya single-flight sonuçları birleştirmez.
+    state = agent.GraphState(messages=[HumanMessage(content=f"Eşzamanlılık kıyaslaması soru {index}")],
+                             user_id=f"benchmark-{index}")
+    started_at = time.perf_counter()
+    answer = await agent.run_langgraph_chat_coalesced(state)
+    assert answer.startswith("Cevap:"), answer
+    return time.perf_counter() - started_at
+
+
+async def run(chats: int, first_index: int = 0) -> tuple[float, list[float]]:
+    started_at = time.perf_counter()
+    latencies = await asyncio.gather(*(chat(index) for index in range(first_index, first_index + chats)))
+    return time.perf_counter() - started_at, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eşzamanlı sohbetlerin toplam süresini tek sohbetle karşılaştırır")
+    parser.add_argument("--chats", type=int, default=10)
+    parser.add_argument("--llm-ms", type=float, default=500)
+    parser.add_argument("--tool-ms", type=float, default=200)
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args()
+
+    agent.model_with_tools = SimulatedChatModel(delay=args.llm_ms / 1000)
+    tool_executor._run_tool_call = simulated_tool_call(args.tool_ms / 1000)
+    route_intent.INTENT_ROUTER_ENABLED = False
+
+    single, _ = asyncio.run(run(1))
+    total, latencies = asyncio.run(run(args.chats, first_index=1))
+    expected = (2 * args.llm_ms + args.tool_ms) / 1000
+
+    print(f"Beklenen tek sohbet süresi (2 model + 1 araç çağrısı): {expected * 1000:.0f} ms")
+    print(f"1 sohbet                 : {single * 1000:.0f} ms")
+    print(f"{args.chats} eşzamanlı sohbet (toplam): {total * 1000:.0f} ms  "
+          f"(p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, en yavaş {latencies[-1] * 1000:.0f} ms)")
+    print(f"Sırayla çalışsaydı        : ~{single * args.chats * 1000:.0f} ms")
+
+    assert total <= single * args.tolerance, (
+        f"{args.chats} eşzamanlı sohbet {total:.2f} sn sürdü; tek sohbet {single:.2f} sn "
+        f"(sınır {args.tolerance}x). Bir düğüm event loop'u blokluyor olabilir.")
+    print(f"✅ {args.chats} eşzamanlı sohbet, tek bir sohbetin {total / single:.2f} katı sürede tamamlandı.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Soru embedding'lerinin tek tek (her arama kendi API çağrısı) ve toplu (embedding_batcher.py) gönderilmesini
+# 1, 10 ve 100 eşzamanlı belge aramasında verim (soru/sn) ve gecikme (p50/p99) açısından karşılaştırır.
+# Çalıştırma (depo kök dizininden): python -m ai-service.benchmarks.benchmark_embedding_batcher
+#   --latency-ms 80       Bir API çağrısının sabit gecikmesi
+#   --per-text-ms 0.5     Toplu çağrıda metin başına eklenen gecikme
+#   --api-concurrency 8   Aynı anda açık olabilecek API çağrısı sayısı (bağlantı havuzu / kota sınırı)
+#   --window-ms 5 --max-batch 32
+#
+# Ağ gecikmesi, gerçek API'yi çağırmadan bu parametrelerle benzetilir; böylece sonuçlar tekrarlanabilir ve kota harcamaz.
+# Gerçek değerler GET /ai/chat-metrics yanıtındaki embedding_request_latency ölçümünden alınabilir.
+
+import argparse
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.embeddings import Embeddings
+
+from ..services.langgraph_agent.embedding_batcher import BatchedQueryEmbeddings
+from ..services.langgraph_agent.metrics import _percentile
+
+CONCURRENCY_LEVELS = (1, 10, 100)
+
+
+class SimulatedEmbeddingAPI(Embeddings):
+    """Her çağrısı sabit + metin başına gecikme kadar süren ve eşzamanlı çağrı sayısı sınırlı bir embedding API'si."""
+    def __init__(self, latency: float, per_text: float, concurrency: int, dimensions: int = 8):
+        self.latency = latency
+        self.per_text = per_text
+        self.dimensions = dimensions
+        self._slots = threading.Semaphore(concurrency)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _vector(self, text: str) -> list[float]:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=self.dimensions).digest()
+        return [byte / 255 for byte in digest]
+
+    def _call(self, texts: list[str]) -> list[list[float]]:
+        with self._slots:
+            time.sleep(self.latency + self.per_text * len(texts))
+        with self._lock:
+            self.calls += 1
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._call([text])[0]
+
+    def embed_documents(self, texts: list[str], task_type: str = None) -> list[list[float]]:
+        return self._call(texts)
+
+
+def run(embeddings, concurrency: int, queries_per_search: int) -> dict:
+    """'concurrency' adet arama, her biri art arda 'queries_per_search' soru embed eder (kapalı döngü yük)."""
+    latencies = []
+    lock = threading.Lock()
+
+    def search(worker: int):
+        for i in range(queries_per_search):
+            started_at = time.perf_counter()
+            embeddings.embed_query(f"soru {worker}-{i}")
+            elapsed = time.perf_counter() - started_at
+            with lock:
+                latencies.append(elapsed)
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(search, range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soru embedding micro-batching kıyaslaması")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--per-text-ms", type=float, default=0.5)
+    parser.add_argument("--api-concurrency", type=int, default=8)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=10, help="Her eşzamanlı aramanın art arda embed ettiği soru sayısı")
+    args = parser.parse_args()
+
+    print(f"API: {args.latency_ms}ms + {args.per_text_ms}ms/metin, en fazla {args.api_concurrency} eşzamanlı çağrı; "
+          f"pencere {args.window_ms}ms, en fazla {args.max_batch} soru/çağrı\n")
+    print(f"{'Eşzamanlı':>9} | {'Mod':<7} | {'Soru/sn':>9} | {'p50 (ms)':>9} | {'p99 (ms)':>9} | {'API çağrısı':>11}")
+    print("-" * 70)
+    for concurrency in CONCURRENCY_LEVELS:
+        for mode in ("tek tek", "toplu"):
+            api = SimulatedEmbeddingAPI(args.latency_ms / 1000, args.per_text_ms / 1000, args.api_concurrency)
+            embeddings = api if mode == "tek tek" else BatchedQueryEmbeddings(api, args.window_ms, args.max_batch)
+            result = run(embeddings, concurrency, args.queries)
+            print(f"{concurrency:>9} | {mode:<7} | {result['throughput']:>9.1f} | {result['p50_ms']:>9.1f} | "
+                  f"{result['p99_ms']:>9.1f} | {api.calls:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# SSS önbelleğinin (PersistentCacheManager) depolama katmanlarını set/get hızı ve açılış süresi açısından karşılaştırır.
+# Çalıştırma (depo kök dizininden): python -m ai-service.benchmarks.benchmark_faq_cache
+#   --sizes 100,10000,1000000   Denenecek kayıt sayıları
+#   --backends sqlite,log,json  Denenecek depolama katmanları
+#   --json-max 2000             Eski JSON katmanı her yazmada tüm dosyayı yazdığı (O(n^2)) için bu boyuttan büyükleri atlanır
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from ..services.langgraph_agent.nodes.persistent_cache import PersistentCacheManager
+
+FILE_NAMES = {"sqlite": "faq_cache.db", "log": "faq_cache.log", "json": "faq_cache.json"}
+
+# Gerçekçi bir önbellek kaydı boyutu (tipik bir SSS cevabı)
+SAMPLE_RESPONSE = "İade süresi, ürünün teslim alındığı tarihten itibaren 14 gündür. " * 4
+
+
+def run_case(backend: str, size: int, directory: str) -> dict:
+    path = os.path.join(directory, f"{size}_{FILE_NAMES[backend]}")
+    keys = [f"{i:032x}" for i in range(size)]
+    lookups = random.choices(keys, k=min(size, 100_000))
+
+    manager = PersistentCacheManager(cache_file=path, ttl=10**9, max_size=size, backend=backend)
+    started_at = time.perf_counter()
+    for key in keys:
+        manager.set(key, SAMPLE_RESPONSE)
+    set_seconds = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    for key in lookups:
+        manager.get(key)
+    get_seconds = time.perf_counter() - started_at
+    manager.close()
+
+    started_at = time.perf_counter()
+    reopened = PersistentCacheManager(cache_file=path, ttl=10**9, max_size=size, backend=backend)
+    load_seconds = time.perf_counter() - started_at
+    assert len(reopened) == size, f"{backend}: {len(reopened)} != {size}"
+    reopened.close()
+
+    return {
+        "set_ops": size / set_seconds,
+        "get_ops": len(lookups) / get_seconds,
+        "load_ms": load_seconds * 1000,
+        "disk_mb": os.path.getsize(path) / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSS önbelleği depolama katmanı kıyaslaması")
+    parser.add_argument("--sizes", default="100,10000,1000000")
+    parser.add_argument("--backends", default="sqlite,log,json")
+    parser.add_argument("--json-max", type=int, default=2000)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    backends = args.backends.split(",")
+
+    print("💾 SSS Önbelleği Depolama Kıyaslaması")
+    print("=" * 84)
+    print(f"{'katman':8} {'kayıt':>9} {'set/sn':>12} {'get/sn':>14} {'açılış (ms)':>13} {'disk (MB)':>11}")
+    print("-" * 84)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            for backend in backends:
+                if backend == "json" and size > args.json_max:
+                    print(f"{backend:8} {size:>9} {'atlandı (O(n) yazma)':>40}")
+                    continue
+                result = run_case(backend, size, directory)
+                print(f"{backend:8} {size:>9} {result['set_ops']:>12,.0f} {result['get_ops']:>14,.0f} "
+                      f"{result['load_ms']:>13,.1f} {result['disk_mb']:>11,.2f}")
+    print("=" * 84)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Önbellek anahtarı üretimini (eski: lower + MD5, yeni: fingerprint.py) hız ve isabet oranı açısından karşılaştırır.
+# Çalıştırma (depo kök dizininden): python -m ai-service.benchmarks.benchmark_query_fingerprint
+#   --log sorgular.txt   Her satırda bir kullanıcı sorusu olan sorgu kaydı (verilmezse yazım varyasyonlarından
+#                        oluşan sentetik bir kayıt üretilir)
+#
+# İsabet oranı, sınırsız bir önbellekte kaydın baştan sona tekrar oynatılmasıyla ölçülür:
+# bir anahtar ilk görüldüğünde ıska, sonra her görülüşünde isabet sayılır.
+
+import argparse
+import hashlib
+import random
+import re
+import time
+
+from ..services.langgraph_agent.fingerprint import canonical_query, fingerprint, query_fingerprint, turkish_casefold
+
+# Sentetik kayıt için temel sorular ve her birinin kullanıcılar tarafından yazılmış farklı biçimleri
+QUESTION_VARIANTS = [
+    ["İade süresi ne kadardır?", "iade süresi ne kadardır", "İADE SÜRESİ NE KADARDIR", "iade suresi ne kadardir",
+     "Acaba iade süresi ne kadardır?", "iade süresi ne kadardır lütfen", "ne kadardır iade süresi"],
+    ["Kargo ücreti kimin sorumluluğunda?", "KARGO ÜCRETİ KİMİN SORUMLULUĞUNDA", "kargo ucreti kimin sorumlulugunda",
+     "kargo ücreti kimin sorumluluğunda acaba"],
+    ["Siparişi iptal edebilir miyim?", "siparisi iptal edebilir miyim", "SİPARİŞİ İPTAL EDEBİLİR MİYİM?",
+     "siparişi iptal edebilir miyim acaba", "İptal edebilir miyim siparişi?"],
+    ["Hangi ödeme yöntemleri kabul ediliyor?", "hangi odeme yontemleri kabul ediliyor", "Hangi ödeme yöntemleri kabul ediliyor acaba?",
+     "HANGİ ÖDEME YÖNTEMLERİ KABUL EDİLİYOR"],
+    ["Garanti şartları nasıl?", "garanti sartlari nasil", "GARANTİ ŞARTLARI NASIL", "Peki garanti şartları nasıl?",
+     "nasıl garanti şartları"],
+    ["Hediye paketi seçeneği var mı?", "hediye paketi secenegi var mi", "Hediye paketi seçeneği var mı acaba?",
+     "HEDİYE PAKETİ SEÇENEĞİ VAR MI"],
+    ["Ürün hasarlı geldi, ne yapmalıyım?", "urun hasarli geldi ne yapmaliyim", "ÜRÜN HASARLI GELDİ NE YAPMALIYIM",
+     "Ürün hasarlı geldi ne yapmalıyım lütfen"],
+    ["Siparişim ne zaman kargoya verilir?", "siparisim ne zaman kargoya verilir", "Siparişim ne zaman kargoya verilir acaba?"],
+]
+
+
+def legacy_query_hash(query: str) -> str:
+    """fingerprint.py öncesindeki anahtar: str.lower(), noktalama temizliği ve MD5."""
+    normalized = re.sub(r'[^\w\s]', '', query.lower())
+    return hashlib.md5(" ".join(normalized.split()).encode('utf-8')).hexdigest()
+
+
+def synthetic_log(length: int, seed: int = 42) -> list[str]:
+    """Temel soruları Zipf dağılımıyla, her seferinde rastgele bir yazım biçimiyle seçer."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(QUESTION_VARIANTS))]
+    return [rng.choice(variants) for variants in rng.choices(QUESTION_VARIANTS, weights=weights, k=length)]
+
+
+def replay_hit_rate(queries: list[str], key_function) -> tuple[float, int]:
+    seen = set()
+    hits = 0
+    for query in queries:
+        key = key_function(query)
+        if key in seen:
+            hits += 1
+        else:
+            seen.add(key)
+    return hits / max(1, len(queries)), len(seen)
+
+
+def throughput(queries: list[str], key_function, samples: int = 200_000) -> float:
+    """Kayıt, ölçüm en az 'samples' anahtar üretecek kadar tekrarlanarak hız ölçülür."""
+    repeated = queries * max(1, samples // max(1, len(queries)))
+    started_at = time.perf_counter()
+    for query in repeated:
+        key_function(query)
+    return len(repeated) / (time.perf_counter() - started_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Önbellek anahtarı (parmak izi) kıyaslaması")
+    parser.add_argument("--log", help="Her satırda bir soru olan sorgu kaydı dosyası")
+    parser.add_argument("--length", type=int, default=1000, help="Sentetik kayıt uzunluğu")
+    args = parser.parse_args()
+
+    if args.log:
+        with open(args.log, "r", encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+        source = args.log
+    else:
+        queries = synthetic_log(args.length)
+        source = f"sentetik ({len(queries)} sorgu)"
+
+    print(f"🔑 Sorgu Parmak İzi Kıyaslaması — kayıt: {source}, hash: blake2b (128 bit)")
+    print("=" * 78)
+    print(f"{'anahtar':42} {'anahtar/sn':>12} {'isabet oranı':>13} {'farklı anahtar':>15}")
+    print("-" * 78)
+    cases = [
+        ("eski: lower + MD5", legacy_query_hash),
+        ("yeni: kanonik biçim + parmak izi", query_fingerprint),
+    ]
+    for name, key_function in cases:
+        hit_rate, unique_keys = replay_hit_rate(queries, key_function)
+        print(f"{name:42} {throughput(queries, key_function):>12,.0f} {hit_rate:>13.2%} {unique_keys:>15}")
+    print("-" * 78)
+
+    # Sadece hash fonksiyonlarının hızı (aynı kanonik metinler üzerinde)
+    canonical_texts = [canonical_query(query) for query in queries]
+    print(f"{'sadece hash: md5':42} {throughput(canonical_texts, lambda text: hashlib.md5(text.encode('utf-8')).hexdigest()):>12,.0f}")
+    print(f"{'sadece hash: fingerprint() (blake2b)':42} {throughput(canonical_texts, fingerprint):>12,.0f}")
+    print(f"{'sadece Türkçe küçük harf':42} {throughput(queries, turkish_casefold):>12,.0f}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Niyet yönlendiricisinin (route_intent) doğruluk ve gecikme raporunu sabit bir test kümesi üzerinden üretir.
+# Çalıştırma (depo kök dizininden): python -m ai-service.benchmarks.evaluate_intent_router
+
+import time
+
+from ..services.langgraph_agent.nodes.route_intent import classify_intent
+
+# Veritabanına bağlanmadan çalışabilmek için sabit bir ürün kataloğu
+PRODUCT_NAMES = [
+    "Apple iPhone 15 Pro",
+    "Apple iPhone 14",
+    "MacBook Air M2",
+    "Sony Playstation 5",
+    "Samsung Galaxy S24",
+    "Logitech MX Master 3S Mouse",
+    "JBL Tune 510BT Kulaklık",
+]
+
+# (mesaj, beklenen araç). Beklenen araç None ise mesaj belirsizdir ve modele bırakılmalıdır.
+TEST_SET = [
+    ("İade süresi ne kadardır?", "search_documents_tool"),
+    ("Kargo ne zaman gelir?", "search_documents_tool"),
+    ("Hangi ödeme yöntemlerini kabul ediyorsunuz?", "search_documents_tool"),
+    ("Garanti şartları nasıl?", "search_documents_tool"),
+    ("Siparişimi iptal edebilir miyim?", "search_documents_tool"),
+    ("Kişisel verilerim nasıl korunuyor?", "search_documents_tool"),
+    ("Kampanya veya indirim kuponu var mı?", "search_documents_tool"),
+    ("Ürün hasarlı geldi ne yapmalıyım", "search_documents_tool"),
+    ("Hediye paketi seçeneği var mı?", "search_documents_tool"),
+    ("Üyelik gerekli mi?", "search_documents_tool"),
+    ("iPhone 15 Pro fiyatı ne kadar?", "get_product_details_tool"),
+    ("MacBook Air M2 stokta var mı?", "get_product_details_tool"),
+    ("Playstation 5 kaç para", "get_product_details_tool"),
+    ("Galaxy S24 hakkında bilgi verir misin", "get_product_details_tool"),
+    ("IPHONE 14 stok durumu", "get_product_details_tool"),
+    ("Logitech MX Master 3S Mouse var mı?", "get_product_details_tool"),
+    ("JBL Tune kulaklık kaç para", "get_product_details_tool"),
+    ("123 numaralı siparişimin ödeme tutarı nedir?", "get_payment_amount_tool"),
+    ("Sipariş no: 4521 ne kadar ödedim", "get_payment_amount_tool"),
+    ("#998 siparişin faturası ne kadar", "get_payment_amount_tool"),
+    ("55 nolu siparişteki iPhone 14 nerede?", "get_item_status_tool"),
+    ("Sipariş numaram 77, içindeki MacBook Air M2 kargoda mı durumu ne", "get_item_status_tool"),
+    ("88 numaralı siparişteki Playstation 5 iade durumu", "get_refund_status_tool"),
+    ("Sipariş no 301 JBL Tune kulaklık iadem ne oldu", "get_refund_status_tool"),
+    ("Merhaba", None),
+    ("Nasılsın?", None),
+    ("iPhone iade edilebilir mi?", None),
+    ("123 numaralı siparişim", None),
+    ("55 nolu siparişimin iadesi", None),
+    ("En iyi telefon hangisi?", None),
+    ("Teşekkürler, çok yardımcı oldun", None),
+    # Karşı örnekler: belirteçsiz sayılar sipariş numarası, ürün adının tek bir kelimesi de ürün sayılmamalı.
+    ("Siparişimi 14 gün içinde iade edebilir miyim?", "search_documents_tool"),
+    ("Siparişim 3 gündür gelmedi", None),
+    ("Apple Pay ile ödeme yapabilir miyim?", None),
+    ("Sony marka ürünleriniz var mı?", None),
+    ("iPhone fiyatı ne kadar?", None),
+    ("Bana bir mouse önerir misin, Logitech olsun", None),
+]
+
+
+def main():
+    print("🧭 Niyet Yönlendirici Değerlendirmesi")
+    print("=" * 60)
+
+    correct = routed = routed_correct = 0
+    latencies = []
+    for text, expected in TEST_SET:
+        started_at = time.perf_counter()
+        decision = classify_intent(text, PRODUCT_NAMES)
+        latencies.append(time.perf_counter() - started_at)
+
+        predicted = decision[0] if decision else None
+        is_correct = predicted == expected
+        correct += is_correct
+        if predicted is not None:
+            routed += 1
+            routed_correct += is_correct
+
+        mark = "✅" if is_correct else "❌"
+        print(f"{mark} {text!r:60} beklenen={expected} tahmin={predicted}")
+
+    latencies.sort()
+    total = len(TEST_SET)
+    print("=" * 60)
+    print(f"📊 Doğruluk (tüm küme)        : {correct}/{total} = {correct / total:.1%}")
+    print(f"📊 Yerel yönlendirme oranı    : {routed}/{total} = {routed / total:.1%} (bu oranda ilk Gemini çağrısı atlanır)")
+    print(f"📊 Yönlendirilenlerde isabet  : {routed_correct}/{routed} = {routed_correct / max(routed, 1):.1%}")
+    print(f"⏱️ Gecikme p50 / p99 / max    : {latencies[total // 2] * 1e6:.1f} µs / "
+          f"{latencies[int(total * 0.99) - 1] * 1e6:.1f} µs / {latencies[-1] * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
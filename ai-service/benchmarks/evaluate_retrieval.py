@@ -0,0 +1,99 @@
+# Belge aramasının modlarını (lexical / vector / hybrid, bkz: retrieval.py) isabet ve gecikme açısından karşılaştırır.
+# Çalıştırma (depo kök dizininden): python -m ai-service.benchmarks.evaluate_retrieval
+#
+# Etiketli küme SSS belgesinden üretilir: her SSS sorusu ve faq_paraphrases.json'daki farklı ifade biçimleri için
+# doğru cevap, sorunun geçtiği belge parçasıdır. Raporlanan değerler:
+#   hit@1, hit@3  Doğru parçanın ilk 1 / ilk 3 sonuçta olduğu soruların oranı (modele ilk 3 parça verilir)
+#   MRR           Doğru parçanın sırasının tersinin ortalaması (ilk 10 sonuç)
+#   p50 / p99     Arama gecikmesi
+# vector ve hybrid modları embedding API'sine gider (GEMINI_API_KEY gerekir); API'ye ulaşılamazsa sadece
+# sözcüksel modlar raporlanır. Soğuk gecikme için embedding önbelleğini kapatın: EMBEDDING_CACHE_ENABLED=false
+
+import json
+import re
+import time
+
+from ..services.langgraph_agent.lexical_index import BM25Index, get_lexical_index
+from ..services.langgraph_agent.fingerprint import STOPWORDS, fold_diacritics, turkish_casefold
+from ..services.langgraph_agent.metrics import _percentile
+from ..services.langgraph_agent.prewarm import PARAPHRASES_FILE, faq_sources, parse_faq
+from ..services.langgraph_agent.retrieval import _chunk_id, retrieve
+from ..services.langgraph_agent.vector_store import document_chunks, get_vector_store
+
+RANKING_DEPTH = 10
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def labeled_queries(chunks: list) -> list[tuple[str, str, set[str]]]:
+    """(küme adı, soru, doğru parça kimlikleri) listesi döndürür."""
+    paraphrases = {}
+    if PARAPHRASES_FILE.exists():
+        with open(PARAPHRASES_FILE, "r", encoding="utf-8") as f:
+            paraphrases = json.load(f)
+    queries = []
+    for question, _ in parse_faq():
+        relevant = {tag for tag in faq_sources(question, chunks) if tag.startswith("chunk:")}
+        if not relevant:
+            continue
+        queries.append(("SSS sorusu", question, relevant))
+        queries.extend(("farklı ifade", variant, relevant) for variant in paraphrases.get(question, []))
+    return queries
+
+
+def unstemmed_tokenize(text: str) -> list[str]:
+    """Kıyaslama için kök bulmasız sözcük ayırma (sadece harf dönüşümü, aksan katlama ve dolgu kelimeleri)."""
+    return [token for token in _WORD_PATTERN.findall(fold_diacritics(turkish_casefold(text))) if token not in STOPWORDS]
+
+
+def evaluate(search, queries: list) -> dict:
+    results = {}
+    for label, query, relevant in queries:
+        started_at = time.perf_counter()
+        ranking = [_chunk_id(document) for document in search(query)]
+        elapsed = time.perf_counter() - started_at
+        rank = next((position for position, chunk_id in enumerate(ranking, start=1) if chunk_id in relevant), None)
+        for group in (label, "toplam"):
+            result = results.setdefault(group, {"count": 0, "hit@1": 0, "hit@3": 0, "mrr": 0.0, "latencies": []})
+            result["count"] += 1
+            result["hit@1"] += rank == 1
+            result["hit@3"] += rank is not None and rank <= 3
+            result["mrr"] += 1 / rank if rank else 0.0
+            result["latencies"].append(elapsed)
+    return results
+
+
+def main():
+    chunks = list(document_chunks().values())
+    queries = labeled_queries(chunks)
+    print(f"{len(chunks)} belge parçası, {len(queries)} etiketli soru\n")
+
+    plain_index = BM25Index(chunks, tokenizer=unstemmed_tokenize)
+    get_lexical_index()
+    modes = {
+        "lexical (kök bulmasız)": lambda query: [document for document, _ in plain_index.search(query, RANKING_DEPTH)],
+        "lexical": lambda query: [document for document, _ in get_lexical_index().search(query, RANKING_DEPTH)],
+    }
+    if get_vector_store(wait=True) is not None:
+        modes["vector"] = lambda query: retrieve(query, mode="vector", k=RANKING_DEPTH)
+        modes["hybrid"] = lambda query: retrieve(query, mode="hybrid", k=RANKING_DEPTH)
+    else:
+        print("⚠️ Vektör deposu yüklenemedi (embedding API'sine erişilemiyor); vector ve hybrid modları atlandı.\n")
+
+    print(f"{'Mod':<24} | {'Küme':<13} | {'Soru':>4} | {'hit@1':>6} | {'hit@3':>6} | {'MRR':>6} | {'p50 (ms)':>9} | {'p99 (ms)':>9}")
+    print("-" * 98)
+    for name, search in modes.items():
+        results = evaluate(search, queries)
+        for group in ("SSS sorusu", "farklı ifade", "toplam"):
+            result = results.get(group)
+            if result is None:
+                continue
+            count = result["count"]
+            latencies = sorted(result["latencies"])
+            print(f"{name:<24} | {group:<13} | {count:>4} | {result['hit@1'] / count:>6.2f} | {result['hit@3'] / count:>6.2f} | "
+                  f"{result['mrr'] / count:>6.3f} | {_percentile(latencies, 0.50) * 1000:>9.2f} | "
+                  f"{_percentile(latencies, 0.99) * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# Anlamsal önbelleğin (semantic_cache) isabet ve yanlış isabet oranlarını etiketli bir küme üzerinde, farklı
+# benzerlik eşikleri için raporlar. SEMANTIC_CACHE_THRESHOLD bu rapora bakılarak seçilmelidir.
+# Çalıştırma (depo kök dizininden): python -m ai-service.benchmarks.evaluate_semantic_cache
+# Embedding modeli kullanıldığı için GEMINI_API_KEY tanımlı olmalıdır.
+
+from ..services.langgraph_agent.nodes.check_cache import generate_query_hash
+from ..services.langgraph_agent.nodes.semantic_cache import SemanticCache
+
+# Önbellekte cevabı bulunan sorular (SSS belgesinden)
+CACHED_QUESTIONS = [
+    "İade süresi ne kadardır?",
+    "Kargo ücreti kimin sorumluluğunda?",
+    "Siparişi iptal edebilir miyim?",
+    "Siparişim ne zaman kargoya verilir?",
+    "Hangi ödeme yöntemleri kabul ediliyor?",
+    "Ürün değişimi mümkün mü?",
+    "Garanti şartları nasıl?",
+    "Ürün hasarlı geldi, ne yapmalıyım?",
+    "Hediye paketi seçeneği var mı?",
+    "Kişisel veriler nasıl korunuyor?",
+    "Üyelik gerekli mi?",
+    "Destek kanalları nelerdir?",
+]
+
+# (gelen soru, aynı cevabı alması gereken önbellekteki soru). None ise önbellekten cevaplanmamalıdır.
+TEST_SET = [
+    ("İade süresi kaç gün?", "İade süresi ne kadardır?"),
+    ("kaç günde iade edebilirim", "İade süresi ne kadardır?"),
+    ("Ürünü kaç gün içinde geri gönderebilirim?", "İade süresi ne kadardır?"),
+    ("Kargo parasını kim ödüyor?", "Kargo ücreti kimin sorumluluğunda?"),
+    ("Gönderim ücreti bana mı ait?", "Kargo ücreti kimin sorumluluğunda?"),
+    ("Verdiğim siparişi iptal etmek istiyorum", "Siparişi iptal edebilir miyim?"),
+    ("Sipariş iptali mümkün mü?", "Siparişi iptal edebilir miyim?"),
+    ("Siparişim ne zaman kargolanır?", "Siparişim ne zaman kargoya verilir?"),
+    ("Ürün kaç günde kargoya çıkar?", "Siparişim ne zaman kargoya verilir?"),
+    ("Hangi ödeme seçenekleri var?", "Hangi ödeme yöntemleri kabul ediliyor?"),
+    ("Kredi kartıyla ödeyebilir miyim?", "Hangi ödeme yöntemleri kabul ediliyor?"),
+    ("Aldığım ürünü başka bedenle değiştirebilir miyim?", "Ürün değişimi mümkün mü?"),
+    ("Garanti süresi ne kadar?", "Garanti şartları nasıl?"),
+    ("Paket kırık geldi ne yapayım", "Ürün hasarlı geldi, ne yapmalıyım?"),
+    ("Hediye paketi yapıyor musunuz?", "Hediye paketi seçeneği var mı?"),
+    ("Verilerim güvende mi?", "Kişisel veriler nasıl korunuyor?"),
+    ("Üye olmadan sipariş verebilir miyim?", "Üyelik gerekli mi?"),
+    ("Size nasıl ulaşabilirim?", "Destek kanalları nelerdir?"),
+    # Yüzeyde benzeyen ama farklı cevap gerektiren sorular (yanlış isabet riski)
+    ("İade kargo ücreti ne kadar?", None),
+    ("İadem ne zaman hesabıma yatar?", None),
+    ("Hangi ülkelere gönderim yapıyorsunuz?", None),
+    ("Siparişimi nasıl takip edebilirim?", None),
+    ("Fiyatlar sabit mi?", None),
+    ("Mobil uygulamanız var mı?", None),
+    ("Kampanya kodu nasıl kullanılır?", None),
+    ("Stok durumu ne sıklıkla güncelleniyor?", None),
+    ("iPhone 15 fiyatı ne kadar?", None),
+    ("Merhaba", None),
+]
+
+THRESHOLDS = [0.80, 0.85, 0.88, 0.90, 0.92, 0.94, 0.96]
+
+
+def main():
+    print("🧲 Anlamsal Önbellek Değerlendirmesi")
+    print("=" * 72)
+
+    cache = SemanticCache(threshold=0.0, max_size=len(CACHED_QUESTIONS))
+    question_by_key = {}
+    for question in CACHED_QUESTIONS:
+        key = generate_query_hash(question)
+        question_by_key[key] = question
+        cache.add(question, key)
+    if len(cache) != len(CACHED_QUESTIONS):
+        print("❌ Embedding'ler hesaplanamadı (GEMINI_API_KEY tanımlı mı?).")
+        return
+
+    # Her soru için en yakın önbellek sorusu bir kez hesaplanır; eşikler bu sonuçlar üzerinden taranır.
+    matches = []
+    for text, expected in TEST_SET:
+        match = cache.nearest(text)
+        nearest_question, similarity = (question_by_key[match[0]], match[1]) if match else (None, 0.0)
+        matches.append((text, expected, nearest_question, similarity))
+        print(f"{similarity:.3f} {text!r:52} -> {nearest_question!r} (beklenen={expected!r})")
+
+    positives = sum(1 for _, expected, _, _ in matches if expected is not None)
+    print("=" * 72)
+    print(f"{'eşik':>6} {'isabet oranı':>14} {'doğru isabet':>14} {'yanlış isabet oranı':>21}")
+    print("-" * 72)
+    for threshold in THRESHOLDS:
+        hits = correct_hits = false_hits = 0
+        for _, expected, nearest_question, similarity in matches:
+            if similarity < threshold:
+                continue
+            hits += 1
+            if nearest_question == expected:
+                correct_hits += 1
+            else:
+                false_hits += 1
+        # İsabet oranı: aynı cevabı alması gereken sorulardan doğru cevaplananlar.
+        # Yanlış isabet oranı: önbellekten dönen cevaplardan yanlış olanlar.
+        print(f"{threshold:>6.2f} {correct_hits / positives:>14.1%} {correct_hits:>14} "
+              f"{false_hits / max(hits, 1):>21.1%}")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
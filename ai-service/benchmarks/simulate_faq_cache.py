@@ -0,0 +1,101 @@
+# SSS önbelleğinin çıkarma/kabul politikalarını bir sorgu izi (trace) üzerinde karşılaştırır ve isabet oranlarını raporlar.
+# Çalıştırma (depo kök dizininden): python -m ai-service.benchmarks.simulate_faq_cache
+#   --trace sorgular.txt   Her satırda bir kullanıcı sorusu olan kayıtlı iz (verilmezse sentetik bir iz üretilir)
+#   --sizes 100,1000       Denenecek önbellek boyutları
+#
+# Sentetik iz: Zipf dağılımıyla sorulan sabit bir SSS kümesi + aralıklarla gelen, bir defalık sorulardan oluşan dalgalar
+# (örn: kampanya günü ürün soruları). Eski politika bu dalgalarda sık sorulan cevapları önbellekten atar.
+
+import argparse
+import random
+import time
+
+from ..services.langgraph_agent.nodes.check_cache import generate_query_hash
+from ..services.langgraph_agent.nodes.cache_storage import MemoryCacheStorage
+from ..services.langgraph_agent.nodes.persistent_cache import PersistentCacheManager
+
+
+class TimestampEvictionCache:
+    """Önceki PersistentCacheManager'ın çıkarma mantığı: dolunca en eski zaman damgalı kayıt taranarak bulunur (O(n))."""
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._cache = {}
+        self._clock = 0
+        self.hits = self.misses = 0
+
+    def get(self, key: str):
+        if key in self._cache:
+            self.hits += 1
+            return self._cache[key][1]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value):
+        if len(self._cache) >= self.max_size and key not in self._cache:
+            oldest_key = min(self._cache, key=lambda k: self._cache[k][0])
+            del self._cache[oldest_key]
+        self._clock += 1
+        self._cache[key] = (self._clock, value)
+
+    def stats(self) -> dict:
+        return {"hit_ratio": self.hits / max(1, self.hits + self.misses), "admission_rejections": 0}
+
+
+def synthetic_trace(length: int, faq_count: int, burst_every: int, burst_size: int, seed: int = 42) -> list[str]:
+    """Zipf dağılımlı SSS sorguları arasına, belirli aralıklarla bir defalık soru dalgaları ekler."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(faq_count)]
+    questions = [f"sss sorusu {rank}" for rank in range(faq_count)]
+    trace = []
+    unique_counter = 0
+    while len(trace) < length:
+        trace.extend(rng.choices(questions, weights=weights, k=burst_every))
+        for _ in range(burst_size):
+            unique_counter += 1
+            trace.append(f"tek seferlik soru {unique_counter}")
+    return trace[:length]
+
+
+def simulate(cache, trace_keys: list[str]) -> tuple[dict, float]:
+    started_at = time.perf_counter()
+    for key in trace_keys:
+        if cache.get(key) is None:
+            cache.set(key, "cevap")
+    return cache.stats(), time.perf_counter() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSS önbelleği politika simülasyonu")
+    parser.add_argument("--trace", help="Her satırda bir soru olan sorgu izi dosyası")
+    parser.add_argument("--sizes", default="100,1000")
+    parser.add_argument("--length", type=int, default=200_000, help="Sentetik iz uzunluğu")
+    args = parser.parse_args()
+
+    if args.trace:
+        with open(args.trace, "r", encoding="utf-8") as f:
+            trace = [line.strip() for line in f if line.strip()]
+        source = args.trace
+    else:
+        trace = synthetic_trace(args.length, faq_count=5000, burst_every=2000, burst_size=1500)
+        source = f"sentetik ({len(trace)} sorgu)"
+    # Önbellek anahtarları, uygulamadaki gibi normalleştirilmiş sorunun hash'idir.
+    trace_keys = [generate_query_hash(query) for query in trace]
+
+    print(f"🧪 SSS Önbelleği Politika Simülasyonu — iz: {source}, farklı soru: {len(set(trace_keys))}")
+    print("=" * 78)
+    print(f"{'boyut':>7} {'politika':24} {'isabet oranı':>13} {'admission reddi':>16} {'süre (sn)':>11}")
+    print("-" * 78)
+    for size in [int(size) for size in args.sizes.split(",")]:
+        caches = {
+            "eski (zaman damgası)": TimestampEvictionCache(size),
+            "lru": PersistentCacheManager(max_size=size, ttl=10**9, storage=MemoryCacheStorage(), policy="lru"),
+            "w-tinylfu": PersistentCacheManager(max_size=size, ttl=10**9, storage=MemoryCacheStorage(), policy="tinylfu"),
+        }
+        for name, cache in caches.items():
+            stats, seconds = simulate(cache, trace_keys)
+            print(f"{size:>7} {name:24} {stats['hit_ratio']:>13.2%} {stats['admission_rejections']:>16} {seconds:>11.2f}")
+        print("-" * 78)
+
+
+if __name__ == "__main__":
+    main()
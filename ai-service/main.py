@@ -1,6 +1,7 @@
 # FastAPI app
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import description, chatbot, price_analyzer, image_gen
 
@@ -9,6 +10,10 @@ from contextlib import asynccontextmanager
 
 # Rotalarınızı ve veritabanı havuzu fonksiyonlarını import edin
 from .services.supabase_client import initialize_clients, shutdown_clients
+from .services.langgraph_agent import (init_chat_sessions, shutdown_chat_sessions,
+                                       start_answer_cache_flusher, start_answer_cache_prewarm, shutdown_answer_cache,
+                                       retire_legacy_answer_cache, invalidate_changed_document_answers,
+                                       start_vector_store_warmup, ensure_vector_store_warmup, retrieval_status)
 
 
 @asynccontextmanager
@@ -16,11 +21,26 @@ async def lifespan(app: FastAPI):
     # Uygulama başlatıldığında veritabanı havuzunu başlat
     print("🗄️ Uygulama başlatılıyor, veritabanı havuzu oluşturuluyor...")
     initialize_clients()
+    # Çok turlu sohbet oturumlarının deposunu hazırla (varsayılan: bellek içi)
+    await init_chat_sessions()
+    # Belge arama indeksini arka planda yükle (VECTOR_STORE_PRELOAD); hazır olunca GET /ready 200 döner
+    start_vector_store_warmup()
+    # Eski faq_cache.json dosyası varsa devreden çıkar (anahtar biçimi değiştiği için kayıtları aktarılmaz)
+    await retire_legacy_answer_cache()
+    # SSS önbelleği değişikliklerini arka planda toplu olarak diske yazan görevi başlat
+    start_answer_cache_flusher()
+    # Belgeler değiştiyse onlara dayanan önbellek cevaplarını sil (ön yüklemeden önce)
+    await invalidate_changed_document_answers()
+    # İsteğe bağlı: SSS önbelleğini arka planda önceden doldur (FAQ_CACHE_PREWARM)
+    start_answer_cache_prewarm()
 
     yield
 
     # Uygulama kapatıldığında veritabanı havuzunu kapat
     print("🗄️ Uygulama kapanıyor, veritabanı havuzu kapatılıyor...")
+    await shutdown_chat_sessions()
+    # Bekleyen önbellek değişikliklerini son kez diske yaz
+    await shutdown_answer_cache()
     shutdown_clients()
 
 
@@ -59,3 +79,18 @@ app.include_router(image_gen.router)
 @app.get("/")
 def read_root():
     return {"status": "AI Microservice Running"}
+
+
+@app.get("/ready")
+async def readiness():
+    """
+    Hazırlık (readiness) kontrolü: belge araması cevap verebildiğinde 200, veremediği sürece 503 döner.
+    Sadece RETRIEVAL_MODE=vector iken vektör deposu beklenir; yüklü değilse (örn: VECTOR_STORE_PRELOAD=false)
+    yükleme bu istekle arka planda başlatılır. lexical ve hybrid modlarında BM25 araması hemen cevap verdiği için
+    her zaman 200 döner; hybrid modunda vektör deposu yüklenene kadar 'retrieval.degraded' true'dur.
+    "/" sadece sürecin ayakta olduğunu (liveness) gösterir; yük dengeleyici trafiği bu uca göre yönlendirmelidir.
+    """
+    status = retrieval_status()
+    if not status["ready"]:
+        ensure_vector_store_warmup()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content={"ready": status["ready"], "retrieval": status})
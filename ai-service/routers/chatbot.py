@@ -1,50 +1,80 @@
 # ai-service/routers/chatbot.py
 
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+import os
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from fastapi.responses import JSONResponse 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from fastapi.responses import StreamingResponse
 
 # GÜNCELLEME: Güvenlik ve state yönetimi için yeni importlar
 from ..services.langgraph_agent.security import get_current_user_claims, UserClaims
 from ..services.langgraph_agent.graph_state import GraphState
-from ..services.langgraph_agent import run_langgraph_chat_async
+from ..services.langgraph_agent import run_langgraph_chat_coalesced, stream_langgraph_chat_events, run_langgraph_chat_batch
+from ..services.langgraph_agent.metrics import metrics
+from ..services.langgraph_agent.nodes.check_cache import cache_manager
+from ..services.langgraph_agent.nodes.user_cache import user_answer_cache
+from ..services.langgraph_agent.vector_store import embedding_model
+from ..services.langgraph_agent.deadline import compute_deadline, DeadlineExceeded, DEADLINE_FALLBACK_MESSAGE
 from langchain_core.messages import HumanMessage
 
 router = APIRouter(prefix="/ai", tags=["AI Services"])
 
+# /chat-invoke isteğinde istemci bağlantısının kontrol edilme aralığı (saniye)
+DISCONNECT_POLL_INTERVAL = 0.5
+
+# /chat-batch isteğinde kabul edilen en fazla soru sayısı
+CHAT_BATCH_MAX_SIZE = int(os.getenv("CHAT_BATCH_MAX_SIZE", "50"))
+
 class ChatRequest(BaseModel):
     message: str
+    # Çok turlu sohbet için oturum kimliği. Verilmezse her mesaj bağımsız (tek turlu) işlenir.
+    session_id: Optional[str] = None
+    # True ise cevapta isteğin kaynak kullanımı (model çağrısı, token, araç çağrısı) 'usage' alanında döner.
+    include_usage: bool = False
+
+
+class ChatBatchRequest(BaseModel):
+    messages: list[str] = Field(..., min_length=1)
+    # True ise sonuçlar bittikçe Server-Sent Events olarak akıtılır; False ise hepsi sıralı tek bir JSON'da döner.
+    stream: bool = False
 
 # Endpoint artık Spring Boot'tan gelen /api/ai/chat-invoke isteğini karşılayacak
 @router.post("/chat-invoke", tags=["Chatbot (LangGraph)"])
 async def invoke_chat_stream(
     request: ChatRequest,
+    http_request: Request,
     # YENİ: Token'ı doğrulayan ve kullanıcı bilgilerini getiren güvenlik bağımlılığı
-    claims: UserClaims = Depends(get_current_user_claims)
+    claims: UserClaims = Depends(get_current_user_claims),
+    # Çağıranın bu istek için beklemeye razı olduğu süre (saniye). Verilmezse CHAT_DEADLINE_SECONDS kullanılır.
+    x_request_timeout: Optional[str] = Header(None)
 ):
     """
     Kullanıcı girdisini alır, LangGraph'ı çalıştırır ve cevabı tek bir JSON nesnesi
-    olarak döndürür.
+    olarak döndürür. Süre dolarsa yedek bir cevap döner; istemci bağlantıyı kapatırsa grafik iptal edilir.
     """
+    started_at = time.perf_counter()
     try:
         # LangGraph'i başlatırken state'e kullanıcı kimliğini ekliyoruz.
         initial_state = GraphState(
             messages=[HumanMessage(content=request.message)],
-            user_id=claims.user_id 
+            user_id=claims.user_id,
+            session_id=request.session_id,
+            deadline=compute_deadline(x_request_timeout)
         )
 
         # --- DEĞİŞİKLİK BURADA BAŞLIYOR ---
 
-        # 1. LangGraph'tan gelen tüm metin parçalarını (stream) bir listede topla.
-        final_result_chunks = []
-        async for chunk in run_langgraph_chat_async(initial_state):
-             # Gelen chunk'ların string olduğunu varsayıyoruz.
-             # Eğer dict ise (örn: {"content": "..."}), o zaman chunk['content'] kullanın.
-             final_result_chunks.append(str(chunk))
-
-        # 2. Tüm parçaları tek bir metin dizesinde birleştir.
-        final_output_text = "".join(final_result_chunks)
+        # 1-2. LangGraph'ı çalıştır ve tüm metin parçalarını tek bir metin dizesinde birleştir.
+        #      Aynı soru için devam eden bir çalıştırma varsa, onun cevabı paylaşılır (single-flight).
+        usage = {}
+        final_output_text = await _cancel_on_disconnect(http_request, run_langgraph_chat_coalesced(initial_state, usage))
+        if final_output_text is None:
+            # İstemci gitti; cevabı okuyacak kimse yok (499: Client Closed Request).
+            return JSONResponse(status_code=499, content={"output": "", "suggestions": []})
 
         # 3. Frontend'in beklediği formatta bir JSON nesnesi oluştur.
         #    Gerçek cevabı "output" alanına koyuyoruz.
@@ -52,10 +82,13 @@ async def invoke_chat_stream(
             "output": final_output_text,
             "suggestions": [] # Örnek öneriler
         }
+        if request.include_usage:
+            final_response_obj["usage"] = usage
 
         # YENİ: LOGLAMA ADIMI
         # Spring Boot'a göndermeden hemen önce ne oluşturduğumuzu loglayalım.
         print(f"--> FastAPI'den gönderilen yanıt: {final_response_obj}")
+        metrics.observe("chat_invoke_latency", time.perf_counter() - started_at)
 
         # 4. StreamingResponse yerine, oluşturduğumuz JSON nesnesini döndür.
         return JSONResponse(content=final_response_obj)
@@ -64,6 +97,7 @@ async def invoke_chat_stream(
 
     except Exception as e:
         print(f"Hata - /chat-invoke: {e}")
+        metrics.increment("chat_invoke_errors")
         # Hata durumunda da standart bir JSON formatında yanıt dönmek en iyisidir.
         return JSONResponse(
             status_code=500,
@@ -71,4 +105,157 @@ async def invoke_chat_stream(
                 "output": "Üzgünüz, isteğiniz işlenirken beklenmedik bir hata oluştu. Lütfen tekrar deneyin.",
                 "suggestions": []
             }
-        )
\ No newline at end of file
+        )
+
+
+async def _cancel_on_disconnect(http_request: Request, coro):
+    """
+    'coro'yu çalıştırırken istemci bağlantısını izler. Bağlantı koparsa çalıştırmayı iptal eder ve None döndürür;
+    böylece Spring Boot vazgeçtikten sonra Gemini çağrıları ve veritabanı sorguları boşuna devam etmez.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                print("🔌 İstemci bağlantıyı kapattı, sohbet çalıştırması iptal ediliyor.")
+                metrics.increment("chat_invoke_client_disconnected")
+                task.cancel()
+                return None
+    finally:
+        # Endpoint'in kendisi iptal edilirse (örn: sunucu kapanıyor) çalıştırma da iptal edilir.
+        task.cancel()
+
+
+def _format_sse(event: str, data: dict) -> str:
+    """Bir olayı Server-Sent Events (text/event-stream) formatına çevirir."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat-stream", tags=["Chatbot (LangGraph)"])
+async def chat_stream(
+    request: ChatRequest,
+    claims: UserClaims = Depends(get_current_user_claims),
+    x_request_timeout: Optional[str] = Header(None)
+):
+    """
+    Kullanıcı girdisini alır ve LangGraph cevabını Server-Sent Events olarak akıtır.
+    - 'token' olayları: modelin ürettiği metin parçaları
+    - 'progress' olayları: "Belgeler aranıyor..." gibi düğüm ilerleme bilgileri
+    - 'done' olayı: birleştirilmiş nihai cevap
+    - 'error' olayı: beklenmedik bir hata oluştuğunda
+    Süre dolarsa o ana kadar akıtılan cevap (hiç yoksa yedek mesaj) 'done' olayıyla ve "timed_out": true ile gönderilir.
+    İstemci bağlantıyı kapatırsa Starlette akışı iptal eder; iptal grafiğe kadar iletilir.
+    """
+    started_at = time.perf_counter()
+    initial_state = GraphState(
+        messages=[HumanMessage(content=request.message)],
+        user_id=claims.user_id,
+        session_id=request.session_id,
+        deadline=compute_deadline(x_request_timeout)
+    )
+
+    async def event_generator():
+        output_chunks = []
+        first_token_sent = False
+        usage = None
+
+        # İlk baytı hemen gönderiyoruz; böylece istemci bağlantının canlı olduğunu bilir.
+        yield _format_sse("progress", {"node": "start", "message": "Sorunuz inceleniyor..."})
+        metrics.observe("chat_stream_ttfb", time.perf_counter() - started_at)
+
+        try:
+            async for event in stream_langgraph_chat_events(initial_state):
+                if event["event"] == "token":
+                    if not first_token_sent:
+                        first_token_sent = True
+                        metrics.observe("chat_stream_time_to_first_token", time.perf_counter() - started_at)
+                    output_chunks.append(event["content"])
+                    yield _format_sse("token", {"content": event["content"]})
+                elif event["event"] == "usage":
+                    usage = event["usage"]
+                else:
+                    yield _format_sse("progress", {"node": event["node"], "message": event["message"]})
+
+            done_payload = {"output": "".join(output_chunks), "suggestions": []}
+            if request.include_usage:
+                done_payload["usage"] = usage
+            yield _format_sse("done", done_payload)
+            metrics.observe("chat_stream_latency", time.perf_counter() - started_at)
+
+        except DeadlineExceeded:
+            print("⏱️ /chat-stream: İsteğin süresi doldu, grafik iptal edildi.")
+            metrics.increment("chat_deadline_exceeded")
+            yield _format_sse("done", {
+                "output": "".join(output_chunks) or DEADLINE_FALLBACK_MESSAGE,
+                "suggestions": [],
+                "timed_out": True
+            })
+
+        except asyncio.CancelledError:
+            # İstemci bağlantıyı kapattı; iptali yukarı iletiyoruz ki grafik de dursun.
+            metrics.increment("chat_stream_client_disconnected")
+            raise
+
+        except Exception as e:
+            print(f"Hata - /chat-stream: {e}")
+            metrics.increment("chat_stream_errors")
+            yield _format_sse("error", {
+                "output": "Üzgünüz, isteğiniz işlenirken beklenmedik bir hata oluştu. Lütfen tekrar deneyin."
+            })
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        # Proxy'lerin (örn: Nginx) olayları tamponlamasını engelle
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/chat-batch", tags=["Chatbot (LangGraph)"])
+async def chat_batch(
+    request: ChatBatchRequest,
+    claims: UserClaims = Depends(get_current_user_claims)
+):
+    """
+    Birden fazla soruyu tek istekte, sınırlı eşzamanlılıkla yanıtlar (örn: gece SSS yenilemesi, destek talebi ön analizi).
+    Aynı soru bir kez çalıştırılır. 'stream' False ise sonuçlar soruların sırasıyla tek bir JSON'da döner;
+    True ise her sonuç bittiği anda bir 'result' olayı olarak akıtılır ve en sonda bir 'done' olayı gönderilir.
+    """
+    if len(request.messages) > CHAT_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"Tek istekte en fazla {CHAT_BATCH_MAX_SIZE} soru gönderilebilir.")
+
+    started_at = time.perf_counter()
+    metrics.increment("chat_batch_requests")
+    results = run_langgraph_chat_batch(request.messages, claims.user_id)
+
+    if not request.stream:
+        ordered = sorted([result async for result in results], key=lambda result: result["index"])
+        metrics.observe("chat_batch_latency", time.perf_counter() - started_at)
+        return JSONResponse(content={"results": ordered})
+
+    async def event_generator():
+        try:
+            async for result in results:
+                yield _format_sse("result", result)
+            yield _format_sse("done", {"count": len(request.messages)})
+            metrics.observe("chat_batch_latency", time.perf_counter() - started_at)
+        finally:
+            # İstemci bağlantıyı kapatırsa henüz bitmemiş sorular da iptal edilir.
+            await results.aclose()
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/chat-metrics", tags=["Chatbot (LangGraph)"])
+async def chat_metrics():
+    """Sohbet akışının süreç içi metriklerini (TTFB, gecikme, hata sayaçları), SSS ve embedding önbelleklerinin isabet oranını döndürür."""
+    embedding_cache = embedding_model.stats() if hasattr(embedding_model, "stats") else None
+    return {**metrics.snapshot(), "faq_cache": cache_manager.stats(), "user_answer_cache": user_answer_cache.stats(),
+            "embedding_cache": embedding_cache}
@@ -1,20 +1,37 @@
 # Bu dosya, projenin orkestratörüdür. 
 # Diğer modüllerden aldığı hazır bileşenleri (model, araçlar, düğümler) birleştirerek LangGraph uygulamasını oluşturur ve çalıştırır.
 
+import asyncio
 import os
 from dotenv import load_dotenv
 
 # LangChain ve LangGraph temel bileşenleri
-from langchain_core.messages import AIMessage, SystemMessage, BaseMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, SystemMessage, BaseMessage, RemoveMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, END
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 # from langgraph.prebuilt import ToolNode
 
 # Kendi oluşturduğumuz modüller (artık hepsi aynı paketin içinde)
-from .tools import all_tools
+from .tools import all_tools, USER_SCOPED_TOOL_NAMES
 # GÜNCELLEME: Yeni ve güvenli araç çalıştırıcı düğümümüzü import ediyoruz.
-from .nodes import all_nodes, enhanced_should_continue
-from .nodes.tool_executor import execute_tools 
+from .nodes import all_nodes, all_async_nodes, enhanced_should_continue
+from .nodes.tool_executor import execute_tools, aexecute_tools
+from .nodes.check_cache import generate_query_hash, cache_manager
+from .nodes.persistent_cache import PersistentCacheManager
+from .nodes.shared_cache import SharedCacheManager
+from .prewarm import FAQ_CACHE_PREWARM, prewarm_answer_cache
+from .provenance import invalidate_changed_documents
+from .revalidate import cache_revalidator
+from .vector_store import VECTOR_STORE_PRELOAD, warm_vector_store
+from .retrieval import RETRIEVAL_MODE, retrieval_status
+from .single_flight import SingleFlight
+from .metrics import metrics
+from .deadline import DeadlineExceeded, DEADLINE_FALLBACK_MESSAGE, remaining_seconds, compute_deadline
+from .budget import new_usage, log_usage
+from .checkpointer import create_memory_checkpointer, open_postgres_checkpointer, close_postgres_checkpointer
+from .history import prune_session_history
 from .graph_state import GraphState
 
 load_dotenv()
@@ -34,25 +51,37 @@ workflow = StateGraph(GraphState)
 
 
 for name, node_function in all_nodes.items():
+    async_node_function = all_async_nodes[name]
     if name == "agent":
         # LAMBDA TUZAĞINA KARŞI DÜZELTME:
         # node_func=node_function, lambda'nın her döngüdeki doğru fonksiyonu
         # anında yakalamasını sağlar.
+        # 'config' parametresi, token akışı için LangGraph callback'lerinin modele ulaşmasını sağlar.
+        # RunnableLambda; .invoke() çağrılarında senkron, .astream()/.ainvoke() çağrılarında
+        # asenkron versiyonu kullanır. Böylece bir Gemini çağrısı event loop'u bloklamaz.
         workflow.add_node(
             name,
-            lambda state, node_func=node_function: node_func(state, model_with_tools)
+            RunnableLambda(
+                lambda state, config, node_func=node_function: node_func(state, model_with_tools, config),
+                afunc=lambda state, config, node_func=async_node_function: node_func(state, model_with_tools, config),
+                name=name
+            )
         )
     else:
         # Standart düğümler için de aynı güvenlik önlemini almak iyi bir pratiktir.
         workflow.add_node(
             name,
-            lambda state, node_func=node_function: node_func(state)
+            RunnableLambda(
+                lambda state, node_func=node_function: node_func(state),
+                afunc=lambda state, node_func=async_node_function: node_func(state),
+                name=name
+            )
         )
 
 # YENİ VE GÜVENLİ YÖNTEMİ EKLİYORUZ:
 # "tools" adındaki düğüm artık, state'ten user_id'yi okuyup güvenli fonksiyonları çağıran
-# bizim özel 'execute_tools' fonksiyonumuzdur.
-workflow.add_node("tools", execute_tools)
+# bizim özel 'execute_tools' fonksiyonumuzdur. Asenkron akışta 'aexecute_tools' kullanılır.
+workflow.add_node("tools", RunnableLambda(execute_tools, afunc=aexecute_tools, name="tools"))
 
 
 # --- GRAF AKIŞINI TAMAMEN YENİDEN YAPIYORUZ ---
@@ -67,10 +96,17 @@ workflow.add_conditional_edges(
     lambda state: END if state.get("cached") else "validate"
 )
 
-# 3. Validasyon Sonrası: Eğer hata varsa, bitir. Yoksa, ŞİMDİ zorunlu RAG aramasını yap.
+# 3. Validasyon Sonrası: Eğer hata varsa, bitir. Yoksa, niyet yönlendiricisine git.
 workflow.add_conditional_edges(
     "validate",
-    lambda state: END if state.get("validation_error") else "agent"
+    lambda state: END if state.get("validation_error") else "route"
+)
+
+# 4. Niyet Yönlendirici Sonrası: Yönlendirici aracı yerel olarak seçtiyse (son mesaj araç çağrısı
+#    içeren bir AIMessage ise) ilk model çağrısını atlayıp doğrudan araçlara git. Belirsizse modele git.
+workflow.add_conditional_edges(
+    "route",
+    lambda state: "tools" if isinstance(state["messages"][-1], AIMessage) and state["messages"][-1].tool_calls else "agent"
 )
 
 
@@ -102,6 +138,11 @@ workflow.add_edge("cache_and_end", END)
 # Grafiği çalıştırılabilir bir uygulama haline getir
 langgraph_app = workflow.compile()
 
+# Çok turlu sohbetler (session_id) için aynı grafiğin checkpointer'lı versiyonu.
+# Her oturumun mesaj geçmişi checkpointer'da saklanır; varsayılan depo bellek içidir,
+# lifespan'da init_chat_sessions() ile Postgres deposuna geçilebilir.
+langgraph_session_app = workflow.compile(checkpointer=create_memory_checkpointer())
+
 
 
 # Modele kimliğini ve kurallarını öğreten sistem talimatı
@@ -122,23 +163,69 @@ Bu iki kuralın dışında bir varsayımda bulunma. Bir soru spesifik bir ürün
 
 
 
+# SSE akışında kullanıcıya gösterilecek ilerleme mesajları.
+# Anahtar: Modelin çağırdığı aracın adı, Değer: Kullanıcıya gösterilecek metin
+TOOL_PROGRESS_MESSAGES = {
+    "search_documents_tool": "Belgeler aranıyor...",
+    "get_product_details_tool": "Ürün bilgileri getiriliyor...",
+    "get_payment_amount_tool": "Ödeme bilgisi sorgulanıyor...",
+    "get_item_status_tool": "Sipariş durumu sorgulanıyor...",
+    "get_refund_status_tool": "İade durumu sorgulanıyor...",
+}
+
+
+async def _prepare_run(initial_state: dict):
+    """
+    Bir çalıştırma için (uygulama, girdiler, config) üçlüsünü hazırlar.
+    - Oturumsuz isteklerde: checkpointer'sız grafik, sistem talimatı + kullanıcı mesajı.
+    - Oturumlu isteklerde: checkpointer'lı grafik. Geçmiş checkpointer'dan gelir; girdiye sadece yeni
+      kullanıcı mesajı eklenir. Sistem talimatı yalnızca oturumun ilk mesajında eklenir.
+    """
+    session_id = initial_state.get("session_id")
+    inputs = initial_state.copy()
+    # Kaynak bütçesi her istek (oturumlarda her tur) için sıfırdan başlar.
+    inputs.update(usage=new_usage(), budget_exhausted=None)
+
+    if not session_id:
+        inputs["messages"] = [SystemMessage(content=SYSTEM_INSTRUCTION)] + inputs["messages"]
+        return langgraph_app, inputs, None
+
+    # GÜVENLİK: Oturum anahtarı kullanıcı kimliğini içerir; bir kullanıcı başka bir kullanıcının oturumunu okuyamaz.
+    config = {"configurable": {"thread_id": f"{initial_state.get('user_id')}:{session_id}"}}
+    snapshot = await langgraph_session_app.aget_state(config)
+    history = snapshot.values.get("messages")
+    if not history:
+        inputs["messages"] = [SystemMessage(content=SYSTEM_INSTRUCTION)] + inputs["messages"]
+    elif (pruned := prune_session_history(history)) is not None:
+        # Saklanan geçmiş sınırsız büyümesin diye en eski turlar checkpointer'dan da silinir.
+        inputs["messages"] = [RemoveMessage(id=REMOVE_ALL_MESSAGES)] + pruned + inputs["messages"]
+
+    # Bir önceki turdan kalan, tura özel bayrakları sıfırla (aksi halde örn: 'cached' grafiği hemen bitirirdi).
+    inputs.update(cached=False, cached_user_scoped=False, validation_error=False, user_intent=None)
+    return langgraph_session_app, inputs, config
+
+
 # 3. FastAPI Router'ı Tarafından Çağrılacak Ana Fonksiyon
 # GÜNCELLEME: Fonksiyon artık sadece bir string değil, user_id'yi de içeren tam bir state dict'i alıyor.
-async def run_langgraph_chat_async(initial_state: dict):
+async def run_langgraph_chat_async(initial_state: dict, tools_used: set = None, usage: dict = None):
     """
     LangGraph uygulamasını çalıştırır ve yanıtları akış halinde döndürür.
     Sohbeti, router'dan gelen başlangıç state'i ve sistem talimatı ile başlatır.
+    'tools_used' verilirse, çalıştırma sırasında kullanılan araçların adları bu kümeye eklenir.
+    'usage' verilirse, isteğin kaynak kullanımı (bkz: budget.py) bu sözlüğe yazılır.
     """
-    inputs = initial_state.copy()
-    inputs["messages"] = [SystemMessage(content=SYSTEM_INSTRUCTION)] + inputs["messages"]
+    app, inputs, config = await _prepare_run(initial_state)
 
 
     # .astream() metodu, yanıtın adımlarını asenkron bir akış olarak almanızı sağlar
-    async for output in langgraph_app.astream(inputs):
+    async for output in app.astream(inputs, config=config):
         # Akıştan gelen çıktıyı kontrol et. Anahtar, çalışan düğümün adıdır.
         
         # Yanıt 'agent' düğümünden mi geliyor? (Önbellek MISS durumu)
         for key, value in output.items():
+            if usage is not None and isinstance(value, dict) and value.get("usage"):
+                usage.update(value["usage"])
+
             if key == "agent" and isinstance(value, dict) and "messages" in value:
                 last_message: BaseMessage = value["messages"][-1]
                 # --- ANA GÜNCELLEME BURADA ---
@@ -149,6 +236,10 @@ async def run_langgraph_chat_async(initial_state: dict):
                         yield last_message.content
 
             elif key == "cache" and isinstance(value, dict) and value.get("cached"):
+                # Kullanıcının kendi önbellek bölümünden gelen cevap sipariş araçlarıyla üretilmiştir;
+                # single-flight bu cevabı başka kullanıcılarla paylaşmasın diye öyle işaretlenir.
+                if value.get("cached_user_scoped") and tools_used is not None:
+                    tools_used.update(USER_SCOPED_TOOL_NAMES)
                 last_message: BaseMessage = value["messages"][-1]
                 # Önbellekten gelen mesajın içeriği varsa doğrudan gönderilebilir.
                 if last_message.content:
@@ -164,4 +255,334 @@ async def run_langgraph_chat_async(initial_state: dict):
                 # Bu hata mesajının içeriğini alıp frontend'e gönder.
                 if last_message.content:
                     yield last_message.content
-            # --- YENİ BLOK SONU ---
\ No newline at end of file
+            # --- YENİ BLOK SONU ---
+
+            # Çalışan araçların adlarını topla (örn: kullanıcıya özel sipariş araçlarını ayırt etmek için).
+            elif key == "tools" and tools_used is not None and isinstance(value, dict):
+                tools_used.update(message.name for message in value.get("messages", []))
+
+
+async def stream_langgraph_chat_events(initial_state: dict):
+    """
+    LangGraph uygulamasını token seviyesinde akış modunda çalıştırır.
+    Her adımda {"event": "token", "content": ...} veya {"event": "progress", "node": ..., "message": ...}
+    biçiminde bir olay üretir; en sonda isteğin kaynak kullanımı {"event": "usage", "usage": ...} olarak gönderilir.
+    Olaylar router'da Server-Sent Events formatına çevrilir.
+    İsteğin süresi (state'teki 'deadline') dolarsa grafik iptal edilir ve DeadlineExceeded fırlatılır.
+    """
+    app, inputs, config = await _prepare_run(initial_state)
+    events = _stream_graph_events(app, inputs, config)
+
+    # Süre, her olayın beklenmesine ayrı ayrı uygulanır. (Bir async generator'da yield'ler boyunca
+    # asyncio.timeout kullanmak, iptali generator yerine onu tüketen koda düşürürdü.)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(anext(events), timeout=remaining_seconds(initial_state.get("deadline")))
+            except StopAsyncIteration:
+                break
+            yield event
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("stream")
+    finally:
+        await events.aclose()
+
+
+async def _stream_graph_events(app, inputs: dict, config):
+    """stream_langgraph_chat_events'in süre sınırı olmayan iç akışı."""
+    # Aynı agent adımında token'lar zaten akıtıldıysa, adımın sonunda tam mesajı tekrar göndermeyiz.
+    agent_step_streamed = False
+    usage = new_usage()
+
+    # "messages" modu modelin ürettiği token'ları, "updates" modu ise biten düğümlerin çıktısını verir.
+    async for mode, payload in app.astream(inputs, config=config, stream_mode=["messages", "updates"]):
+        if mode == "messages":
+            chunk, metadata = payload
+            # Sadece 'agent' düğümünde modelin ürettiği metin parçalarını kullanıcıya akıt.
+            if metadata.get("langgraph_node") == "agent" and isinstance(chunk, AIMessageChunk):
+                if isinstance(chunk.content, str) and chunk.content:
+                    agent_step_streamed = True
+                    yield {"event": "token", "content": chunk.content}
+            continue
+
+        for key, value in payload.items():
+            if not isinstance(value, dict):
+                continue
+
+            if value.get("usage"):
+                usage.update(value["usage"])
+
+            if key in ("agent", "route") and "messages" in value:
+                last_message: BaseMessage = value["messages"][-1]
+                if isinstance(last_message, AIMessage) and last_message.tool_calls:
+                    # Model araç istedi: kullanıcıya hangi işlemin yapıldığını bildir.
+                    for tool_call in last_message.tool_calls:
+                        yield {
+                            "event": "progress",
+                            "node": "tools",
+                            "message": TOOL_PROGRESS_MESSAGES.get(tool_call["name"], "Bilgiler toplanıyor..."),
+                        }
+                elif not agent_step_streamed and last_message.content:
+                    # Model yanıtı parça parça vermediyse (örn: akış desteklenmiyorsa) tamamını tek seferde gönder.
+                    yield {"event": "token", "content": last_message.content}
+                agent_step_streamed = False
+
+            elif key == "cache" and value.get("cached"):
+                yield {"event": "token", "content": value["messages"][-1].content}
+
+            elif key == "validate" and value.get("validation_error"):
+                yield {"event": "token", "content": value["messages"][-1].content}
+
+            elif key == "summarize":
+                yield {"event": "progress", "node": "summarize", "message": "Bulunan bilgiler derleniyor..."}
+
+    log_usage(usage, inputs.get("user_id"))
+    yield {"event": "usage", "usage": usage}
+
+
+# Aynı soruyu soran eşzamanlı istekler, tek bir grafik çalıştırmasını paylaşır.
+chat_single_flight = SingleFlight("chat_singleflight")
+
+
+async def run_langgraph_chat(initial_state: dict) -> dict:
+    """
+    LangGraph uygulamasını çalıştırır ve nihai cevabı, kullanılan araçlarla birlikte tek bir sözlük olarak döndürür.
+    İsteğin süresi dolarsa grafik iptal edilir; o ana kadar üretilen cevap, hiç yoksa bir yedek mesaj döner.
+    """
+    tools_used = set()
+    usage = new_usage()
+    chunks = []
+    timed_out = False
+    try:
+        # deadline None ise süre sınırı yoktur.
+        async with asyncio.timeout_at(initial_state.get("deadline")):
+            async for chunk in run_langgraph_chat_async(initial_state, tools_used, usage):
+                chunks.append(str(chunk))
+    except (TimeoutError, DeadlineExceeded):
+        print("⏱️ İsteğin süresi doldu, grafik iptal edildi.")
+        metrics.increment("chat_deadline_exceeded")
+        timed_out = True
+
+    log_usage(usage, initial_state.get("user_id"))
+    return {
+        "output": "".join(chunks) or (DEADLINE_FALLBACK_MESSAGE if timed_out else ""),
+        "tools_used": tools_used,
+        "user_id": initial_state.get("user_id"),
+        "timed_out": timed_out,
+        "usage": usage,
+    }
+
+
+def _has_time_left(deadline) -> bool:
+    remaining = remaining_seconds(deadline)
+    return remaining is None or remaining > 0
+
+
+async def run_langgraph_chat_coalesced(initial_state: dict, usage: dict = None) -> str:
+    """
+    Aynı soru (aynı generate_query_hash) için devam eden bir çalıştırma varsa onun cevabını paylaşır,
+    yoksa yeni bir çalıştırma başlatır ve nihai cevabı döndürür.
+    GÜVENLİK: Ortak çalıştırma kullanıcıya özel sipariş araçlarını kullandıysa, cevap yalnızca aynı
+    kullanıcıyla paylaşılır; diğer kullanıcılar için grafik kendi user_id'leri ile ayrıca çalıştırılır.
+    Oturumlu istekler birleştirilmez; cevapları oturumun geçmişine bağlıdır.
+    'usage' verilirse, cevabı üreten çalıştırmanın kaynak kullanımı bu sözlüğe yazılır
+    (paylaşılan cevaplarda "shared": True ile birlikte liderin kullanımı).
+    """
+    if initial_state.get("session_id"):
+        result = await run_langgraph_chat(initial_state)
+        if usage is not None:
+            usage.update(result["usage"])
+        return result["output"]
+
+    query = initial_state["messages"][-1].content
+    query_hash = generate_query_hash(query)
+
+    # Ortak çalıştırma liderin süresiyle sınırlıdır; bekleyen her istek ayrıca kendi süresiyle sınırlanır ve
+    # liderin süresi dolduğu için yedek cevap alan, süresi daha uzun istekler grafiği yeniden çalıştırır.
+    try:
+        async with asyncio.timeout_at(initial_state.get("deadline")):
+            result, shared = await chat_single_flight.run(query_hash, lambda: run_langgraph_chat(initial_state))
+    except TimeoutError:
+        metrics.increment("chat_deadline_exceeded")
+        return DEADLINE_FALLBACK_MESSAGE
+
+    if shared and result["tools_used"] & USER_SCOPED_TOOL_NAMES and result["user_id"] != initial_state.get("user_id"):
+        print("🔒 Paylaşılan cevap kullanıcıya özel veri içeriyor, istek ayrıca çalıştırılıyor.")
+        metrics.increment("chat_singleflight_user_scoped_reruns")
+        result = await run_langgraph_chat(initial_state)
+        shared = False
+    elif shared and result["timed_out"] and _has_time_left(initial_state.get("deadline")):
+        # Ortak çalıştırma liderin (daha kısa olabilecek) süresi dolduğu için yedek/yarım bir cevapla bitti;
+        # bu isteğin süresi henüz dolmadığından grafik kendi süresiyle yeniden çalıştırılır.
+        print("⏱️ Paylaşılan çalıştırmanın süresi doldu, istek kendi süresiyle yeniden çalıştırılıyor.")
+        metrics.increment("chat_singleflight_deadline_reruns")
+        result = await run_langgraph_chat(initial_state)
+        shared = False
+
+    if usage is not None:
+        usage.update(result["usage"], shared=shared)
+    return result["output"]
+
+
+# Toplu sohbet isteğinde aynı anda çalışan en fazla soru sayısı
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))
+
+
+async def run_langgraph_chat_batch(messages: list[str], user_id: str, concurrency: int = CHAT_BATCH_CONCURRENCY):
+    """
+    Birden fazla soruyu sınırlı eşzamanlılıkla çalıştırır ve her sonucu BİTTİĞİ SIRAYLA üretir:
+    {"index": ..., "message": ..., "output": ..., "error": bool}
+    - Aynı soru (aynı generate_query_hash) toplu istekte bir kez çalıştırılır; sonucu tüm tekrarlarına dağıtılır.
+    - Her soru run_langgraph_chat_coalesced ile çalıştığı için önbellek ve single-flight'tan da faydalanır.
+    - Her sorunun kendi süre sınırı (deadline) vardır; süre soru çalışmaya başladığında işlemeye başlar.
+    """
+    indexes_by_hash: dict[str, list[int]] = {}
+    for index, message in enumerate(messages):
+        indexes_by_hash.setdefault(generate_query_hash(message), []).append(index)
+
+    metrics.increment("chat_batch_questions", len(messages))
+    metrics.increment("chat_batch_deduplicated", len(messages) - len(indexes_by_hash))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def answer(indexes: list[int]) -> tuple[list[int], str, bool]:
+        async with semaphore:
+            initial_state = GraphState(
+                messages=[HumanMessage(content=messages[indexes[0]])],
+                user_id=user_id,
+                deadline=compute_deadline()
+            )
+            try:
+                return indexes, await run_langgraph_chat_coalesced(initial_state), False
+            except Exception as e:
+                print(f"❌ Toplu sohbette bir soru işlenirken hata oluştu: {e}")
+                metrics.increment("chat_batch_errors")
+                return indexes, "Üzgünüz, bu soru işlenirken beklenmedik bir hata oluştu.", True
+
+    tasks = [asyncio.ensure_future(answer(indexes)) for indexes in indexes_by_hash.values()]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            indexes, output, error = await finished
+            for index in indexes:
+                yield {"index": index, "message": messages[index], "output": output, "error": error}
+    finally:
+        # Tüketici vazgeçerse (örn: istemci bağlantısı koptu) kalan sorular iptal edilir.
+        for task in tasks:
+            task.cancel()
+
+
+async def init_chat_sessions():
+    """
+    Uygulama başlarken çağrılır. CHAT_CHECKPOINTER=postgres ise oturum grafiğini Postgres checkpointer'ı ile
+    yeniden derler; aksi halde bellek içi depo kullanılmaya devam edilir.
+    """
+    global langgraph_session_app
+    checkpointer = await open_postgres_checkpointer()
+    if checkpointer is not None:
+        langgraph_session_app = workflow.compile(checkpointer=checkpointer)
+
+
+async def shutdown_chat_sessions():
+    """Uygulama kapanırken oturum deposunun bağlantılarını kapatır."""
+    await close_postgres_checkpointer()
+
+
+# SSS önbelleğinin bekleyen değişikliklerini diske yazan (write-behind) ve önbelleği önceden dolduran arka plan görevleri
+_cache_flusher_task = None
+_cache_prewarm_task = None
+# Belge arama indeksini (FAISS) uygulama başlarken yükleyen arka plan görevi
+_vector_store_task = None
+
+
+def start_vector_store_warmup():
+    """
+    Uygulama başlarken çağrılır. VECTOR_STORE_PRELOAD=true ise belge arama indeksini arka planda yükler;
+    uygulama bu sırada istek kabul eder ve hazır olup olmadığı GET /ready ile izlenir.
+    RETRIEVAL_MODE=lexical ise vektör deposu hiç kullanılmadığı için yüklenmez.
+    """
+    if VECTOR_STORE_PRELOAD and RETRIEVAL_MODE != "lexical":
+        ensure_vector_store_warmup()
+
+
+def ensure_vector_store_warmup():
+    """
+    Belge arama indeksi yüklü değilse ve yükleyen bir görev çalışmıyorsa arka planda yüklemeyi başlatır.
+    GET /ready de bunu çağırır; böylece VECTOR_STORE_PRELOAD=false iken de indeks ilk sohbet isteğini beklemeden yüklenir.
+    """
+    global _vector_store_task
+    if retrieval_status()["vector_store"]["ready"]:
+        return
+    if _vector_store_task is None or _vector_store_task.done():
+        _vector_store_task = asyncio.create_task(warm_vector_store())
+
+
+def start_answer_cache_flusher():
+    """
+    Uygulama başlarken çağrılır. Yerel (diskte kalıcı) önbellek write-behind modundaysa boşaltma görevini,
+    paylaşımlı (Redis) önbellekte ise diğer süreçlerin geçersiz kılmalarını dinleyen iş parçacığını başlatır.
+    Bayat cevapları yenileyen görevler de (bkz: revalidate.py) bu event loop'ta çalışır.
+    """
+    global _cache_flusher_task
+    cache_revalidator.start()
+    if isinstance(cache_manager, SharedCacheManager):
+        cache_manager.start()
+    if isinstance(cache_manager, PersistentCacheManager) and cache_manager.write_behind:
+        _cache_flusher_task = asyncio.create_task(cache_manager.run_flusher())
+
+
+async def retire_legacy_answer_cache():
+    """
+    Uygulama başlarken (önbellek kullanılmadan önce) çağrılır. Eski faq_cache.json dosyasında kayıt varsa dosya
+    devreden çıkarılır; kayıtları eski anahtar biçiminde olduğu için aktarılmaz
+    (bkz: PersistentCacheManager.retire_legacy_cache).
+    """
+    if isinstance(cache_manager, PersistentCacheManager):
+        await asyncio.to_thread(cache_manager.retire_legacy_cache)
+
+
+async def invalidate_changed_document_answers():
+    """
+    Uygulama başlarken (ön yüklemeden önce) çağrılır. SSS/politika belgeleri son çalıştırmadan bu yana
+    değiştiyse, sadece değişen belge parçalarına dayanan cevaplar önbellekten silinir.
+    """
+    try:
+        await asyncio.to_thread(invalidate_changed_documents, cache_manager)
+    except Exception as e:
+        print(f"⚠️ Belge değişiklikleri kontrol edilemedi, önbellek olduğu gibi kullanılacak: {e}")
+
+
+def start_answer_cache_prewarm():
+    """
+    Uygulama başlarken çağrılır. FAQ_CACHE_PREWARM=faq|graph ise SSS önbelleğini arka planda doldurur;
+    uygulama bu sırada istek kabul etmeye devam eder.
+    """
+    global _cache_prewarm_task
+    if FAQ_CACHE_PREWARM != "off":
+        _cache_prewarm_task = asyncio.create_task(_prewarm_when_ready(FAQ_CACHE_PREWARM))
+
+
+async def _prewarm_when_ready(mode: str):
+    # Graph modunda sorular belge aramasından geçer; indeks hazır olmadan başlanırsa cevaplar hata ile sonuçlanırdı.
+    if mode == "graph" and RETRIEVAL_MODE != "lexical":
+        await warm_vector_store()
+    await prewarm_answer_cache(mode)
+
+
+async def shutdown_answer_cache():
+    """
+    Uygulama kapanırken çağrılır. Boşaltma görevini durdurur, bekleyen değişiklikleri son kez diske yazar
+    ve depolama katmanını kapatır; böylece düzgün bir yeniden başlatmada hiçbir kayıt kaybolmaz.
+    """
+    global _cache_flusher_task, _cache_prewarm_task, _vector_store_task
+    await cache_revalidator.stop()
+    for task in (_vector_store_task, _cache_prewarm_task, _cache_flusher_task):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Önbellek arka plan görevi hata ile sonlanmıştı: {e}")
+    _cache_flusher_task = _cache_prewarm_task = _vector_store_task = None
+    await asyncio.to_thread(cache_manager.close)
@@ -0,0 +1,91 @@
+# Bu dosya, tek bir sohbet isteğinin harcayabileceği kaynakları (model çağrısı, token, araç çağrısı) sınırlar.
+# 'agent -> tools -> summarize -> agent' döngüsü kafası karışmış bir sohbette çok sayıda Gemini çağrısı yapabilir;
+# bütçe dolduğunda grafik, o ana kadar toplanan bilgilerle kibarca sonlandırılır.
+# Kullanım bilgisi GraphState'in 'usage' alanında taşınır ve her istek için yeniden başlar.
+
+import os
+from typing import Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from .history import count_tokens
+from .metrics import metrics
+
+# İstek başına en fazla model çağrısı (ilk karar + araç sonrası cevaplar)
+CHAT_MAX_LLM_CALLS = int(os.getenv("CHAT_MAX_LLM_CALLS", "4"))
+
+# İstek başına en fazla araç çağrısı (modelin tek yanıtta istediği birden fazla araç ayrı ayrı sayılır)
+CHAT_MAX_TOOL_CALLS = int(os.getenv("CHAT_MAX_TOOL_CALLS", "6"))
+
+# İstek boyunca tüm model çağrılarında harcanabilecek toplam girdi (prompt) ve çıktı (completion) tokenı
+CHAT_MAX_PROMPT_TOKENS = int(os.getenv("CHAT_MAX_PROMPT_TOKENS", "24000"))
+CHAT_MAX_COMPLETION_TOKENS = int(os.getenv("CHAT_MAX_COMPLETION_TOKENS", "4000"))
+
+# Bütçe dolduğunda, o ana kadar hiçbir bilgi toplanamadıysa kullanıcıya gösterilen mesaj
+BUDGET_EXHAUSTED_MESSAGE = "Üzgünüz, bu soru için ayrılan işlem sınırına ulaşıldı. Lütfen sorunuzu daha kısa ve net bir şekilde tekrar sorun."
+
+
+def new_usage() -> dict:
+    """Bir isteğin boş kullanım kaydını döndürür."""
+    return {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "tool_calls": 0}
+
+
+def get_usage(state) -> dict:
+    """State'teki kullanım kaydının bir kopyasını döndürür (düğümler state'i doğrudan değiştirmez)."""
+    return {**new_usage(), **(state.get("usage") or {})}
+
+
+def exhausted_llm_budget(usage: dict) -> Optional[str]:
+    """Yeni bir model çağrısı yapılamıyorsa nedenini, yapılabiliyorsa None döndürür."""
+    if usage["llm_calls"] >= CHAT_MAX_LLM_CALLS:
+        return "llm_calls"
+    if usage["prompt_tokens"] >= CHAT_MAX_PROMPT_TOKENS:
+        return "prompt_tokens"
+    if usage["completion_tokens"] >= CHAT_MAX_COMPLETION_TOKENS:
+        return "completion_tokens"
+    return None
+
+
+def record_llm_call(usage: dict, prompt: list[BaseMessage], response: AIMessage) -> dict:
+    """
+    Bir model çağrısını kullanım kaydına ekler. Gemini'nin döndürdüğü usage_metadata kullanılır;
+    yoksa (örn: akışta gelmediyse) tokenlar yerel olarak tahmin edilir.
+    """
+    usage_metadata = getattr(response, "usage_metadata", None) or {}
+    prompt_tokens = usage_metadata.get("input_tokens") or count_tokens(prompt)
+    completion_tokens = usage_metadata.get("output_tokens") or count_tokens([response])
+
+    usage = dict(usage)
+    usage["llm_calls"] += 1
+    usage["prompt_tokens"] += prompt_tokens
+    usage["completion_tokens"] += completion_tokens
+    return usage
+
+
+def budget_exhausted_answer(state, reason: str) -> AIMessage:
+    """
+    Bütçe dolduğunda modeli çağırmak yerine döndürülen nihai cevap.
+    Bu turda araçlardan bilgi toplandıysa (summarize düğümünün özeti), bu bilgiler kullanıcıya olduğu gibi iletilir.
+    """
+    print(f"🧮 İstek bütçesi doldu ({reason}), grafik sonlandırılıyor.")
+    metrics.increment("chat_budget_exhausted")
+    metrics.increment(f"chat_budget_exhausted_{reason}")
+
+    for message in reversed(state["messages"]):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, SystemMessage) and message.content.startswith("Araçlardan şu bilgiler toplandı"):
+            findings = message.content.split("\n", 1)[-1]
+            return AIMessage(content=f"İsteğiniz için ayrılan işlem sınırına ulaşıldı. Şu ana kadar bulunan bilgiler:\n{findings}")
+    return AIMessage(content=BUDGET_EXHAUSTED_MESSAGE)
+
+
+def log_usage(usage: dict, user_id: Optional[str]):
+    """İsteğin toplam kullanımını loglar ve süreç metriklerine ekler."""
+    print(
+        f"🧮 Kullanım (user_id={user_id}): {usage['llm_calls']} model çağrısı, "
+        f"{usage['prompt_tokens']} girdi / {usage['completion_tokens']} çıktı tokenı, {usage['tool_calls']} araç çağrısı"
+    )
+    for name, value in usage.items():
+        if isinstance(value, int):
+            metrics.increment(f"chat_usage_{name}", value)
@@ -0,0 +1,145 @@
+# Bu dosya, çok turlu sohbet oturumlarının (session_id) durumunu saklayan LangGraph checkpointer'ını oluşturur.
+# Varsayılan olarak bellek içi depo kullanılır; CHAT_CHECKPOINTER=postgres ile kalıcı Postgres deposuna geçilir.
+#
+# Bellek içi depo sınırlıdır (bkz: BoundedMemorySaver): her oturumun sadece en son checkpoint'i tutulur,
+# CHAT_SESSION_TTL saniye boyunca kullanılmayan oturumlar ve CHAT_SESSION_MAX_COUNT sınırını aşan en eski oturumlar
+# silinir. Bir oturumda saklanan mesaj sayısı ise CHAT_SESSION_MAX_TURNS ile sınırlanır (bkz: history.prune_session_history).
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from langgraph.checkpoint.memory import MemorySaver
+
+# "memory" (varsayılan) veya "postgres"
+CHAT_CHECKPOINTER = os.getenv("CHAT_CHECKPOINTER", "memory").lower()
+CHAT_CHECKPOINT_DB_URL = os.getenv("CHAT_CHECKPOINT_DB_URL")
+# Bellek içi depoda bir oturumun en fazla boşta kalma süresi (sn) ve süreç başına en fazla oturum sayısı
+CHAT_SESSION_TTL = int(os.getenv("CHAT_SESSION_TTL", "3600"))
+CHAT_SESSION_MAX_COUNT = int(os.getenv("CHAT_SESSION_MAX_COUNT", "10000"))
+
+# Postgres deposu kullanılıyorsa, uygulama kapanırken kapatılacak bağlantı havuzu
+_postgres_pool = None
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    Boyutu sınırlı MemorySaver. LangGraph'ın bellek içi deposu her adımın checkpoint'ini (ve her adımdaki mesaj
+    listesinin bir kopyasını) ve her oturumu süresiz saklar. Oturumlar geçmişe dönme (time travel) için
+    kullanılmadığından burada:
+    - Yeni bir checkpoint yazıldığında aynı oturumun eski checkpoint'leri, bunlara ait ara yazmalar ve artık
+      hiçbir checkpoint'in göstermediği eski kanal değerleri silinir.
+    - Oturumlar son yazılma sırasıyla tutulur; her yazmada 'ttl' saniyedir yazılmayan ve 'max_threads'
+      sınırını aşan en eski oturumlar silinir.
+    """
+    def __init__(self, max_threads: int = CHAT_SESSION_MAX_COUNT, ttl: float = CHAT_SESSION_TTL, **kwargs):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        # thread_id -> son yazılma zamanı (en eskisi başta)
+        self._last_used: OrderedDict[str, float] = OrderedDict()
+        # thread_id -> {(checkpoint_ns, kanal): saklanan son sürüm}
+        self._channel_versions: dict[str, dict[tuple[str, str], str]] = {}
+        self.evictions = 0
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            saved_config = super().put(config, checkpoint, metadata, new_versions)
+
+            versions = self._channel_versions.setdefault(thread_id, {})
+            for channel, version in new_versions.items():
+                previous = versions.get((checkpoint_ns, channel))
+                if previous is not None and previous != version:
+                    self.blobs.pop((thread_id, checkpoint_ns, channel, previous), None)
+                versions[(checkpoint_ns, channel)] = version
+
+            checkpoints = self.storage[thread_id][checkpoint_ns]
+            for checkpoint_id in [checkpoint_id for checkpoint_id in checkpoints if checkpoint_id != checkpoint["id"]]:
+                del checkpoints[checkpoint_id]
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+            now = time.monotonic()
+            self._last_used[thread_id] = now
+            self._last_used.move_to_end(thread_id)
+            self._evict(now)
+        return saved_config
+
+    def _evict(self, now: float):
+        while self._last_used:
+            thread_id, last_used = next(iter(self._last_used.items()))
+            if now - last_used < self.ttl and len(self._last_used) <= self.max_threads:
+                break
+            self.delete_thread(thread_id)
+            self.evictions += 1
+
+    def delete_thread(self, thread_id: str) -> None:
+        # MemorySaver.delete_thread tüm ara yazmaları ve kanal değerlerini tarar; burada oturumun anahtarları
+        # bilindiği için sadece onlar silinir.
+        with self._lock:
+            for checkpoint_ns, checkpoints in self.storage.pop(thread_id, {}).items():
+                for checkpoint_id in checkpoints:
+                    self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            for (checkpoint_ns, channel), version in self._channel_versions.pop(thread_id, {}).items():
+                self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+            self._last_used.pop(thread_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"sessions": len(self._last_used), "max_sessions": self.max_threads, "evictions": self.evictions}
+
+
+def create_memory_checkpointer() -> MemorySaver:
+    """Süreç içi, bellekte tutulan ve boyutu sınırlı checkpointer. Worker yeniden başlatıldığında oturumlar sıfırlanır."""
+    return BoundedMemorySaver()
+
+
+async def open_postgres_checkpointer():
+    """
+    CHAT_CHECKPOINTER=postgres ise asenkron Postgres checkpointer'ını açar ve tablolarını hazırlar.
+    Postgres yapılandırılmamışsa veya 'langgraph-checkpoint-postgres' paketi kurulu değilse None döner
+    ve bellek içi depo kullanılmaya devam edilir. Uygulamanın lifespan'ında çağrılır.
+    """
+    global _postgres_pool
+    if CHAT_CHECKPOINTER != "postgres":
+        return None
+
+    if not CHAT_CHECKPOINT_DB_URL:
+        print("⚠️ CHAT_CHECKPOINT_DB_URL tanımlı değil, sohbet oturumları bellekte tutulacak.")
+        return None
+
+    try:
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        from psycopg_pool import AsyncConnectionPool
+    except ImportError:
+        print("⚠️ 'langgraph-checkpoint-postgres' paketi kurulu değil, sohbet oturumları bellekte tutulacak.")
+        return None
+
+    try:
+        _postgres_pool = AsyncConnectionPool(
+            conninfo=CHAT_CHECKPOINT_DB_URL,
+            max_size=5,
+            kwargs={"autocommit": True, "prepare_threshold": 0},
+            open=False,
+        )
+        await _postgres_pool.open()
+        checkpointer = AsyncPostgresSaver(_postgres_pool)
+        await checkpointer.setup()
+        print("✅ Sohbet oturumları için Postgres checkpointer'ı başlatıldı.")
+        return checkpointer
+    except Exception as e:
+        print(f"❌ Postgres checkpointer'ı başlatılamadı, sohbet oturumları bellekte tutulacak: {e}")
+        await close_postgres_checkpointer()
+        return None
+
+
+async def close_postgres_checkpointer():
+    """Postgres checkpointer'ının bağlantı havuzunu kapatır."""
+    global _postgres_pool
+    if _postgres_pool is not None:
+        await _postgres_pool.close()
+        _postgres_pool = None
+        print("ℹ️ Sohbet oturumu veritabanı bağlantıları kapatıldı.")
@@ -0,0 +1,59 @@
+# Bu dosya, bir sohbet isteğinin son teslim zamanını (deadline) hesaplar ve düğümlere/araçlara kalan süreyi verir.
+# Deadline, istek başında bir kez hesaplanır ve GraphState'in 'deadline' alanında tüm grafiğe taşınır.
+# Süre dolduğunda model çağrısı, araçlar ve veritabanı sorguları yarıda kesilir; kullanıcıya bir yedek cevap döner.
+
+import os
+import time
+from typing import Optional
+
+# Çağıran taraf bir süre belirtmezse kullanılan varsayılan süre (saniye)
+CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "30"))
+
+# Çağıranın başlıkla isteyebileceği en uzun süre (saniye)
+CHAT_DEADLINE_MAX_SECONDS = float(os.getenv("CHAT_DEADLINE_MAX_SECONDS", "120"))
+
+# Spring Boot'un kendi zaman aşımından geriye kalan süreyi (saniye) ilettiği başlık
+DEADLINE_HEADER = "X-Request-Timeout"
+
+# Süre dolduğunda ve hiç cevap üretilemediğinde kullanıcıya gösterilen mesaj
+DEADLINE_FALLBACK_MESSAGE = "Üzgünüz, sorunuz zamanında yanıtlanamadı. Lütfen biraz sonra tekrar deneyin."
+
+
+class DeadlineExceeded(Exception):
+    """İsteğin son teslim zamanı dolduğunda fırlatılır."""
+
+
+def compute_deadline(header_value: Optional[str] = None) -> float:
+    """
+    İsteğin son teslim zamanını time.monotonic() cinsinden döndürür.
+    Başlıkta geçerli bir süre varsa o (CHAT_DEADLINE_MAX_SECONDS ile sınırlanarak), yoksa varsayılan süre kullanılır.
+    Not: asyncio event loop'unun saati de time.monotonic() olduğundan değer doğrudan asyncio.timeout_at ile kullanılabilir.
+    """
+    seconds = CHAT_DEADLINE_SECONDS
+    if header_value:
+        try:
+            requested = float(header_value)
+            if requested > 0:
+                seconds = min(requested, CHAT_DEADLINE_MAX_SECONDS)
+        except ValueError:
+            print(f"⚠️ Geçersiz {DEADLINE_HEADER} başlığı yok sayıldı: '{header_value}'")
+    return time.monotonic() + seconds
+
+
+def remaining_seconds(deadline: Optional[float]) -> Optional[float]:
+    """Deadline'a kalan süreyi döndürür. Deadline yoksa None (süre sınırı yok) döner."""
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline(state, stage: str) -> Optional[float]:
+    """
+    Bir işe başlamadan önce çağrılır. Süre dolmuşsa DeadlineExceeded fırlatır, aksi halde kalan süreyi döndürür.
+    'stage' yalnızca loglama içindir (örn: "model", "tools").
+    """
+    remaining = remaining_seconds(state.get("deadline"))
+    if remaining is not None and remaining <= 0:
+        print(f"⏱️ İsteğin süresi doldu, '{stage}' adımı atlanıyor.")
+        raise DeadlineExceeded(stage)
+    return remaining
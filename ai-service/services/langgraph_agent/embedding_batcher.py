@@ -0,0 +1,108 @@
+# Bu dosya, aynı anda gelen belge aramalarının soru embedding'lerini tek bir toplu API çağrısında birleştirir.
+# Her sohbet, db.similarity_search içinde kendi embedding isteğini yapar; oysa embedding API'si tek istekte
+# çok sayıda metin kabul eder. Eşzamanlı yükte her arama ayrı bir ağ turu ödemek ve API kotasını ayrı ayrı
+# harcamak yerine, kısa bir pencere (EMBEDDING_BATCH_WINDOW_MS) içinde gelen sorular toplanır, tek çağrıyla
+# embed edilir ve her vektör kendi çağıranına döndürülür.
+#
+# - Pencereyi açan ilk çağıran ("lider") pencere dolana veya toplu istek EMBEDDING_BATCH_MAX_SIZE'a ulaşana kadar
+#   bekler, sonra isteği kendisi gönderir; ayrı bir arka plan iş parçacığı yoktur.
+# - Tek başına gelen bir arama en fazla pencere süresi kadar gecikir; EMBEDDING_BATCH_WINDOW_MS=0 batching'i kapatır.
+# - Embedding önbelleği (embedding_cache.py) bu katmanın önündedir; sadece önbellekte olmayan sorular toplanır.
+#
+# Kıyaslama: python -m ai-service.benchmarks.benchmark_embedding_batcher
+
+import inspect
+import os
+import threading
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+
+from .metrics import metrics
+
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+
+
+class _Batch:
+    """Bir pencerede toplanan sorular ve toplu çağrının sonucu."""
+    def __init__(self):
+        self.texts: list[str] = []
+        self.vectors: Optional[list[list[float]]] = None
+        self.error: Optional[BaseException] = None
+        # Toplu istek dolduğunda liderin pencereyi beklemeden göndermesi için
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+
+class BatchedQueryEmbeddings(Embeddings):
+    """
+    Başka bir Embeddings nesnesini saran, soru embedding'lerini toplu gönderen model. Belge embedding'leri
+    (embed_documents) zaten toplu olduğu için olduğu gibi iletilir. Thread-safe'dir.
+    """
+    def __init__(self, embeddings: Embeddings, window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+                 max_batch: int = EMBEDDING_BATCH_MAX_SIZE):
+        self.embeddings = embeddings
+        self.model = getattr(embeddings, "model", type(embeddings).__name__)
+        self.window = max(0.0, window_ms) / 1000
+        self.max_batch = max(1, max_batch)
+        self._lock = threading.Lock()
+        self._open: Optional[_Batch] = None
+        # Gemini, sorular için embed_query ile aynı vektörleri toplu çağrıda task_type="RETRIEVAL_QUERY" ile üretir.
+        self._supports_task_type = "task_type" in inspect.signature(embeddings.embed_documents).parameters
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        if len(texts) == 1:
+            return [self.embeddings.embed_query(texts[0])]
+        if self._supports_task_type:
+            return self.embeddings.embed_documents(texts, task_type="RETRIEVAL_QUERY")
+        return [self.embeddings.embed_query(text) for text in texts]
+
+    def _run(self, batch: _Batch):
+        metrics.increment("embedding_batches")
+        metrics.increment("embedding_batched_queries", len(batch.texts))
+        try:
+            batch.vectors = self._embed_batch(batch.texts)
+        except BaseException as e:
+            batch.error = e
+        finally:
+            batch.done.set()
+
+    def embed_query(self, text: str) -> list[float]:
+        if self.window == 0:
+            return self.embeddings.embed_query(text)
+
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            index = len(batch.texts)
+            batch.texts.append(text)
+            if len(batch.texts) >= self.max_batch:
+                # Dolan toplu isteğe yeni soru eklenmez; sonraki soru yeni bir pencere açar.
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            self._run(batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.vectors[index]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+
+def batch_query_embeddings(embeddings):
+    """EMBEDDING_BATCH_WINDOW_MS > 0 ise modeli soru embedding'lerini toplu gönderen sarmalayıcıyla sarar."""
+    if embeddings is None or EMBEDDING_BATCH_WINDOW_MS <= 0:
+        return embeddings
+    return BatchedQueryEmbeddings(embeddings)
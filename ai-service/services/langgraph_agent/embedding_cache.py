@@ -0,0 +1,224 @@
+# Bu dosya, embedding modelinin önüne diskte kalıcı ve boyutu sınırlı bir önbellek koyar.
+# Her belge araması, kullanıcı sorusunu Gemini embedding API'sine bir ağ turuyla vektöre çevirir; aynı sorular
+# (ve indeks güncellenirken değişmeyen parçalar) tekrar tekrar embed edilir. Önbellek, vektörleri
+# (model adı, tür, metin) parmak izine göre bir SQLite veritabanında ve en sık kullanılanları bellekte tutar;
+# böylece sık sorulan soruların embedding gecikmesi neredeyse sıfıra iner.
+#
+# - Soru (embed_query) ve belge (embed_documents) embedding'leri aynı önbellekte, ayrı anahtarlarla tutulur:
+#   Gemini, arama sorusu ve belge için farklı görev tipleriyle farklı vektörler üretir.
+# - Model adı anahtarın parçası olduğu için model değiştirildiğinde eski vektörler kullanılmaz.
+# - Kayıt sayısı EMBEDDING_CACHE_MAX_SIZE'ı aşınca en uzun süredir kullanılmayanlar silinir.
+# - Veritabanı varsayılan olarak indeksin yanında (ai-service/embeddings/embedding_cache.db) durur; çalışma
+#   dizininden bağımsızdır. Bağlantı ilk embedding isteğinde açılır, vector_store import edilirken diske dokunulmaz.
+# İsabet oranı GET /ai/chat-metrics yanıtındaki "embedding_cache" alanında raporlanır.
+
+import os
+import sqlite3
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+
+from .fingerprint import fingerprint
+from .metrics import metrics
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH",
+                                 str(Path(__file__).resolve().parents[2] / "embeddings" / "embedding_cache.db"))
+EMBEDDING_CACHE_MAX_SIZE = int(os.getenv("EMBEDDING_CACHE_MAX_SIZE", "100000"))
+# Diske gitmeden cevaplanan, en son kullanılan vektörlerin sayısı
+EMBEDDING_CACHE_MEMORY_SIZE = int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "1024"))
+
+# SQLite'ın tek sorguda kabul ettiği parametre sayısı sınırının altında kalmak için
+_QUERY_BATCH = 500
+
+
+def _encode(vector: list[float]) -> bytes:
+    # FAISS vektörleri zaten float32 olarak tuttuğu için float32 saklamak hassasiyet kaybettirmez.
+    return array("f", vector).tobytes()
+
+
+def _decode(blob: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Başka bir Embeddings nesnesini saran, önbellekli embedding modeli. FAISS ve anlamsal önbellek bu nesneyi
+    asıl model yerine kullanır. Thread-safe'dir.
+    """
+    def __init__(self, embeddings: Embeddings, path: str = EMBEDDING_CACHE_PATH,
+                 max_size: int = EMBEDDING_CACHE_MAX_SIZE, memory_size: int = EMBEDDING_CACHE_MEMORY_SIZE):
+        self.embeddings = embeddings
+        # İndeks manifesti (vector_store.py) modeli bu alandan okur.
+        self.model = getattr(embeddings, "model", type(embeddings).__name__)
+        self.path = path
+        self.max_size = max_size
+        self.memory_size = memory_size
+        self._lock = Lock()
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._stats = {"hits": 0, "memory_hits": 0, "misses": 0, "evictions": 0}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._size = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Veritabanını ilk kullanımda açar ve tabloyu hazırlar (kilit altında çağrılır)."""
+        if self._conn is not None:
+            return self._conn
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            pass  # Klasör oluşturulamazsa hatayı sqlite3.connect anlaşılır şekilde verir.
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                " key TEXT PRIMARY KEY,"
+                " vector BLOB NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embedding_cache_last_used ON embedding_cache (last_used)")
+            self._size = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+        except sqlite3.Error:
+            conn.close()
+            raise
+        self._conn = conn
+        return conn
+
+    def _key(self, kind: str, text: str) -> str:
+        return fingerprint(f"{self.model}\x1f{kind}\x1f{text}")
+
+    def _remember(self, key: str, vector: list[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _get_many(self, keys: list[str]) -> dict:
+        """Önbellekte bulunan anahtarların vektörlerini döndürür; önce bellekte, sonra diskte arar."""
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(key)
+                    continue
+                self._memory.move_to_end(key)
+                found[key] = vector
+            self._stats["memory_hits"] += len(found)
+
+            rows = []
+            conn = self._connection() if missing else None
+            for start in range(0, len(missing), _QUERY_BATCH):
+                batch = missing[start:start + _QUERY_BATCH]
+                rows.extend(conn.execute(
+                    f"SELECT key, vector FROM embedding_cache WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall())
+            if rows:
+                # Bellekten cevaplanan isabetler diske yazılmaz; kullanım zamanı sadece diskten okunan kayıtlarda güncellenir.
+                now = time.time()
+                conn.executemany("UPDATE embedding_cache SET last_used = ? WHERE key = ?",
+                                       [(now, key) for key, _ in rows])
+            for key, blob in rows:
+                vector = _decode(blob)
+                found[key] = vector
+                self._remember(key, vector)
+        return found
+
+    def _put_many(self, items: dict):
+        now = time.time()
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (key, vector, last_used) VALUES (?, ?, ?)",
+                    [(key, _encode(vector), now) for key, vector in items.items()]
+                )
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+            self._size += len(items)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        # Kilit altında çağrılır. Her eklemede silme yapmamak için kapasitenin %90'ına kadar boşaltılır.
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+        excess = self._size - int(self.max_size * 0.9)
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embedding_cache WHERE key IN "
+            "(SELECT key FROM embedding_cache ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self._size -= excess
+        self._stats["evictions"] += excess
+
+    def _embed(self, kind: str, texts: list[str], embed_missing) -> list[list[float]]:
+        keys = [self._key(kind, text) for text in texts]
+        try:
+            found = self._get_many(list(dict.fromkeys(keys)))
+        except sqlite3.Error as e:
+            print(f"⚠️ Embedding önbelleği okunamadı: {e}")
+            found = {}
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        with self._lock:
+            self._stats["hits"] += len(keys) - sum(1 for key in keys if key in missing)
+            self._stats["misses"] += len(missing)
+        if missing:
+            started_at = time.perf_counter()
+            vectors = embed_missing(list(missing.values()))
+            metrics.observe("embedding_request_latency", time.perf_counter() - started_at)
+            computed = dict(zip(missing, vectors))
+            found.update(computed)
+            try:
+                self._put_many(computed)
+            except sqlite3.Error as e:
+                print(f"⚠️ Embedding önbelleğine yazılamadı: {e}")
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embed("document", texts, self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed("query", [text], lambda texts: [self.embeddings.embed_query(texts[0])])[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / total, 4) if total else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._size,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_embedding_cache(embeddings):
+    """
+    EMBEDDING_CACHE_ENABLED açıksa modeli önbellekle sarar. Veritabanı burada açılmaz; ilk istekte açılamazsa
+    istekler önbelleksiz cevaplanır (bkz: CachedEmbeddings._embed).
+    """
+    if not EMBEDDING_CACHE_ENABLED or embeddings is None:
+        return embeddings
+    return CachedEmbeddings(embeddings)
@@ -0,0 +1,70 @@
+# Bu dosya, kullanıcı sorularını önbellek anahtarı için kanonik bir biçime indirger ve hızlı bir parmak izi üretir.
+# Aynı soruyu soran ama yazımı farklı olan mesajlar ("İADE SÜRESİ NE KADAR?", "acaba iade suresi ne kadar",
+# "ne kadar iade süresi lütfen") aynı anahtara düşer:
+# 1. Türkçe büyük/küçük harf dönüşümü (I -> ı, İ -> i; str.lower() "İ"yi "i̇" yapar ve "I"yı "i"ye çevirir)
+# 2. Aksan/diakritik katlama (ç, ğ, ı, ö, ş, ü -> c, g, i, o, s, u), böylece Türkçe klavyesiz yazılan sorular da eşleşir
+# 3. Anlam taşımayan dolgu ve bağlaç kelimelerinin atılması ("acaba", "lütfen", "mi", "bir" ...)
+# 4. Kelime sırasından bağımsızlık (kelimeler sıralanır ve tekrarlar atılır)
+# Parmak izi, standart kütüphanedeki blake2b (128 bit) ile üretilir. Bu anahtarlar diske, Redis'e ve indeks
+# manifestine yazıldığı için algoritma ortama (kurulu isteğe bağlı paketlere) göre DEĞİŞMEMELİDİR; aksi halde
+# farklı makinelerdeki replikalar birbirinin kayıtlarını bulamaz ve önbellekler gereksiz yere geçersiz olur.
+
+import hashlib
+import re
+import unicodedata
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Sık görülen harfler için zincirleme str.replace, str.translate'ten birkaç kat hızlıdır.
+_DIACRITIC_REPLACEMENTS = (
+    ("ç", "c"), ("ğ", "g"), ("ı", "i"), ("ö", "o"), ("ş", "s"), ("ü", "u"),
+    ("â", "a"), ("î", "i"), ("û", "u"),
+)
+
+# Aksanları katlanmış biçimde yazılır. Soru kelimeleri ("ne", "nasil", "kac", "hangi") ve olumsuzluk bildiren
+# kelimeler ("degil", "yok") anlamı değiştirdiği için bu listeye EKLENMEMELİDİR.
+STOPWORDS = frozenset({
+    # Soru ekleri ve bağlaçlar
+    "mi", "mu", "misin", "misiniz", "musun", "musunuz", "midir", "mudur",
+    "da", "de", "ki", "ve", "ile", "ya", "veya", "bir", "bu", "su", "o",
+    # Dolgu ve nezaket kelimeleri
+    "acaba", "lutfen", "rica", "ederim", "tesekkurler", "tesekkur", "merhaba", "selam", "hocam",
+    "peki", "yani", "sey", "simdi", "hani", "bakar", "soyler", "ogrenebilir", "ogrenmek", "istiyorum",
+    "bana", "ben", "benim", "size", "sizin", "sizde",
+})
+
+
+def turkish_casefold(text: str) -> str:
+    """Türkçe büyük I/İ harflerini doğru küçülterek metni küçük harfe çevirir."""
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def fold_diacritics(text: str) -> str:
+    """Türkçe karakterleri ve diğer aksanlı harfleri temel Latin harflerine indirger."""
+    for char, replacement in _DIACRITIC_REPLACEMENTS:
+        text = text.replace(char, replacement)
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def canonical_query(query: str) -> str:
+    """
+    Soruyu önbellek anahtarı için kanonik biçime getirir: küçük harf, aksansız, dolgu kelimesiz, sıralı kelimeler.
+    Soru sadece dolgu kelimelerinden oluşuyorsa ("merhaba"), farklı selamlaşmaların aynı anahtara düşmemesi için
+    kelimeler atılmadan kullanılır.
+    """
+    tokens = _WORD_PATTERN.findall(fold_diacritics(turkish_casefold(query)))
+    meaningful = {token for token in tokens if token not in STOPWORDS}
+    return " ".join(sorted(meaningful or set(tokens)))
+
+
+def fingerprint(text: str) -> str:
+    """Metnin 128 bitlik parmak izini (hex) döndürür; her ortamda aynı sonucu verir."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def query_fingerprint(query: str) -> str:
+    """Sorunun kanonik biçiminin parmak izi; SSS önbelleği ve istek birleştirme (single-flight) anahtarıdır."""
+    return fingerprint(canonical_query(query))
@@ -1,20 +1,42 @@
 # Bu dosya, tüm grafiğin paylaştığı durum (hafıza) yapısını tanımlar.
 
-import operator
 from typing import TypedDict, Annotated, Optional
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, RemoveMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+
+def append_messages(left: list[BaseMessage], right: list[BaseMessage]) -> list[BaseMessage]:
+    """
+    Yeni mesajları listeye ekler (operator.add gibi). Yeni liste RemoveMessage(id=REMOVE_ALL_MESSAGES) ile
+    başlıyorsa mevcut geçmiş, listenin geri kalanıyla değiştirilir; oturum geçmişini kırpmak için kullanılır.
+    """
+    if right and isinstance(right[0], RemoveMessage) and right[0].id == REMOVE_ALL_MESSAGES:
+        return list(right[1:])
+    return left + right
+
 
 class GraphState(TypedDict):
     """
     LangGraph akışının durumunu (hafızasını) tanımlayan yapı.
     Sohbet geçmişini bir mesaj listesi olarak tutar.
-    'operator.add' sayesinde, her adımda yeni mesajlar listeye eklenir.
+    'append_messages' sayesinde, her adımda yeni mesajlar listeye eklenir.
     """
-    messages: Annotated[list[BaseMessage], operator.add]
+    messages: Annotated[list[BaseMessage], append_messages]
     user_id: Optional[str]
+    # Çok turlu sohbetlerde oturum kimliği. Verilmezse her istek bağımsız (tek turlu) çalışır.
+    session_id: Optional[str]
+    # İsteğin son teslim zamanı (time.monotonic() cinsinden). Bkz: deadline.py
+    deadline: Optional[float]
+    # İsteğin kaynak kullanımı (model çağrısı, token, araç çağrısı) ve doldu ise dolan bütçe. Bkz: budget.py
+    usage: Optional[dict]
+    budget_exhausted: Optional[str]
     validated: bool = False
     validation_error: bool = False
     error: dict = None
     formatted: bool = False
     user_intent: str = None
-    cached: bool = False
\ No newline at end of file
+    cached: bool = False
+    # Önbellek cevabı kullanıcının kendi bölümünden geldi (sipariş araçlarıyla üretilmişti). Bkz: check_cache.py
+    cached_user_scoped: bool = False
+    # Bayat bir önbellek cevabını arka planda yenileyen çalıştırma; önbellek kontrolü atlanır. Bkz: revalidate.py
+    cache_refresh: bool = False
\ No newline at end of file
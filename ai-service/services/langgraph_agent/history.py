@@ -0,0 +1,145 @@
+# Bu dosya, çok turlu sohbetlerde modele gönderilecek mesaj penceresini bir token bütçesiyle sınırlar.
+# Sohbet ne kadar uzun sürerse sürsün, modele giden istem (prompt) boyutu sabit kalır.
+
+import os
+import re
+from functools import lru_cache
+from typing import Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage, trim_messages
+
+from .fingerprint import STOPWORDS, fold_diacritics, turkish_casefold
+
+# Geçmiş mesajlar için ayrılan token bütçesi (sistem talimatı ve içinde bulunulan tur dahil)
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "3000"))
+# Bir oturumun checkpointer'da saklanan en fazla tur (kullanıcı mesajı) sayısı
+CHAT_SESSION_MAX_TURNS = int(os.getenv("CHAT_SESSION_MAX_TURNS", "50"))
+
+# Her mesajın rol/yapı bilgisi için eklenen sabit token maliyeti
+TOKENS_PER_MESSAGE = 4
+
+# Oturumdaki bir mesajı önceki mesajlara bağlayan (aksanları katlanmış) kelimeler: zamirler ve gösterme sözleri
+# ("bunun", "onu", "aynisi", "digeri") ile konuyu sürdüren bağlaçlar ("peki", "ya", "ayrica").
+FOLLOW_UP_MARKERS = frozenset({
+    "bu", "bunu", "bunun", "buna", "bunda", "bundan", "bunlar", "bunlari", "bunlarin",
+    "su", "sunu", "sunun", "suna", "sunda", "sundan",
+    "o", "onu", "onun", "ona", "onda", "ondan", "onlar", "onlari", "onlarin",
+    "ayni", "aynisi", "diger", "digeri", "digerleri", "obur", "oburu",
+    "hangisi", "ikisi", "ikisinin", "ilki", "ilkinin", "sonuncusu",
+    "peki", "ya", "ayrica",
+})
+# Dolgu kelimeleri atıldıktan sonra bundan az kelime kalan mesajlar ("iadesi?", "kargo ücreti?") kendi başına
+# anlaşılamayacak kadar kısa sayılır.
+FOLLOW_UP_MIN_WORDS = 3
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """tiktoken kodlayıcısını ilk kullanımda yükler. Yüklenemezse (örn: ağ yoksa) None döner."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"⚠️ tiktoken kodlayıcısı yüklenemedi, yaklaşık token sayımı kullanılacak: {e}")
+        return None
+
+
+def count_tokens(messages: list[BaseMessage]) -> int:
+    """
+    Mesaj listesinin yaklaşık token sayısını hesaplar.
+    Gemini'nin kendi tokenizer'ı yerel olarak mevcut olmadığından tiktoken (cl100k_base) yaklaşık değer olarak kullanılır.
+    """
+    encoding = _get_encoding()
+    total = 0
+    for message in messages:
+        text = message.content if isinstance(message.content, str) else str(message.content)
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            text += str(tool_calls)
+        total += (len(encoding.encode(text)) if encoding else len(text) // 4) + TOKENS_PER_MESSAGE
+    return total
+
+
+def has_earlier_turns(state) -> bool:
+    """Oturumda son kullanıcı mesajından önce başka turlar var mı? (Model bu turları da görür.)"""
+    return sum(isinstance(message, HumanMessage) for message in state["messages"]) > 1
+
+
+def is_follow_up(state) -> bool:
+    """
+    Son mesaj, oturumdaki önceki mesajlara bağlı bir devam sorusu mu? (örn: "peki iadesi?", "bunun fiyatı ne?")
+    Karar mesajın kendisine göre verilir: önceki mesajlara gönderme yapan bir kelime içeren veya kendi başına
+    anlaşılamayacak kadar kısa mesajlar devam sorusudur. "iade süresi kaç gün?" gibi bağımsız sorular, oturumun
+    kaçıncı turunda sorulursa sorulsun önbellekten ve kural tabanlı yönlendiriciyle cevaplanabilir.
+    """
+    if not has_earlier_turns(state):
+        return False
+    last_human = next(message for message in reversed(state["messages"]) if isinstance(message, HumanMessage))
+    text = last_human.content if isinstance(last_human.content, str) else str(last_human.content)
+    tokens = _WORD_PATTERN.findall(fold_diacritics(turkish_casefold(text)))
+    if any(token in FOLLOW_UP_MARKERS for token in tokens):
+        return True
+    return len({token for token in tokens if token not in STOPWORDS}) < FOLLOW_UP_MIN_WORDS
+
+
+def _drop_unanswered_tool_calls(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """
+    Cevabı olmayan araç çağrılarını (örn: süre dolduğu veya istemci koptuğu için yarıda kalan bir tur) geçmişten çıkarır.
+    Gemini, bir araç çağrısından sonra mutlaka o aracın cevabını bekler; aksi halde istek hata verir.
+    """
+    answered_ids = {message.tool_call_id for message in messages if isinstance(message, ToolMessage)}
+    return [
+        message for message in messages
+        if not (isinstance(message, AIMessage) and message.tool_calls
+                and any(tool_call["id"] not in answered_ids for tool_call in message.tool_calls))
+    ]
+
+
+def prune_session_history(messages: list[BaseMessage], max_turns: int = CHAT_SESSION_MAX_TURNS) -> Optional[list[BaseMessage]]:
+    """
+    Oturum geçmişi 'max_turns' turdan uzunsa baştaki sistem talimatı ve en yeni 'max_turns' turdan oluşan
+    kırpılmış listeyi, değilse None döndürür. Kırpma tur başından yapıldığı için araç çağrısı/araç cevabı
+    çiftleri bölünmez.
+    """
+    human_indexes = [index for index, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if len(human_indexes) <= max_turns:
+        return None
+    system_messages = messages[:1] if messages and isinstance(messages[0], SystemMessage) else []
+    return system_messages + messages[human_indexes[-max_turns]:]
+
+
+def build_history_window(messages: list[BaseMessage], token_budget: int = CHAT_HISTORY_TOKEN_BUDGET) -> list[BaseMessage]:
+    """
+    Modele gönderilecek mesaj penceresini oluşturur:
+    - Baştaki sistem talimatı her zaman korunur.
+    - İçinde bulunulan tur (son kullanıcı mesajı ve sonrasındaki araç çıktıları) her zaman korunur.
+    - Kalan bütçeye sığan en yeni geçmiş turlar eklenir; pencere her zaman bir kullanıcı mesajıyla başlar,
+      böylece araç çağrısı/araç cevabı çiftleri bölünmez.
+    """
+    messages = _drop_unanswered_tool_calls(messages)
+    if count_tokens(messages) <= token_budget:
+        return messages
+
+    human_indexes = [index for index, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if not human_indexes:
+        return messages
+
+    system_messages = messages[:1] if isinstance(messages[0], SystemMessage) else []
+    current_turn = messages[human_indexes[-1]:]
+    history = messages[len(system_messages):human_indexes[-1]]
+
+    remaining_budget = token_budget - count_tokens(system_messages + current_turn)
+    window = []
+    if remaining_budget > 0 and history:
+        window = trim_messages(
+            history,
+            max_tokens=remaining_budget,
+            token_counter=count_tokens,
+            strategy="last",
+            start_on="human",
+            allow_partial=False,
+        )
+
+    print(f"✂️ Sohbet geçmişi kırpıldı: {len(history)} geçmiş mesajdan {len(window)} tanesi modele gönderiliyor.")
+    return system_messages + window + current_turn
@@ -0,0 +1,109 @@
+# Bu dosya, belge parçaları üzerinde tamamen yerel bir sözcüksel (BM25) arama indeksi tutar.
+# Vektör araması her soruda uzak embedding API'sine gider; API yavaşladığında veya erişilemediğinde belge
+# araması da durur. BM25 indeksi vektör deposuyla aynı parçalardan, süreç içinde ve ağ çağrısı yapmadan
+# oluşturulur; hibrit aramada vektör sonuçlarıyla birleştirilir, "lexical" modunda tek başına kullanılır (bkz: retrieval.py).
+#
+# Türkçe için sözcük ayırma:
+# 1. Türkçe büyük/küçük harf dönüşümü ve aksan katlama (fingerprint.py ile aynı; "İADE" = "iade", "ücret" = "ucret")
+# 2. Dolgu kelimelerinin atılması
+# 3. Hafif kök bulma: Türkçe eklemeli bir dil olduğu için "iadesi", "iadeler", "iade" aynı terime düşmelidir.
+#    Sık görülen çekim ekleri (çoğul, iyelik, hâl ekleri, soru eki) sondan en fazla iki kez atılır, sonra kelime
+#    ilk LEXICAL_STEM_LENGTH (varsayılan 5) harfine kırpılır ("gönderiyor", "gönderim" -> "gonde"). Sözlük
+#    gerektirmez; bazı kelimeler fazla kırpılabilir ama BM25 için isabeti belirgin şekilde artırır.
+
+import math
+import os
+import re
+from collections import Counter
+from threading import Lock
+from typing import Optional
+
+from .fingerprint import STOPWORDS, fold_diacritics, turkish_casefold
+
+LEXICAL_STEM_LENGTH = int(os.getenv("LEXICAL_STEM_LENGTH", "5"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Aksanları katlanmış biçimde, uzundan kısaya denenir. Ek atıldıktan sonra en az _MIN_STEM harf kalmalıdır.
+_SUFFIXES = sorted({
+    "lar", "ler", "lari", "leri",
+    "dan", "den", "tan", "ten", "nin", "nun", "in", "un",
+    "da", "de", "ta", "te", "ya", "ye", "yi", "yu",
+    "si", "su", "im", "um", "mi", "mu",
+    "a", "e", "i", "u",
+}, key=len, reverse=True)
+_MIN_STEM = 4
+
+
+def stem(token: str) -> str:
+    if not token.isalpha():
+        return token
+    for _ in range(2):
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+    return token[:LEXICAL_STEM_LENGTH]
+
+
+def tokenize(text: str) -> list[str]:
+    """Metni BM25 terimlerine ayırır: küçük harf, aksansız, dolgu kelimesiz ve kökü bulunmuş."""
+    tokens = _WORD_PATTERN.findall(fold_diacritics(turkish_casefold(text)))
+    return [stem(token) for token in tokens if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Belge parçaları üzerinde Okapi BM25 puanlamalı, bellek içi ters indeks."""
+    def __init__(self, documents: list, k1: float = BM25_K1, b: float = BM25_B, tokenizer=tokenize):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer
+        self._lengths: list[int] = []
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        for position, document in enumerate(documents):
+            terms = Counter(self.tokenizer(document.page_content))
+            self._lengths.append(sum(terms.values()))
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, []).append((position, frequency))
+        self._average_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        count = len(documents)
+        self._idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def search(self, query: str, k: int = 3) -> list[tuple]:
+        """Soruyla en az bir terimi paylaşan parçaları (parça, puan) olarak, puana göre azalan sırada döndürür."""
+        scores: dict[int, float] = {}
+        for term in set(self.tokenizer(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for position, frequency in postings:
+                normalization = self.k1 * (1 - self.b + self.b * self._lengths[position] / self._average_length)
+                scores[position] = scores.get(position, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + normalization)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.documents[position], score) for position, score in ranked]
+
+
+_index: Optional[BM25Index] = None
+_index_lock = Lock()
+
+
+def get_lexical_index() -> BM25Index:
+    """Belge parçalarından oluşturulan BM25 indeksini döndürür; ilk çağrıda (ağ çağrısı yapmadan) oluşturulur."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from .vector_store import document_chunks
+
+                _index = BM25Index(list(document_chunks().values()))
+                print(f"✅ Sözcüksel (BM25) indeks {len(_index.documents)} parça ile oluşturuldu.")
+    return _index
@@ -0,0 +1,62 @@
+# Bu dosya, sohbet akışının performans metriklerini (sayaçlar ve süre ölçümleri) süreç içinde tutar.
+# Router'lar ve düğümler buradaki tek 'metrics' nesnesini kullanır; değerler /ai/chat-metrics üzerinden okunur.
+
+import threading
+from collections import deque
+
+
+class MetricsRegistry:
+    """
+    Thread-safe, süreç içi sayaç ve süre ölçümü deposu.
+    Süre ölçümleri için son 'window' adet gözlem saklanır ve yüzdelikler bunlardan hesaplanır.
+    """
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._window = window
+        self._counters: dict[str, int] = {}
+        self._timings: dict[str, dict] = {}
+
+    def increment(self, name: str, value: int = 1):
+        """Bir sayacı artırır."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        """Bir süre ölçümünü (saniye cinsinden) kaydeder."""
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = {"count": 0, "total": 0.0, "max": 0.0, "samples": deque(maxlen=self._window)}
+                self._timings[name] = timing
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+            timing["samples"].append(seconds)
+
+    def snapshot(self) -> dict:
+        """Tüm metriklerin o anki değerlerini JSON'a çevrilebilir bir sözlük olarak döndürür."""
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {}
+            for name, timing in self._timings.items():
+                samples = sorted(timing["samples"])
+                timings[name] = {
+                    "count": timing["count"],
+                    "avg_ms": round(timing["total"] / timing["count"] * 1000, 2),
+                    "p50_ms": round(_percentile(samples, 0.50) * 1000, 2),
+                    "p95_ms": round(_percentile(samples, 0.95) * 1000, 2),
+                    "p99_ms": round(_percentile(samples, 0.99) * 1000, 2),
+                    "max_ms": round(timing["max"] * 1000, 2),
+                }
+        return {"counters": counters, "timings": timings}
+
+
+def _percentile(sorted_samples: list[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+# Uygulama boyunca paylaşılan tek metrik deposu
+metrics = MetricsRegistry()
@@ -7,11 +7,12 @@ fonksiyonu olarak sunar.
 """
 
 # Her düğümü ve yardımcı fonksiyonu kendi modülünden import et
-from .check_cache import check_cache
-from .cache_final_answer import cache_final_answer
-from .summarize_tool_outputs import summarize_tool_outputs
-from .call_model import call_model
-from .validate_input import validate_input
+from .check_cache import check_cache, acheck_cache
+from .cache_final_answer import cache_final_answer, acache_final_answer
+from .summarize_tool_outputs import summarize_tool_outputs, asummarize_tool_outputs
+from .call_model import call_model, acall_model
+from .validate_input import validate_input, avalidate_input
+from .route_intent import route_intent, aroute_intent
 from .enhanced_should_continue import enhanced_should_continue
 
 # Orkestratörde kolay kullanım için düğümleri bir SÖZLÜK içinde toplayalım.
@@ -20,14 +21,27 @@ from .enhanced_should_continue import enhanced_should_continue
 all_nodes = {
     "cache": check_cache,
     "validate": validate_input,
+    "route": route_intent,
     "agent": call_model,  # Bu düğüm orkestratörde özel olarak ele alınacak
     "summarize": summarize_tool_outputs,
     "cache_and_end": cache_final_answer,
 }
 
+# Aynı düğümlerin asenkron versiyonları. Anahtarlar 'all_nodes' ile birebir aynıdır;
+# orkestratör her düğümü senkron ve asenkron versiyonuyla birlikte grafiğe ekler.
+all_async_nodes = {
+    "cache": acheck_cache,
+    "validate": avalidate_input,
+    "route": aroute_intent,
+    "agent": acall_model,  # Bu düğüm orkestratörde özel olarak ele alınacak
+    "summarize": asummarize_tool_outputs,
+    "cache_and_end": acache_final_answer,
+}
+
 # Dışa aktarılacakları belirtelim.
 # enhanced_should_continue bir düğüm değil, bir kenar (edge) koşulu olduğu için ayrı tutuyoruz.
 __all__ = [
     "all_nodes",
+    "all_async_nodes",
     "enhanced_should_continue"
 ]
\ No newline at end of file
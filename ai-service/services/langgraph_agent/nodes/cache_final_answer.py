@@ -1,20 +1,69 @@
-from langchain_core.messages import AIMessage, HumanMessage
+import asyncio
+from typing import Optional
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 # DİKKAT: `check_cache` içinde oluşturulan aynı cache_manager nesnesini ve yardımcı fonksiyonları kullanıyoruz.
 from .check_cache import cache_manager, generate_query_hash
+from .semantic_cache import semantic_cache
+from .persistent_cache import PersistentCacheManager, FAQ_CACHE_DOCUMENT_TTL
+from .user_cache import user_answer_cache
 from ..graph_state import GraphState
+from ..tools import USER_SCOPED_TOOL_NAMES, DOCUMENT_TOOL_NAMES
+from ..history import has_earlier_turns
+from ..provenance import tool_tag, is_document_tag
+
+
+def answer_provenance(messages: list) -> tuple[list[str], Optional[int]]:
+    """
+    Son kullanıcı mesajından bu yana çağrılan araçların ve belge aramasının döndürdüğü parçaların kaynak
+    etiketlerini toplar. Cevap sadece belgelere dayanıyorsa daha uzun belge TTL'ini, değilse None döndürür.
+    """
+    called_tool_names, sources = set(), set()
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, AIMessage) and message.tool_calls:
+            called_tool_names.update(call['name'] for call in message.tool_calls)
+        elif isinstance(message, ToolMessage) and isinstance(message.artifact, dict):
+            sources.update(message.artifact.get("sources", ()))
+    sources.update(tool_tag(name) for name in called_tool_names)
+
+    document_only = called_tool_names and called_tool_names <= DOCUMENT_TOOL_NAMES
+    ttl = FAQ_CACHE_DOCUMENT_TTL if document_only and any(map(is_document_tag, sources)) else None
+    return sorted(sources), ttl
+
 
 def cache_final_answer(state: GraphState) -> dict:
     """Grafiğin sonunda, nihai AI yanıtını önbelleğe alır."""
+    # Oturumun sonraki turlarında model önceki mesajları da gördüğü için cevap, soru kendi başına anlaşılır görünse
+    # bile bağlama dayanabilir ("ürünün fiyatı nedir?"); sadece soru metniyle önbelleğe alınamaz. Bu turlardaki
+    # bağımsız sorular yine de önbellekten cevaplanır (bkz: history.is_follow_up, check_cache).
+    if has_earlier_turns(state):
+        return {}
+
+    # İşlem bütçesi dolduğu için verilen geçici cevaplar önbelleğe alınmaz.
+    if state.get("budget_exhausted"):
+        return {}
+
     # ... (cache_final_answer fonksiyonunun tüm içeriği buraya, değişiklik yok) ...
+    # Son kullanıcı mesajından bu yana yapılan TÜM araç çağrılarını topla (birden fazla araç turu olabilir).
     tool_calls = []
     for message in reversed(state["messages"]):
-        if isinstance(message, AIMessage) and message.tool_calls:
-            tool_calls = message.tool_calls
+        if isinstance(message, HumanMessage):
             break
+        if isinstance(message, AIMessage) and message.tool_calls:
+            tool_calls.extend(message.tool_calls)
     called_tool_names = {call['name'] for call in tool_calls}
     if 'get_stock_info_tool' in called_tool_names: # Varsayımsal stok aracı
         print("ℹ️ Yanıt, anlık bilgi içerdiği için önbelleğe alınmayacak.")
         return {}
+
+    # GÜVENLİK: Kullanıcıya özel sipariş araçlarından üretilen cevaplar sadece soru metniyle
+    # anahtarlanan ortak önbelleğe yazılmaz; aksi halde başka bir kullanıcıya sızabilirdi.
+    # Bunun yerine kısa süreli olarak kullanıcının bellek içi kendi bölümüne (bkz: user_cache.py) yazılır.
+    user_scoped = bool(called_tool_names & USER_SCOPED_TOOL_NAMES)
+    if user_scoped and not state.get("user_id"):
+        print("🔒 Yanıt kullanıcıya özel veri içerdiği için ortak önbelleğe alınmayacak.")
+        return {}
         
     last_message = state["messages"][-1]
     if isinstance(last_message, AIMessage) and last_message.content:
@@ -28,6 +77,25 @@ def cache_final_answer(state: GraphState) -> dict:
         if user_messages:
             last_user_query = user_messages[-1].content
             query_hash = generate_query_hash(last_user_query)
-            cache_manager.set(query_hash, last_message.content)
+            sources, ttl = answer_provenance(state["messages"])
+            if user_scoped:
+                user_answer_cache.set(state["user_id"], query_hash, last_message.content)
+                print(f"🔒 Kullanıcıya özel önbelleğe eklendi: '{last_user_query}'")
+                return {}
+            cache_manager.set(query_hash, last_message.content, sources=sources, ttl=ttl)
+            if semantic_cache is not None:
+                semantic_cache.add(last_user_query, query_hash)
             print(f"💾 Önbelleğe eklendi: '{last_user_query}'")
-    return {}
\ No newline at end of file
+    return {}
+
+
+async def acache_final_answer(state: GraphState) -> dict:
+    """
+    cache_final_answer düğümünün asenkron versiyonu.
+    Yerel önbellekte yazmalar bellekte biriktirilip arka planda diske yazıldığı (write-behind) için doğrudan çağrılır.
+    Paylaşımlı önbellek (Redis), anlamsal katman (embedding) veya write-behind kapalıyken (disk) yazma
+    ağ/disk turu gerektirdiğinden event loop'u bloklamamak için bir iş parçacığı kullanılır.
+    """
+    if isinstance(cache_manager, PersistentCacheManager) and cache_manager.write_behind and semantic_cache is None:
+        return cache_final_answer(state)
+    return await asyncio.to_thread(cache_final_answer, state)
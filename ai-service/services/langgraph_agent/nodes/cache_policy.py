@@ -0,0 +1,147 @@
+# Bu dosya, SSS önbelleğinin hangi kaydı tutup hangisini çıkaracağına karar veren politikaları içerir.
+# Politikalar sadece anahtarların sırasını/sıklığını yönetir; değerler PersistentCacheManager'da tutulur.
+#
+# - LRUPolicy: En uzun süredir kullanılmayan kayıt çıkarılır. Her işlem O(1).
+# - WTinyLFUPolicy: Yeni kayıtlar küçük bir "pencere" LRU'suna girer. Pencereden taşan aday, ana bölümden
+#   çıkarılacak kayıtla sıklık bakımından karşılaştırılır ve sadece daha sık sorulmuşsa içeri alınır.
+#   Böylece bir defalık soruların oluşturduğu bir dalga, sık sorulan SSS cevaplarını önbellekten atamaz.
+
+from collections import OrderedDict
+
+
+class CountMinSketch:
+    """
+    Anahtarların erişim sıklığını sabit bellekle yaklaşık olarak tutan yapı (TinyLFU).
+    Sayaçlar 15'te doyar ve toplam 'sample_size' artıştan sonra yarıya indirilir (yaşlandırma);
+    böylece eskiden popüler olan ama artık sorulmayan sorular zamanla önceliğini kaybeder.
+    Küçük önbelleklerde de sıklıkların ayırt edilebilmesi için genişlik ve örnek boyutu alt sınırlıdır
+    (bir defalık sorular, dar bir tabloda popüler soruların sayaçlarıyla çakışır).
+    """
+    DEPTH = 4
+    MAX_COUNT = 15
+    MIN_WIDTH = 8192
+    MIN_SAMPLE_SIZE = 20_000
+
+    def __init__(self, capacity: int):
+        width = 1
+        while width < max(self.MIN_WIDTH, capacity):
+            width <<= 1
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in range(self.DEPTH)]
+        self._sample_size = max(10 * capacity, self.MIN_SAMPLE_SIZE)
+        self._additions = 0
+
+    def _indexes(self, key: str):
+        # Satırlar birbirinden bağımsız olmalıdır: hash((seed, key)) kullanıldığında bir satırda çakışan iki anahtar
+        # tüm satırlarda çakışıyordu. Bunun yerine 64 bitlik hash'in iki yarısıyla çift hashleme yapılır.
+        hashed = hash(key) & 0xFFFFFFFFFFFFFFFF
+        low, high = hashed & 0xFFFFFFFF, hashed >> 32
+        for seed in range(self.DEPTH):
+            yield seed, (low + seed * high) & self._mask
+
+    def increment(self, key: str):
+        for row, index in self._indexes(key):
+            if self._rows[row][index] < self.MAX_COUNT:
+                self._rows[row][index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._age()
+
+    def estimate(self, key: str) -> int:
+        return min(self._rows[row][index] for row, index in self._indexes(key))
+
+    def _age(self):
+        for row in self._rows:
+            row[:] = bytes(count >> 1 for count in row)
+        self._additions //= 2
+
+
+class LRUPolicy:
+    """En uzun süredir kullanılmayan kaydı çıkaran O(1) politika."""
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._order: OrderedDict[str, None] = OrderedDict()
+
+    def record_access(self, key: str):
+        """Bir anahtar sorgulandığında (isabet olsun olmasın) çağrılır."""
+
+    def on_hit(self, key: str):
+        self._order.move_to_end(key)
+
+    def on_insert(self, key: str) -> list[str]:
+        """Yeni bir anahtar eklendiğinde çağrılır. Önbellekten çıkarılması gereken anahtarları döndürür."""
+        if key in self._order:
+            self._order.move_to_end(key)
+            return []
+        self._order[key] = None
+        evicted = []
+        while len(self._order) > self.capacity:
+            evicted.append(self._order.popitem(last=False)[0])
+        return evicted
+
+    def on_remove(self, key: str):
+        self._order.pop(key, None)
+
+
+class WTinyLFUPolicy:
+    """
+    Window-TinyLFU politikası (basitleştirilmiş).
+    - Pencere (kapasitenin ~%1'i): Yeni kayıtlar buraya girer; yeni bir soru en az bir kez önbellekte şans bulur.
+    - Ana bölüm: Pencereden taşan aday, ana bölümün en eski kaydıyla (kurban) karşılaştırılır;
+      adayın tahmini sıklığı kurbanınkinden büyükse kurban çıkarılır, değilse aday çıkarılır.
+    Tüm işlemler O(1)'dir (sıklık tahmini sabit sayıda hash ile yapılır).
+    """
+    def __init__(self, capacity: int, window_ratio: float = 0.01):
+        self.capacity = capacity
+        self.window_capacity = max(1, int(capacity * window_ratio))
+        self.main_capacity = max(0, capacity - self.window_capacity)
+        self.sketch = CountMinSketch(capacity)
+        self._window: OrderedDict[str, None] = OrderedDict()
+        self._main: OrderedDict[str, None] = OrderedDict()
+        self.rejections = 0
+
+    def record_access(self, key: str):
+        self.sketch.increment(key)
+
+    def on_hit(self, key: str):
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._main:
+            self._main.move_to_end(key)
+
+    def on_insert(self, key: str) -> list[str]:
+        if key in self._window or key in self._main:
+            self.on_hit(key)
+            return []
+
+        self._window[key] = None
+        if len(self._window) <= self.window_capacity:
+            return []
+
+        candidate = self._window.popitem(last=False)[0]
+        if len(self._main) < self.main_capacity:
+            self._main[candidate] = None
+            return []
+
+        victim = next(iter(self._main), None)
+        if victim is not None and self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            del self._main[victim]
+            self._main[candidate] = None
+            return [victim]
+
+        # Aday yeterince sık sorulmamış; ana bölüme alınmadan çıkarılır (admission reddi).
+        self.rejections += 1
+        return [candidate]
+
+    def on_remove(self, key: str):
+        self._window.pop(key, None)
+        self._main.pop(key, None)
+
+
+def create_cache_policy(name: str, capacity: int):
+    """Ayar adına göre bir önbellek politikası oluşturur: 'tinylfu' veya 'lru'."""
+    if name == "tinylfu":
+        return WTinyLFUPolicy(capacity)
+    if name == "lru":
+        return LRUPolicy(capacity)
+    raise ValueError(f"Bilinmeyen önbellek politikası: '{name}'")
@@ -0,0 +1,316 @@
+# Bu dosya, PersistentCacheManager'ın kalıcı depolama katmanlarını (backend) içerir.
+# Önbellek okumaları her zaman bellekten yapılır; depolama katmanı sadece kayıtların yeniden başlatmalarda
+# kaybolmaması için kullanılır. Her katman tek bir kaydı O(1) maliyetle yazar/siler.
+#
+# - SQLiteCacheStorage (varsayılan): WAL modunda SQLite. Her yazma kendi işleminde (transaction) atomiktir.
+# - AppendOnlyLogCacheStorage: Satır satır JSON ekleme günlüğü. Günlük büyüdükçe atomik olarak sıkıştırılır.
+# - MemoryCacheStorage: Hiçbir şey kalıcı yazılmaz (simülasyon ve geçici kullanım için).
+# - JsonFileCacheStorage: Eski format (her yazmada tüm dosya yeniden yazılır). Sadece uyumluluk ve kıyaslama içindir.
+
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Optional
+
+
+class CacheStorage(ABC):
+    """
+    Depolama katmanlarının ortak arayüzü. Kayıtlar {"response": ..., "timestamp": ...} biçimindeki sözlüklerdir;
+    isteğe bağlı olarak "sources" (kaynak etiketleri) ve "ttl" (kayda özel süre) alanlarını da taşıyabilir.
+    Tüm metotlar thread-safe olmalıdır.
+    """
+    @abstractmethod
+    def load(self) -> dict:
+        """Tüm kayıtları {anahtar: kayıt} olarak döndürür. Sadece başlangıçta çağrılır."""
+
+    @abstractmethod
+    def put(self, key: str, entry: dict):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    def delete_many(self, keys: list[str]):
+        for key in keys:
+            self.delete(key)
+
+    def write_batch(self, puts: dict, deletes: list[str]):
+        """Biriktirilmiş yazma/silmeleri tek seferde uygular (write-behind boşaltması)."""
+        for key, entry in puts.items():
+            self.put(key, entry)
+        if deletes:
+            self.delete_many(deletes)
+
+    def close(self):
+        pass
+
+
+class SQLiteCacheStorage(CacheStorage):
+    """
+    WAL modundaki bir SQLite veritabanında her kaydı ayrı bir satır olarak tutar.
+    WAL, yazarken okumayı engellemez ve yarıda kalan bir yazma (örn: süreç çöktü) veritabanını bozmaz.
+    synchronous=NORMAL ile her yazmada fsync yapılmaz; elektrik kesintisinde en son birkaç yazma kaybolabilir
+    ama veritabanı her zaman tutarlı kalır (önbellek için kabul edilebilir bir ödünleşim).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS faq_cache ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " timestamp REAL NOT NULL,"
+            " ttl REAL,"
+            " sources TEXT)"
+        )
+        # Kaynak etiketlerinden önce oluşturulmuş veritabanlarına yeni sütunlar eklenir.
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(faq_cache)")}
+        for column, column_type in (("ttl", "REAL"), ("sources", "TEXT")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE faq_cache ADD COLUMN {column} {column_type}")
+
+    @staticmethod
+    def _row(key: str, entry: dict) -> tuple:
+        sources = entry.get("sources")
+        return (key, json.dumps(entry["response"], ensure_ascii=False), entry["timestamp"], entry.get("ttl"),
+                json.dumps(sources, ensure_ascii=False) if sources else None)
+
+    @staticmethod
+    def _entry(response: str, timestamp: float, ttl: Optional[float], sources: Optional[str]) -> dict:
+        entry = {"response": json.loads(response), "timestamp": timestamp}
+        if ttl is not None:
+            entry["ttl"] = ttl
+        if sources:
+            entry["sources"] = json.loads(sources)
+        return entry
+
+    def load(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, response, timestamp, ttl, sources FROM faq_cache").fetchall()
+        return {key: self._entry(*fields) for key, *fields in rows}
+
+    def put(self, key: str, entry: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO faq_cache (key, response, timestamp, ttl, sources) VALUES (?, ?, ?, ?, ?)",
+                self._row(key, entry)
+            )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM faq_cache WHERE key = ?", (key,))
+
+    def delete_many(self, keys: list[str]):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM faq_cache WHERE key = ?", [(key,) for key in keys])
+            self._conn.execute("COMMIT")
+
+    def write_batch(self, puts: dict, deletes: list[str]):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO faq_cache (key, response, timestamp, ttl, sources) VALUES (?, ?, ?, ?, ?)",
+                [self._row(key, entry) for key, entry in puts.items()]
+            )
+            self._conn.executemany("DELETE FROM faq_cache WHERE key = ?", [(key,) for key in deletes])
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class AppendOnlyLogCacheStorage(CacheStorage):
+    """
+    Her yazmayı/silmeyi dosyanın sonuna bir JSON satırı olarak ekler; dosya hiçbir zaman yerinde değiştirilmez.
+    Günlükteki satır sayısı canlı kayıt sayısının 'compact_ratio' katını geçtiğinde, canlı kayıtlar geçici bir
+    dosyaya yazılır ve os.replace ile atomik olarak eski günlüğün yerine konur.
+    Çökme anında yarım kalan son satır, yükleme sırasında yok sayılır.
+    """
+    def __init__(self, path: str, compact_ratio: float = 2.0, min_compact_lines: int = 1000):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.min_compact_lines = min_compact_lines
+        self._lock = Lock()
+        self._live: dict = {}
+        self._line_count = 0
+        self._file = None
+
+    def load(self) -> dict:
+        with self._lock:
+            self._live = {}
+            self._line_count = 0
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # Yarım kalmış son satır
+                        self._line_count += 1
+                        if record.get("op") == "del":
+                            self._live.pop(record["key"], None)
+                        else:
+                            key = record.pop("key")
+                            record.pop("op", None)
+                            self._live[key] = record
+            self._file = open(self.path, "a", encoding="utf-8")
+            return dict(self._live)
+
+    def _append(self, record: dict, flush: bool = True):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._line_count += 1
+        if flush:
+            self._file.flush()
+            if self._line_count > self.min_compact_lines and self._line_count > self.compact_ratio * max(1, len(self._live)):
+                self._compact()
+
+    def _compact(self):
+        """Günlüğü sadece canlı kayıtlardan oluşacak şekilde atomik olarak yeniden yazar."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for key, entry in self._live.items():
+                f.write(json.dumps({"op": "set", "key": key, **entry}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._line_count = len(self._live)
+
+    def put(self, key: str, entry: dict):
+        with self._lock:
+            self._live[key] = entry
+            self._append({"op": "set", "key": key, **entry})
+
+    def delete(self, key: str):
+        with self._lock:
+            if self._live.pop(key, None) is not None:
+                self._append({"op": "del", "key": key})
+
+    def write_batch(self, puts: dict, deletes: list[str]):
+        with self._lock:
+            records = [{"op": "set", "key": key, **entry} for key, entry in puts.items()]
+            for key in deletes:
+                if self._live.pop(key, None) is not None:
+                    records.append({"op": "del", "key": key})
+            self._live.update(puts)
+            for index, record in enumerate(records):
+                self._append(record, flush=index == len(records) - 1)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class MemoryCacheStorage(CacheStorage):
+    """Kalıcılığı olmayan depolama katmanı. Önbellek zaten bellekte tutulduğu için yazmalar yok sayılır."""
+    def load(self) -> dict:
+        return {}
+
+    def put(self, key: str, entry: dict):
+        pass
+
+    def delete(self, key: str):
+        pass
+
+
+class JsonFileCacheStorage(CacheStorage):
+    """
+    Eski faq_cache.json biçimi: her değişiklikte tüm önbellek dosyaya yeniden yazılır (O(n)).
+    Yazma artık geçici bir dosya + os.replace ile atomiktir; yine de sadece uyumluluk ve kıyaslama için tutulur.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+        self._entries: dict = {}
+
+    def load(self) -> dict:
+        with self._lock:
+            self._entries = read_json_cache_file(self.path)
+            return dict(self._entries)
+
+    def _flush(self):
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except IOError as e:
+            print(f"❌ Önbellek dosyası yazılamadı: {e}")
+
+    def put(self, key: str, entry: dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._flush()
+
+    def delete(self, key: str):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._flush()
+
+    def delete_many(self, keys: list[str]):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+            self._flush()
+
+    def write_batch(self, puts: dict, deletes: list[str]):
+        with self._lock:
+            self._entries.update(puts)
+            for key in deletes:
+                self._entries.pop(key, None)
+            self._flush()
+
+
+def read_json_cache_file(path: str) -> dict:
+    """Eski faq_cache.json dosyasını okur. Dosya yoksa veya bozuksa boş sözlük döner."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+
+def create_cache_storage(backend: str, path: Optional[str] = None) -> CacheStorage:
+    """Ayar adına göre bir depolama katmanı oluşturur: 'sqlite', 'log', 'json' veya 'memory'."""
+    if backend == "sqlite":
+        return SQLiteCacheStorage(path or "faq_cache.db")
+    if backend == "log":
+        return AppendOnlyLogCacheStorage(path or "faq_cache.log")
+    if backend == "json":
+        return JsonFileCacheStorage(path or "faq_cache.json")
+    if backend == "memory":
+        return MemoryCacheStorage()
+    raise ValueError(f"Bilinmeyen önbellek depolama katmanı: '{backend}'")
+
+
+def retire_json_cache(json_path: str) -> int:
+    """
+    Eski faq_cache.json dosyasını devreden çıkarır. Bu dosyanın anahtarları eski biçimdedir (normalleştirilmiş
+    sorunun MD5'i) ve kayıtlar soru metnini içermez; yeni anahtar biçimine (bkz: fingerprint.py) çevrilemezler.
+    Aktarılsalar hiçbir aramada bulunamaz, sadece önbellek kapasitesini işgal ederlerdi; kaynak etiketi de
+    taşımadıkları için belge değiştiğinde silinemezlerdi. Bu yüzden aktarılmaz, dosya '<ad>.migrated' olarak
+    yeniden adlandırılır (böylece kontrol bir kez yapılır). Kayıt yoksa dosyaya dokunulmaz.
+    Devreden çıkarılan kayıt sayısını döndürür.
+    """
+    entries = read_json_cache_file(json_path)
+    if not entries:
+        return 0
+    os.replace(json_path, f"{json_path}.migrated")
+    print(f"📦 Önbellek anahtar biçimi değiştiği için '{json_path}' dosyasındaki {len(entries)} eski kayıt aktarılmadı; "
+          f"dosya '{json_path}.migrated' olarak saklandı.")
+    return len(entries)
@@ -1,20 +1,69 @@
 # app/nodes/call_model.py
 
+import asyncio
+
 from ..graph_state import GraphState
+from ..history import build_history_window
+from ..deadline import check_deadline, DeadlineExceeded
+from ..metrics import metrics
+from ..budget import get_usage, exhausted_llm_budget, record_llm_call, budget_exhausted_answer
 
-def call_model(state: GraphState, model_with_tools):
+def call_model(state: GraphState, model_with_tools, config=None):
     """
     LLM'i (yapay zeka modelini) çağıran ana düğüm.
     Modeli dışarıdan parametre olarak alarak daha esnek bir yapı sunar.
     Bu düğüm, orkestratörde lambda ile sarılarak model parametresini alır.
+    'config', LangGraph'ın callback'lerini (token akışı) modele iletmek için aktarılır.
     """
     print("🤖 Model Çağrılıyor...")
+
+    # Senkron çağrı yarıda kesilemez; en azından süresi dolmuş bir istek için modeli hiç çağırmıyoruz.
+    check_deadline(state, "model")
+
+    # İsteğin model/token bütçesi dolduysa modeli çağırmadan nihai bir cevapla bitir.
+    usage = get_usage(state)
+    exhausted = exhausted_llm_budget(usage)
+    if exhausted:
+        return {"messages": [budget_exhausted_answer(state, exhausted)], "budget_exhausted": exhausted}
     
-    # Mevcut sohbet geçmişini al
-    messages = state["messages"]
+    # Mevcut sohbet geçmişini, token bütçesine sığacak şekilde kırparak al
+    messages = build_history_window(state["messages"])
     
     # Modeli bu geçmişle çağır ve yanıtını al
-    response = model_with_tools.invoke(messages)
+    response = model_with_tools.invoke(messages, config=config)
     
     # Gelen yanıtı mesaj listesine eklenmek üzere döndür
-    return {"messages": [response]}
\ No newline at end of file
+    return {"messages": [response], "usage": record_llm_call(usage, messages, response)}
+
+
+async def acall_model(state: GraphState, model_with_tools, config=None):
+    """
+    call_model düğümünün asenkron versiyonu.
+    Model 'ainvoke' ile çağrılır; böylece bir Gemini çağrısı beklenirken event loop
+    diğer sohbetleri işlemeye devam edebilir.
+    """
+    print("🤖 Model Çağrılıyor (async)...")
+
+    # Model çağrısı isteğin kalan süresiyle sınırlanır; süre dolarsa çağrı iptal edilir.
+    remaining = check_deadline(state, "model")
+
+    usage = get_usage(state)
+    exhausted = exhausted_llm_budget(usage)
+    if exhausted:
+        return {"messages": [budget_exhausted_answer(state, exhausted)], "budget_exhausted": exhausted}
+
+    messages = build_history_window(state["messages"])
+    try:
+        response = await asyncio.wait_for(
+            model_with_tools.ainvoke(messages, config=config),
+            timeout=remaining
+        )
+    except asyncio.TimeoutError:
+        metrics.increment("model_calls_cancelled")
+        raise DeadlineExceeded("model")
+    except asyncio.CancelledError:
+        # İstemci bağlantısı koptu veya üst seviyede süre doldu
+        metrics.increment("model_calls_cancelled")
+        raise
+
+    return {"messages": [response], "usage": record_llm_call(usage, messages, response)}
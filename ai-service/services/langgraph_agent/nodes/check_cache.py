@@ -1,37 +1,93 @@
-import hashlib
-import re
+import asyncio
 from langchain_core.messages import AIMessage
 
 # DİKKAT: Göreceli importlar
-from .persistent_cache import PersistentCacheManager
+from .shared_cache import SharedCacheManager, create_faq_cache_manager
+from .semantic_cache import semantic_cache
 from ..graph_state import GraphState
+from ..fingerprint import canonical_query, query_fingerprint
+from ..history import is_follow_up
+from ..revalidate import cache_revalidator
+from .user_cache import user_answer_cache
 
 # Bu nesne, uygulama çalıştığı sürece bir kez oluşturulur ve tüm cache düğümleri tarafından kullanılır.
-cache_manager = PersistentCacheManager()
+# FAQ_CACHE_BACKEND=redis ise tüm worker'lar ve replikalar aynı önbelleği paylaşır (bkz: shared_cache.py).
+cache_manager = create_faq_cache_manager()
 
 def normalize_query(query: str) -> str:
-    """Kullanıcı sorgusunu önbellek araması için normalleştirir."""
-    normalized = re.sub(r'[^\w\s]', '', query.lower())
-    return " ".join(normalized.split())
+    """Kullanıcı sorgusunu önbellek araması için normalleştirir (Türkçe harf/aksan katlama, dolgu kelimeleri, kelime sırası)."""
+    return canonical_query(query)
 
 def generate_query_hash(query: str) -> str:
-    """Normalleştirilmiş sorgudan benzersiz bir hash oluşturur."""
-    return hashlib.md5(normalize_query(query).encode('utf-8')).hexdigest()
+    """Normalleştirilmiş sorgudan benzersiz bir hash oluşturur (bkz: fingerprint.py)."""
+    return query_fingerprint(query)
+
+def semantic_lookup(query: str, query_hash: str):
+    """
+    Birebir ıskada, anlamca en yakın önbelleğe alınmış sorunun cevabını arar.
+    Bulunan cevap, aynı soru tekrar sorulduğunda embedding hesaplanmasın diye bu sorunun anahtarıyla da önbelleğe yazılır.
+    """
+    match = semantic_cache.lookup(query, query_hash)
+    if match is None:
+        return None
+    matched_hash, similarity = match
+    cached_response = cache_manager.get(matched_hash)
+    if cached_response is None:
+        # Eşleşen cevabın süresi dolmuş veya önbellekten çıkarılmış.
+        semantic_cache.remove(matched_hash)
+        return None
+    print(f"🧲 Anlamsal önbellek HIT (benzerlik={similarity:.3f}): '{query}'")
+    # Kopya, belge değiştiğinde asıl kayıtla birlikte silinsin diye aynı kaynak etiketlerini taşır.
+    sources, ttl = cache_manager.provenance(matched_hash)
+    cache_manager.set(query_hash, cached_response, sources=sources, ttl=ttl)
+    return cached_response
 
 def check_cache(state: GraphState) -> dict:
     """Sık sorulan sorular için önbellek kontrolü yapar."""
+    # Oturum içindeki devam soruları (örn: "peki iadesi?") önceki mesajlara bağlıdır; önbellekten cevaplanamaz.
+    # Oturumun sonraki turlarında sorulan bağımsız sorular ise önbellekten cevaplanır.
+    # Bayat cevabı yenileyen çalıştırma da önbelleği atlar, aksi halde aynı bayat cevabı geri okurdu.
+    if is_follow_up(state) or state.get("cache_refresh"):
+        return {}
     last_message = state["messages"][-1]
     if not isinstance(last_message, AIMessage) and hasattr(last_message, 'content'):
         query = last_message.content
         query_hash = generate_query_hash(query)
-        cached_response = cache_manager.get(query_hash)
-        
+        user_id = state.get("user_id")
+        # Önce tüm kullanıcıların paylaştığı genel bölüme (belge ve katalog cevapları), ıska olursa kullanıcının
+        # bellek içi kendi bölümüne (bkz: user_cache.py) bakılır.
+        cached_response, stale = cache_manager.lookup(query_hash, record_miss=not user_id)
+        if stale:
+            # Stale-while-revalidate: bayat cevap hemen verilir, soru arka planda yeniden cevaplanır.
+            print(f"🕰️ Önbellek cevabı bayat, arka planda yenilenecek: '{query}'")
+            cache_revalidator.schedule(query, query_hash)
+        user_scoped = False
+        if not cached_response and user_id:
+            # Kullanıcıya özel cevaplar bayat verilmez; yenileme servis kimliğiyle çalışırdı.
+            cached_response = user_answer_cache.get(user_id, query_hash)
+            user_scoped = cached_response is not None
+        if not cached_response and semantic_cache is not None:
+            cached_response = semantic_lookup(query, query_hash)
+
         if cached_response:
             print(f"🎯 Önbellek HIT: '{query}'")
             return {
                 "messages": [AIMessage(content=f"{cached_response}")],
-                "cached": True
+                "cached": True,
+                "cached_user_scoped": user_scoped
             }
         
         print(f"❓ Önbellek MISS: '{query}'")
-    return {}
\ No newline at end of file
+    return {}
+
+
+async def acheck_cache(state: GraphState) -> dict:
+    """
+    check_cache düğümünün asenkron versiyonu.
+    Yerel önbellekte okumalar tamamen bellekten yapıldığı için doğrudan senkron fonksiyon çağrılır.
+    Paylaşımlı önbellekte L1 ıskası Redis'e, anlamsal katmanda ise embedding modeline ağ turu gerektirdiğinden,
+    event loop'u bloklamamak için bir iş parçacığı kullanılır.
+    """
+    if isinstance(cache_manager, SharedCacheManager) or semantic_cache is not None:
+        return await asyncio.to_thread(check_cache, state)
+    return check_cache(state)
@@ -1,54 +1,333 @@
-import json
+import asyncio
 import os
 import time
-from threading import Lock
+from pathlib import Path
+from threading import Event, Lock
+from typing import Optional
+
+from .cache_storage import CacheStorage, create_cache_storage, retire_json_cache
+from .cache_policy import create_cache_policy
+from ..metrics import metrics
+
+# Önbelleğin kalıcı depolama katmanı: "sqlite" (varsayılan), "log" (ekleme günlüğü) veya "json" (eski biçim)
+FAQ_CACHE_BACKEND = os.getenv("FAQ_CACHE_BACKEND", "sqlite").lower()
+FAQ_CACHE_PATH = os.getenv("FAQ_CACHE_PATH")
+
+# Önbellekte tutulacak en fazla cevap sayısı ve bir cevabın geçerlilik süresi (saniye)
+FAQ_CACHE_MAX_SIZE = int(os.getenv("FAQ_CACHE_MAX_SIZE", "1000"))
+FAQ_CACHE_TTL = int(os.getenv("FAQ_CACHE_TTL", "86400"))
+# Sadece belgelerden (belge araması / SSS) üretilen cevapların geçerlilik süresi. Bu cevaplar belge değiştiğinde
+# kaynak etiketleri sayesinde hedefli olarak silindiği (bkz: provenance.py) için çok daha uzun tutulabilir.
+FAQ_CACHE_DOCUMENT_TTL = int(os.getenv("FAQ_CACHE_DOCUMENT_TTL", "604800"))
+# Stale-while-revalidate: süresi dolan bir cevap, süresinden sonra en fazla bu kadar saniye daha (hemen) verilmeye
+# devam eder ve arka planda yenilenir (bkz: revalidate.py). 0 ise süresi dolan cevap hiç verilmez.
+FAQ_CACHE_MAX_STALENESS = int(os.getenv("FAQ_CACHE_MAX_STALENESS", "3600"))
+
+# Önbellek dolduğunda hangi cevabın tutulacağına karar veren politika: "tinylfu" (varsayılan) veya "lru"
+FAQ_CACHE_POLICY = os.getenv("FAQ_CACHE_POLICY", "tinylfu").lower()
+
+# Write-behind: değişiklikler bellekte biriktirilir ve arka planda, en geç FAQ_CACHE_FLUSH_INTERVAL saniyede bir
+# veya FAQ_CACHE_FLUSH_BATCH değişiklik birikince toplu olarak depolama katmanına yazılır.
+FAQ_CACHE_WRITE_BEHIND = os.getenv("FAQ_CACHE_WRITE_BEHIND", "true").lower() == "true"
+FAQ_CACHE_FLUSH_INTERVAL = float(os.getenv("FAQ_CACHE_FLUSH_INTERVAL", "2.0"))
+FAQ_CACHE_FLUSH_BATCH = int(os.getenv("FAQ_CACHE_FLUSH_BATCH", "100"))
+
+# Eski JSON önbellek dosyası (uygulama kök dizininde, 'ai-service' klasörünün yanında). Başka bir depolama katmanı
+# seçiliyse, uygulama açılırken (lifespan) devreden çıkarılır (bkz: retire_legacy_cache).
+LEGACY_CACHE_FILE = Path(os.getenv("FAQ_CACHE_LEGACY_FILE", str(Path(__file__).resolve().parents[4] / "faq_cache.json")))
+
 
 class PersistentCacheManager:
-    """JSON dosyası tabanlı, TTL ve boyut sınırlı bir önbellek yöneticisi."""
-    def __init__(self, cache_file='faq_cache.json', ttl=86400, max_size=100):
-        self.cache_file = cache_file
+    """
+    TTL ve boyut sınırlı bir önbellek yöneticisi.
+    Tüm kayıtlar bellekte tutulur ve okumalar diske hiç dokunmaz. Değişiklikler seçilen depolama katmanına
+    (bkz: cache_storage.py) kayıt bazında yazılır; write-behind açıkken istek yolunda hiç disk işlemi yapılmaz,
+    değişiklikler biriktirilip flush() ile toplu yazılır (bkz: run_flusher). Bellek ve bekleyen değişiklikler
+    aynı kilitle korunur.
+    Önbellek dolduğunda çıkarılacak kayıt, seçilen politika (bkz: cache_policy.py) ile O(1)'de belirlenir.
+    Kayıtlar, üretildikleri araç ve belge parçalarının etiketlerini (sources) ve kendilerine özel bir TTL
+    taşıyabilir; etiketten kayıtlara bir dizin tutulur, böylece bir belge değiştiğinde sadece ona bağlı
+    kayıtlar silinir (bkz: invalidate_sources).
+    Süresi dolan kayıtlar 'max_staleness' saniye daha tutulur; lookup() bunları "bayat" olarak işaretleyip döndürür.
+    """
+    def __init__(self, cache_file=None, ttl=FAQ_CACHE_TTL, max_size=FAQ_CACHE_MAX_SIZE, backend: str = FAQ_CACHE_BACKEND,
+                 storage: CacheStorage = None, policy: str = FAQ_CACHE_POLICY, write_behind: bool = FAQ_CACHE_WRITE_BEHIND,
+                 flush_batch_size: int = FAQ_CACHE_FLUSH_BATCH, max_staleness: int = FAQ_CACHE_MAX_STALENESS):
         self.ttl = ttl
+        self.max_staleness = max_staleness
         self.max_size = max_size
-        self._cache = self._load_cache()
+        self.write_behind = write_behind
+        self.flush_batch_size = flush_batch_size
         self._lock = Lock()
+        # Henüz depolama katmanına yazılmamış değişiklikler: {anahtar: kayıt} (kayıt None ise silme)
+        self._pending: dict = {}
+        # Boşaltmaların sırayla yapılmasını sağlar (eski bir toplu yazma yenisinin üzerine yazmasın).
+        self._flush_lock = Lock()
+        self._flush_requested = Event()
+        self._flusher_running = False
+        self._policy = create_cache_policy(policy, max_size)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._stale_hits = 0
+        self._source_invalidations = 0
+        # Kaynak etiketi -> o etiketi taşıyan anahtarlar
+        self._source_index: dict[str, set] = {}
+        self._storage = storage or create_cache_storage(backend, cache_file or FAQ_CACHE_PATH)
+        self._retires_legacy_file = storage is None and backend != "json"
+        self._cache = self._load_cache()
+        for key, entry in self._cache.items():
+            self._index_sources(key, entry)
+
+    def _is_expired(self, entry: dict, now: float) -> bool:
+        return now - entry['timestamp'] > entry.get('ttl', self.ttl)
+
+    def _is_dead(self, entry: dict, now: float) -> bool:
+        """Bayat olarak bile verilemeyecek kadar eski mi?"""
+        return now - entry['timestamp'] > entry.get('ttl', self.ttl) + entry.get('max_staleness', self.max_staleness)
+
+    def _index_sources(self, key: str, entry: dict):
+        for source in entry.get('sources', ()):
+            self._source_index.setdefault(source, set()).add(key)
+
+    def _discard(self, key: str):
+        """Kaydı bellekten ve kaynak dizininden çıkarır (kilit tutulurken çağrılır). Silinen kaydı döndürür."""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            for source in entry.get('sources', ()):
+                keys = self._source_index.get(source)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._source_index[source]
+        return entry
 
     def _load_cache(self) -> dict:
-        if not os.path.exists(self.cache_file):
-            return {}
-        try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {}
+        """
+        Kayıtları depolama katmanından yükler; süresi dolmuş olanları ve (max_size küçültüldüyse)
+        sığmayan en eski kayıtları bu sırada diskten de temizler.
+        """
+        entries = self._storage.load()
+        now = time.time()
+        removed = [key for key, entry in entries.items() if self._is_dead(entry, now)]
+        for key in removed:
+            del entries[key]
 
-    def _save_cache(self):
-        with self._lock:
-            try:
-                with open(self.cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(self._cache, f, indent=4)
-            except IOError as e:
-                print(f"❌ Önbellek dosyası yazılamadı: {e}")
+        # Politika, kayıtları en eskiden en yeniye doğru görür.
+        for key in sorted(entries, key=lambda k: entries[k]['timestamp']):
+            for evicted_key in self._policy.on_insert(key):
+                entries.pop(evicted_key, None)
+                removed.append(evicted_key)
+
+        if removed:
+            self._storage.delete_many(removed)
+        return entries
+
+    def retire_legacy_cache(self, json_path=LEGACY_CACHE_FILE) -> int:
+        """
+        Eski JSON önbellek dosyası varsa devreden çıkarır (bkz: retire_json_cache). Kayıtları eski anahtar
+        biçiminde olduğu için önbelleğe aktarılmaz. Import sırasında değil, uygulamanın lifespan'ında bir kez
+        çağrılır. Devreden çıkarılan kayıt sayısını döndürür.
+        """
+        if not self._retires_legacy_file or not os.path.exists(json_path):
+            return 0
+        return retire_json_cache(str(json_path))
 
     def get(self, key: str):
-        entry = self._cache.get(key)
-        if not entry:
-            return None
-        
-        if time.time() - entry['timestamp'] > self.ttl:
-            print(f"⏳ Önbellek süresi doldu: '{key}'")
-            del self._cache[key]
-            self._save_cache()
-            return None
-            
-        return entry['response']
-
-    def set(self, key: str, value):
-        if len(self._cache) >= self.max_size and key not in self._cache:
-            oldest_key = min(self._cache, key=lambda k: self._cache[k]['timestamp'])
-            del self._cache[oldest_key]
-        
-        self._cache[key] = {
+        """Sadece süresi dolmamış cevabı döndürür."""
+        return self.lookup(key, allow_stale=False)[0]
+
+    def lookup(self, key: str, allow_stale: bool = True, record_miss: bool = True) -> tuple:
+        """
+        (cevap, bayat mı) döndürür. Süresi dolmuş ama 'max_staleness' sınırını aşmamış bir kayıt,
+        allow_stale ise bayat olarak döner; çağıranın cevabı arka planda yenilemesi beklenir.
+        Iska, ardından başka bir anahtara bakılacaksa (record_miss=False) istatistiklere yazılmaz.
+        """
+        with self._lock:
+            # Sıklık, isabet olsun olmasın her sorguda sayılır; böylece sık sorulan yeni bir soru önbelleğe girebilir.
+            self._policy.record_access(key)
+            entry = self._cache.get(key)
+            now = time.time()
+            if entry and self._is_dead(entry, now):
+                print(f"⏳ Önbellek süresi doldu: '{key}'")
+                # Okuma yolunda diske yazılmaz; kayıt diskte kalır ve aynı anahtar yeniden yazıldığında ya da
+                # bir sonraki açılışta (bkz: _load_cache) temizlenir.
+                self._discard(key)
+                self._policy.on_remove(key)
+                entry = None
+            stale = entry is not None and self._is_expired(entry, now)
+
+            if not entry or (stale and not allow_stale):
+                if record_miss:
+                    self._misses += 1
+                    metrics.increment("faq_cache_misses")
+                return None, False
+
+            self._policy.on_hit(key)
+            self._hits += 1
+            metrics.increment("faq_cache_hits")
+            if stale:
+                self._stale_hits += 1
+                metrics.increment("faq_cache_stale_hits")
+            return entry['response'], stale
+
+    def set(self, key: str, value, sources: Optional[list[str]] = None, ttl: Optional[int] = None,
+            max_staleness: Optional[int] = None):
+        """
+        Cevabı önbelleğe yazar. 'sources', cevabın dayandığı araç/belge etiketleridir (bkz: provenance.py);
+        'ttl' ve 'max_staleness' verilmezse önbelleğin varsayılan değerleri kullanılır.
+        """
+        entry = {
             "response": value,
             "timestamp": time.time()
         }
-        self._save_cache()
\ No newline at end of file
+        if sources:
+            entry["sources"] = sorted(set(sources))
+        if ttl is not None:
+            entry["ttl"] = ttl
+        if max_staleness is not None:
+            entry["max_staleness"] = max_staleness
+        with self._lock:
+            self._discard(key)
+            self._cache[key] = entry
+            self._index_sources(key, entry)
+            evicted_keys = self._policy.on_insert(key)
+            for evicted_key in evicted_keys:
+                self._discard(evicted_key)
+            self._evictions += len(evicted_keys)
+            if evicted_keys:
+                metrics.increment("faq_cache_evictions", len(evicted_keys))
+
+            # Politika yeni kaydı hemen geri çevirdiyse diske yazmaya gerek yoktur.
+            changes = {evicted_key: None for evicted_key in evicted_keys}
+            if key in self._cache:
+                changes[key] = entry
+            should_flush = self._record_changes(changes)
+        if should_flush:
+            self.flush()
+
+    def delete(self, key: str):
+        """Bir kaydı bellekten ve depolama katmanından siler."""
+        with self._lock:
+            if self._discard(key) is None:
+                return
+            self._policy.on_remove(key)
+            should_flush = self._record_changes({key: None})
+        if should_flush:
+            self.flush()
+
+    def provenance(self, key: str) -> tuple[list[str], Optional[int]]:
+        """Kaydın kaynak etiketlerini ve kayda özel TTL'ini döndürür (isabet istatistiklerini etkilemez)."""
+        with self._lock:
+            entry = self._cache.get(key) or {}
+            return list(entry.get("sources", ())), entry.get("ttl")
+
+    def document_sources(self) -> frozenset[str]:
+        """Bellekteki kayıtların taşıdığı belge ve parça etiketlerini döndürür (bkz: provenance.invalidate_changed_documents)."""
+        with self._lock:
+            return frozenset(source for source in self._source_index if source.startswith(("doc:", "chunk:")))
+
+    def invalidate_sources(self, sources) -> int:
+        """Verilen kaynak etiketlerinden herhangi birini taşıyan tüm kayıtları siler. Silinen kayıt sayısını döndürür."""
+        with self._lock:
+            keys = set()
+            for source in sources:
+                keys.update(self._source_index.get(source, ()))
+            for key in keys:
+                self._discard(key)
+                self._policy.on_remove(key)
+            self._source_invalidations += len(keys)
+            should_flush = self._record_changes({key: None for key in keys}) if keys else False
+        if should_flush:
+            self.flush()
+        return len(keys)
+
+    def _record_changes(self, changes: dict) -> bool:
+        """
+        Değişiklikleri bekleyenlere ekler (kilit tutulurken çağrılır). Çağıranın hemen flush() yapması
+        gerekiyorsa True döner: write-behind kapalıysa veya toplu yazma boyutu aşıldı ama arka plan görevi yoksa.
+        """
+        self._pending.update(changes)
+        if not self.write_behind:
+            return True
+        if len(self._pending) < self.flush_batch_size:
+            return False
+        if self._flusher_running:
+            self._flush_requested.set()
+            return False
+        return True
+
+    def flush(self) -> int:
+        """Bekleyen değişiklikleri depolama katmanına toplu olarak yazar. Yazılan değişiklik sayısını döndürür."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            puts = {key: entry for key, entry in pending.items() if entry is not None}
+            deletes = [key for key, entry in pending.items() if entry is None]
+            try:
+                self._storage.write_batch(puts, deletes)
+            except Exception as e:
+                # Yazılamayan değişiklikler, bu arada gelen daha yenileri ezmeden tekrar kuyruğa alınır.
+                with self._lock:
+                    self._pending = {**pending, **self._pending}
+                metrics.increment("faq_cache_flush_errors")
+                print(f"❌ Önbellek değişiklikleri diske yazılamadı: {e}")
+                return 0
+        metrics.increment("faq_cache_flushed_changes", len(pending))
+        return len(pending)
+
+    async def run_flusher(self, interval: float = FAQ_CACHE_FLUSH_INTERVAL):
+        """
+        Bekleyen değişiklikleri 'interval' saniyede bir veya toplu yazma boyutu aşıldığında boşaltan arka plan görevi.
+        Uygulamanın lifespan'ında başlatılır; iptal edildiğinde son bir boşaltma çağıranın sorumluluğundadır.
+        """
+        self._flusher_running = True
+        try:
+            while True:
+                await asyncio.to_thread(self._flush_requested.wait, interval)
+                self._flush_requested.clear()
+                await asyncio.to_thread(self.flush)
+        finally:
+            self._flusher_running = False
+            # Bekleyen wait() çağrısı hemen dönsün ve iş parçacığı serbest kalsın.
+            self._flush_requested.set()
+
+    def clear(self):
+        """Bellekteki tüm kayıtları siler (depolama katmanına dokunmaz; paylaşımlı önbelleğin L1 katmanı için)."""
+        with self._lock:
+            for key in self._cache:
+                self._policy.on_remove(key)
+            self._cache.clear()
+            self._source_index.clear()
+
+    def stats(self) -> dict:
+        """Önbelleğin isabet oranını ve doluluk bilgisini döndürür."""
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._cache),
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            "stale_hits": self._stale_hits,
+            "evictions": self._evictions,
+            "admission_rejections": getattr(self._policy, "rejections", 0),
+            "source_invalidations": self._source_invalidations,
+            "pending_writes": len(self._pending),
+        }
+
+    def __contains__(self, key: str) -> bool:
+        """Anahtarın geçerli bir kaydı var mı? İsabet/sıklık istatistiklerini etkilemez."""
+        with self._lock:
+            entry = self._cache.get(key)
+            return entry is not None and not self._is_expired(entry, time.time())
+
+    def __len__(self):
+        return len(self._cache)
+
+    def close(self):
+        """Bekleyen değişiklikleri yazar ve depolama katmanının dosya/bağlantılarını kapatır."""
+        self.flush()
+        self._storage.close()
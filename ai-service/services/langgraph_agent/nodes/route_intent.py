@@ -0,0 +1,214 @@
+# app/nodes/route_intent.py
+
+import asyncio
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Optional
+
+from langchain_core.messages import AIMessage, HumanMessage
+from ..graph_state import GraphState
+from ..metrics import metrics
+from ..history import is_follow_up
+from ..fingerprint import turkish_casefold
+from ....services import supabase_client
+
+# Yönlendirici kapatılırsa her mesaj eskisi gibi doğrudan modele gider.
+INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true"
+
+# Ürün adı listesinin veritabanından yeniden okunma aralığı (saniye)
+PRODUCT_NAMES_TTL = int(os.getenv("INTENT_ROUTER_PRODUCT_TTL", "600"))
+# Veritabanı hatasında listenin yeniden okunması için beklenen süre (saniye); eski liste kullanılmaya devam edilir.
+PRODUCT_NAMES_RETRY_INTERVAL = int(os.getenv("INTENT_ROUTER_PRODUCT_RETRY_INTERVAL", "30"))
+
+# Sipariş numarasını yakalayan kalıplar: "123 numaralı sipariş", "sipariş no: 123", "#123".
+# Numara her zaman açık bir belirteçle aranır; "siparişimi 14 gün içinde..." gibi mesajlardaki sayılar sipariş numarası değildir.
+ORDER_ID_PATTERNS = [
+    re.compile(r"\b(\d+)\s*(?:numaralı|nolu|no'lu|no lu)\b"),
+    re.compile(r"sipariş\w*\s*(?:(?:no|numarası|numaram|numaralı)\s*[:#]?|[:#])\s*(\d+)\b"),
+    re.compile(r"#\s*(\d+)\b"),
+]
+
+# Sipariş numarası içeren mesajlar için anahtar kelimeler (öncelik sırasıyla kontrol edilir)
+REFUND_KEYWORDS = ["iade"]
+PAYMENT_KEYWORDS = ["ödeme", "ödedi", "tutar", "fatura", "ücret"]
+ITEM_STATUS_KEYWORDS = ["durum", "nerede", "kargo", "teslim", "gelmedi", "ulaş"]
+
+# Sipariş numarası ve ürün adı içermeyen bu mesajlar her zaman belgelerde cevaplanır (SYSTEM_INSTRUCTION Seçenek 2).
+POLICY_KEYWORDS = [
+    "iade", "kargo", "teslim", "gönderim", "garanti", "değişim", "iptal", "ödeme yöntem",
+    "üyelik", "üye ol", "gizlilik", "kişisel veri", "kvkk", "kampanya", "indirim", "kupon",
+    "hediye", "destek", "politika", "koşul", "şart", "sadakat", "abonelik", "mobil uygulama",
+    "stripe", "hasarlı", "güvenli", "fiyatlar sabit",
+]
+
+# Ürün adlarında geçen ama tek başına bir ürünü işaret etmeyen kelimeler
+GENERIC_PRODUCT_WORDS = {
+    "pro", "max", "plus", "mini", "ultra", "lite", "set", "adet", "yeni", "için", "ile",
+    "siyah", "beyaz", "gri", "mavi", "kırmızı", "yeşil", "gold", "silver", "edition",
+}
+
+_product_names_cache = {"names": [], "loaded_at": 0.0, "retry_at": 0.0}
+_product_names_lock = threading.Lock()
+
+
+def _product_fold(text: str) -> str:
+    """Ürün adı eşleştirmesi için 'IPHONE' -> 'ıphone' gibi noktasız ı farklarını da yok sayar."""
+    return turkish_casefold(text).replace("ı", "i")
+
+
+def _get_product_names() -> list[str]:
+    """
+    Katalogdaki ürün adlarını, PRODUCT_NAMES_TTL süresince bellekte tutarak döndürür.
+    Okuma başarısız olursa son başarılı liste döner ve PRODUCT_NAMES_RETRY_INTERVAL sonra yeniden denenir.
+    """
+    with _product_names_lock:
+        now = time.time()
+        if now - _product_names_cache["loaded_at"] > PRODUCT_NAMES_TTL and now >= _product_names_cache["retry_at"]:
+            names = supabase_client.get_product_names()
+            if names is None:
+                _product_names_cache["retry_at"] = now + PRODUCT_NAMES_RETRY_INTERVAL
+            else:
+                _product_names_cache["names"] = names
+                _product_names_cache["loaded_at"] = now
+        return _product_names_cache["names"]
+
+
+def extract_order_id(lowered_text: str) -> Optional[int]:
+    """Küçük harfe çevrilmiş mesajdan sipariş numarasını çıkarır. Bulunamazsa None döner."""
+    for pattern in ORDER_ID_PATTERNS:
+        match = pattern.search(lowered_text)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def _is_distinctive(token: str) -> bool:
+    return len(token) >= 3 and not token.isdigit() and token not in GENERIC_PRODUCT_WORDS
+
+
+def find_product_name(lowered_text: str, product_names: list[str]) -> Optional[str]:
+    """
+    Mesajda geçen ürün adını bulur. Eşleştirme her zaman bütün kelimelerle yapılır.
+    1. Katalogdaki bir ürün adı mesajda aynen geçiyorsa, en uzun eşleşen ad döner.
+    2. Aksi halde, bir ürün adının ardışık en az iki kelimesi (örn: 'Galaxy S24', 'Playstation 5') mesajda
+       geçiyorsa en uzun eşleşen kelime grubu döner. Tek bir kelime yeterli sayılmaz; aksi halde
+       "Apple Pay ile ödeme" gibi mesajlar, 'Apple' kelimesi yüzünden ürün sorusu sanılırdı.
+    """
+    message_tokens = re.findall(r"\w+", _product_fold(lowered_text))
+    message_phrases = {
+        tuple(message_tokens[start:end])
+        for start in range(len(message_tokens))
+        for end in range(start + 2, len(message_tokens) + 1)
+    }
+
+    full_matches, partial_matches = [], []
+    for name in product_names:
+        tokens = re.findall(r"\w+", name)
+        folded_tokens = [_product_fold(token) for token in tokens]
+        if len(folded_tokens) == 1:
+            if folded_tokens[0] in message_tokens and _is_distinctive(folded_tokens[0]):
+                full_matches.append(name)
+            continue
+        if tuple(folded_tokens) in message_phrases:
+            full_matches.append(name)
+            continue
+        for start in range(len(tokens)):
+            for end in range(start + 2, len(tokens) + 1 - (start == 0)):
+                phrase = folded_tokens[start:end]
+                if tuple(phrase) in message_phrases and any(map(_is_distinctive, phrase)):
+                    partial_matches.append(" ".join(tokens[start:end]))
+
+    if full_matches:
+        return max(full_matches, key=len)
+    if partial_matches:
+        return max(partial_matches, key=len)
+    return None
+
+
+def mentions_product_word(lowered_text: str, product_names: list[str]) -> bool:
+    """Mesajda ürün adlarına özgü tek bir kelime (örn: 'iPhone') geçiyor mu? Ürünü belirlemeye yetmez ama soruyu belirsizleştirir."""
+    message_tokens = set(re.findall(r"\w+", _product_fold(lowered_text)))
+    return any(
+        _is_distinctive(token) and token in message_tokens
+        for name in product_names for token in re.findall(r"\w+", _product_fold(name))
+    )
+
+
+def classify_intent(text: str, product_names: list[str]) -> Optional[tuple[str, dict]]:
+    """
+    Mesajı kural tabanlı olarak sınıflandırır.
+    Emin olunan durumlarda (araç_adı, argümanlar) döner; belirsiz durumlarda None döner
+    ve karar modele bırakılır.
+    """
+    lowered = turkish_casefold(text)
+    order_id = extract_order_id(lowered)
+    product_name = find_product_name(lowered, product_names)
+    has_policy_keyword = any(keyword in lowered for keyword in POLICY_KEYWORDS)
+
+    if order_id is not None:
+        if any(keyword in lowered for keyword in REFUND_KEYWORDS):
+            if product_name:
+                return "get_refund_status_tool", {"order_id": order_id, "product_name": product_name}
+            return None
+        if any(keyword in lowered for keyword in PAYMENT_KEYWORDS):
+            return "get_payment_amount_tool", {"order_id": order_id}
+        if any(keyword in lowered for keyword in ITEM_STATUS_KEYWORDS) and product_name:
+            return "get_item_status_tool", {"order_id": order_id, "product_name": product_name}
+        return None
+
+    # Seçenek 1: Mesajda bir ürün adı var ve genel bir politika sorusu değil.
+    if product_name and not has_policy_keyword:
+        return "get_product_details_tool", {"product_name": product_name}
+
+    # Seçenek 2: Ürün adı (veya ürün adlarına özgü bir kelime) yok ve açıkça bir politika/SSS sorusu.
+    if has_policy_keyword and not product_name and not mentions_product_word(lowered, product_names):
+        return "search_documents_tool", {"query": text}
+
+    return None
+
+
+def route_intent(state: GraphState) -> dict:
+    """
+    Modelden ÖNCE çalışan, kural tabanlı niyet yönlendirici düğüm.
+    Mesajın hangi araca gideceğinden eminse, modelin üreteceği araç çağrısını yerel olarak
+    oluşturur ve ilk Gemini çağrısını atlar. Belirsiz mesajlarda hiçbir şey yapmaz; karar modele kalır.
+    """
+    # Devam soruları (örn: "peki iadesi?") sohbet bağlamı gerektirir; karar her zaman modele bırakılır.
+    if not INTENT_ROUTER_ENABLED or is_follow_up(state):
+        return {}
+
+    last_message = state["messages"][-1]
+    if not isinstance(last_message, HumanMessage) or not last_message.content:
+        return {}
+
+    started_at = time.perf_counter()
+    decision = classify_intent(last_message.content, _get_product_names())
+    metrics.observe("intent_router_latency", time.perf_counter() - started_at)
+
+    if decision is None:
+        metrics.increment("intent_router_deferred_to_model")
+        print("🧭 Niyet belirsiz, karar modele bırakılıyor.")
+        return {}
+
+    tool_name, args = decision
+    metrics.increment("intent_router_routed")
+    print(f"🧭 Niyet yönlendirici: '{tool_name}' doğrudan çağrılıyor. Argümanlar: {args}")
+
+    # Modelin üreteceği araç çağrısıyla birebir aynı yapıda bir mesaj oluşturuyoruz;
+    # böylece 'tools' -> 'summarize' -> 'agent' akışı değişmeden çalışır.
+    routed_message = AIMessage(
+        content="",
+        tool_calls=[{"name": tool_name, "args": args, "id": f"route_{uuid.uuid4().hex}"}]
+    )
+    return {"messages": [routed_message], "user_intent": tool_name}
+
+
+async def aroute_intent(state: GraphState) -> dict:
+    """
+    route_intent düğümünün asenkron versiyonu.
+    Ürün adı listesi gerektiğinde veritabanından okunduğu için bir iş parçacığında çalıştırılır.
+    """
+    return await asyncio.to_thread(route_intent, state)
@@ -0,0 +1,127 @@
+# Bu dosya, SSS önbelleğinin anlamsal (semantic) katmanını içerir.
+# Birebir önbellek sadece normalleştirilmiş metin aynıysa isabet eder; "İade süresi kaç gün?" ile
+# "kaç günde iade edebilirim" farklı anahtarlardır. Bu katman, önbelleğe alınmış soruların embedding'lerini
+# bir FAISS indeksinde tutar ve gelen soruya en yakın soruyu bulur. Benzerlik eşiği aşılırsa o sorunun
+# önbellekteki cevabı kullanılır.
+#
+# Eşik (SEMANTIC_CACHE_THRESHOLD), etiketli bir küme üzerinde isabet/yanlış isabet oranlarına bakılarak ayarlanmalıdır:
+#   python -m ai-service.benchmarks.evaluate_semantic_cache
+# İndeks süreç içidir ve yeniden başlatmada boş başlar; yeni cevaplar önbelleğe alındıkça dolar.
+
+import math
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+
+from ..vector_store import embedding_model
+from ..metrics import metrics
+
+# Her birebir önbellek ıskasında bir embedding çağrısı yapıldığı için varsayılan olarak kapalıdır.
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+# Kosinüs benzerliği eşiği (0-1). Yükseldikçe yanlış isabet azalır, isabet oranı düşer.
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.90"))
+SEMANTIC_CACHE_MAX_SIZE = int(os.getenv("SEMANTIC_CACHE_MAX_SIZE", "5000"))
+
+
+class SemanticCache:
+    """
+    Önbelleğe alınmış soruların embedding'lerini tutan FAISS indeksi.
+    Değerleri (cevapları) tutmaz; sadece en yakın sorunun önbellek anahtarını (query hash) döndürür.
+    """
+    def __init__(self, embeddings=embedding_model, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 max_size: int = SEMANTIC_CACHE_MAX_SIZE, pending_size: int = 256):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_size = max_size
+        self._lock = Lock()
+        self._index: Optional[FAISS] = None
+        # İndeksteki anahtarlar, eklenme sırasıyla (en eski ilk çıkarılır)
+        self._keys: OrderedDict[str, None] = OrderedDict()
+        # Iska olan soruların embedding'leri; cevap önbelleğe alınırken tekrar embedding hesaplanmasın diye tutulur.
+        self._pending: OrderedDict[str, list[float]] = OrderedDict()
+        self._pending_size = pending_size
+
+    def embed(self, query: str) -> Optional[list[float]]:
+        """Sorunun birim uzunluğa normalleştirilmiş embedding'ini döndürür (iç çarpım = kosinüs benzerliği)."""
+        try:
+            vector = self.embeddings.embed_query(query)
+        except Exception as e:
+            metrics.increment("semantic_cache_embedding_errors")
+            print(f"⚠️ Anlamsal önbellek için embedding hesaplanamadı: {e}")
+            return None
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def nearest(self, query: str, key: Optional[str] = None) -> Optional[tuple[str, float]]:
+        """
+        Soruya en yakın önbellekteki sorunun anahtarını ve kosinüs benzerliğini döndürür (eşik uygulanmaz).
+        'key' verilirse sorunun embedding'i, aynı sorunun cevabı önbelleğe alınırken tekrar kullanılmak üzere saklanır.
+        """
+        vector = self.embed(query)
+        if vector is None:
+            return None
+        with self._lock:
+            if key is not None:
+                self._pending[key] = vector
+                while len(self._pending) > self._pending_size:
+                    self._pending.popitem(last=False)
+            if self._index is None:
+                return None
+            results = self._index.similarity_search_with_score_by_vector(vector, k=1)
+        if not results:
+            return None
+        document, score = results[0]
+        return document.metadata["key"], float(score)
+
+    def lookup(self, query: str, key: Optional[str] = None) -> Optional[tuple[str, float]]:
+        """Eşiği geçen en yakın sorunun anahtarını ve benzerliğini döndürür; yoksa None."""
+        match = self.nearest(query, key)
+        if match is None or match[1] < self.threshold:
+            metrics.increment("semantic_cache_misses")
+            return None
+        metrics.increment("semantic_cache_hits")
+        return match
+
+    def add(self, query: str, key: str):
+        """Önbelleğe alınan bir soruyu indekse ekler. İndeks doluysa en eski soru çıkarılır."""
+        with self._lock:
+            if key in self._keys:
+                return
+            vector = self._pending.pop(key, None)
+        if vector is None:
+            vector = self.embed(query)
+            if vector is None:
+                return
+
+        with self._lock:
+            if key in self._keys:
+                return
+            if self._index is None:
+                self._index = FAISS.from_embeddings(
+                    [(query, vector)], self.embeddings, metadatas=[{"key": key}], ids=[key],
+                    distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+                )
+            else:
+                self._index.add_embeddings([(query, vector)], metadatas=[{"key": key}], ids=[key])
+            self._keys[key] = None
+            if len(self._keys) > self.max_size:
+                oldest_key, _ = self._keys.popitem(last=False)
+                self._index.delete([oldest_key])
+
+    def remove(self, key: str):
+        """Cevabı artık önbellekte olmayan (süresi dolmuş/çıkarılmış) bir soruyu indeksten siler."""
+        with self._lock:
+            if key in self._keys:
+                del self._keys[key]
+                self._index.delete([key])
+
+    def __len__(self):
+        return len(self._keys)
+
+
+# Embedding modeli başlatılamadıysa anlamsal katman devre dışı kalır.
+semantic_cache = SemanticCache() if SEMANTIC_CACHE_ENABLED and embedding_model else None
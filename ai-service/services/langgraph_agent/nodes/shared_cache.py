@@ -0,0 +1,326 @@
+# Bu dosya, SSS önbelleğini tüm uvicorn worker'ları ve replikalar arasında paylaştıran Redis katmanını içerir.
+# FAQ_CACHE_BACKEND=redis ile etkinleşir; Redis protokolünü konuşan her sunucu (Redis, Valkey, KeyDB, Dragonfly) kullanılabilir.
+#
+# - Asıl kayıtlar Redis'te tutulur (SET ... EX ttl). Redis'in kendi maxmemory politikası (örn: allkeys-lfu) boyutu sınırlar.
+# - Her süreç, sık sorulan cevaplar için ağ turu yapmamak adına küçük bir bellek içi L1 katmanı tutar.
+# - Bir kayıt yazıldığında/silindiğinde, diğer süreçlerin L1 kopyaları pub/sub kanalı üzerinden geçersiz kılınır.
+#   Bağlantı koptuğunda kaçırılmış olabilecek mesajlar nedeniyle L1 tamamen temizlenir; L1'in kısa TTL'i
+#   de eski bir kopyanın en fazla ne kadar yaşayabileceğine üst sınır koyar.
+# - Kayıtların kaynak etiketleri (bkz: provenance.py) için her etikete bir Redis kümesi (SET) tutulur; bir belge
+#   değiştiğinde bu kümelerdeki kayıtlar tüm replikalar için tek seferde silinir.
+# - Kayıtlar Redis'te TTL + FAQ_CACHE_MAX_STALENESS kadar yaşar; TTL'i geçmiş bir kayıt bayat olarak verilir
+#   (stale-while-revalidate). Bayat kayıtlar L1'e kopyalanmaz.
+#
+# 'redis' paketi requirements.txt'dedir. FAQ_CACHE_BACKEND=redis seçilip paket kurulu değilse uygulama açılmaz;
+# aksi halde her süreç sessizce kendi ayrı önbelleğini tutar ve replikalar arası geçersiz kılma hiç çalışmazdı.
+
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+from .cache_storage import MemoryCacheStorage
+from .persistent_cache import (PersistentCacheManager, FAQ_CACHE_BACKEND, FAQ_CACHE_TTL, FAQ_CACHE_DOCUMENT_TTL,
+                               FAQ_CACHE_MAX_STALENESS)
+from ..metrics import metrics
+
+FAQ_CACHE_REDIS_URL = os.getenv("FAQ_CACHE_REDIS_URL", "redis://localhost:6379/0")
+FAQ_CACHE_REDIS_PREFIX = os.getenv("FAQ_CACHE_REDIS_PREFIX", "faq_cache")
+# Redis yanıt vermezse sohbet isteği beklemesin diye komut başına zaman aşımı (saniye)
+FAQ_CACHE_REDIS_TIMEOUT = float(os.getenv("FAQ_CACHE_REDIS_TIMEOUT", "0.25"))
+
+# Süreç başına L1 katmanının kapasitesi ve bir kopyanın en fazla yaşayacağı süre (saniye)
+FAQ_CACHE_L1_SIZE = int(os.getenv("FAQ_CACHE_L1_SIZE", "256"))
+FAQ_CACHE_L1_TTL = int(os.getenv("FAQ_CACHE_L1_TTL", "60"))
+
+# Tüm L1 katmanlarının temizlenmesi için yayınlanan özel anahtar
+_CLEAR_ALL = "*"
+
+
+class SharedCacheManager:
+    """
+    PersistentCacheManager ile aynı arayüze (get/set/delete/stats) sahip, Redis destekli paylaşımlı önbellek.
+    'client', redis-py ile uyumlu herhangi bir istemci olabilir (örn: testlerde tests/fake_redis.py).
+    Diğer süreçlerin geçersiz kılmalarını dinleyen iş parçacığı import sırasında değil, start() ile
+    (uygulamanın lifespan'ında) başlatılır.
+    """
+    def __init__(self, client, prefix: str = FAQ_CACHE_REDIS_PREFIX, ttl: int = FAQ_CACHE_TTL,
+                 l1_size: int = FAQ_CACHE_L1_SIZE, l1_ttl: int = FAQ_CACHE_L1_TTL,
+                 max_staleness: int = FAQ_CACHE_MAX_STALENESS):
+        self._client = client
+        self._prefix = prefix
+        self._channel = f"{prefix}:invalidate"
+        self.ttl = ttl
+        self.max_staleness = max_staleness
+        self._l1 = PersistentCacheManager(ttl=min(l1_ttl, ttl), max_size=l1_size, storage=MemoryCacheStorage(),
+                                          write_behind=False, max_staleness=0)
+        self._origin = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        # Her geçersiz kılmada artar; Redis'ten okunan bir değer, okuma sırasında bir geçersiz kılma geldiyse L1'e yazılmaz.
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+        self._invalidations = 0
+        self._source_invalidations = 0
+        self._errors = 0
+        self._closed = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+
+    def start(self):
+        """Geçersiz kılma kanalını dinleyen iş parçacığını başlatır (birden fazla çağrılması zararsızdır)."""
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(target=self._listen, name="faq-cache-invalidation", daemon=True)
+            self._listener.start()
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self._prefix}:{key}"
+
+    def _source_key(self, source: str) -> str:
+        return f"{self._prefix}:source:{source}"
+
+    @staticmethod
+    def _parse(raw) -> dict:
+        entry = json.loads(raw)
+        # Kaynak etiketlerinden önce yazılmış kayıtlarda değer doğrudan cevaptır ve her zaman tazedir.
+        if not isinstance(entry, dict) or "response" not in entry:
+            entry = {"response": entry}
+        return entry
+
+    def _read(self, key: str, operation: str) -> Optional[dict]:
+        """
+        Kaydı Redis'ten okur. Kayıt yoksa veya Redis'e ulaşılamazsa None döner. Çözümlenemeyen (bozuk veya
+        başka bir uygulamanın yazdığı) bir değer ıska sayılır ve her okumada tekrar denenmesin diye silinir.
+        """
+        raw = self._client.get(self._redis_key(key))
+        if raw is None:
+            return None
+        try:
+            return self._parse(raw)
+        except (ValueError, TypeError) as e:
+            metrics.increment("faq_cache_shared_corrupt_entries")
+            print(f"⚠️ Paylaşımlı önbellekte çözümlenemeyen kayıt silindi ({operation}): '{key}' ({e})")
+            self._client.delete(self._redis_key(key))
+            return None
+
+    def _is_stale(self, entry: dict) -> bool:
+        return "timestamp" in entry and time.time() - entry["timestamp"] > entry.get("ttl", self.ttl)
+
+    def _record_error(self, operation: str, error: Exception):
+        self._errors += 1
+        metrics.increment("faq_cache_shared_errors")
+        print(f"⚠️ Paylaşımlı önbellek ({operation}) hatası: {error}")
+
+    def get(self, key: str):
+        """Sadece süresi dolmamış cevabı döndürür."""
+        return self.lookup(key, allow_stale=False)[0]
+
+    def lookup(self, key: str, allow_stale: bool = True, record_miss: bool = True) -> tuple:
+        """(cevap, bayat mı) döndürür; bkz: PersistentCacheManager.lookup."""
+        value = self._l1.get(key)
+        if value is not None:
+            return value, False
+
+        generation = self._generation
+        try:
+            entry = self._read(key, "get")
+        except Exception as e:
+            self._record_error("get", e)
+            return None, False
+
+        stale = entry is not None and self._is_stale(entry)
+        if entry is None or (stale and not allow_stale):
+            if record_miss:
+                self._misses += 1
+                metrics.increment("faq_cache_shared_misses")
+            return None, False
+
+        value = entry["response"]
+        self._hits += 1
+        metrics.increment("faq_cache_shared_hits")
+        if stale:
+            self._stale_hits += 1
+            metrics.increment("faq_cache_stale_hits")
+            return value, True
+        # L1 kopyası, Redis'teki kaydın kalan süresinden uzun yaşamaz (örn: kısa TTL'li kullanıcıya özel cevaplar).
+        remaining = entry.get("ttl", self.ttl) - (time.time() - entry["timestamp"]) if "timestamp" in entry else self._l1.ttl
+        with self._lock:
+            if generation == self._generation:
+                self._l1.set(key, value, ttl=min(self._l1.ttl, remaining))
+        return value, False
+
+    def set(self, key: str, value, sources: Optional[list[str]] = None, ttl: Optional[int] = None,
+            max_staleness: Optional[int] = None):
+        entry = {"response": value, "sources": sorted(set(sources or ())), "timestamp": time.time(), "ttl": ttl or self.ttl}
+        try:
+            # Kayıt, kaynak kümeleri ve geçersiz kılma mesajı tek bir ağ turunda gönderilir. Komutların atomik olması
+            # gerekmediği için MULTI/EXEC kullanılmaz (transaction=False).
+            pipeline = self._client.pipeline(transaction=False)
+            pipeline.set(self._redis_key(key), json.dumps(entry, ensure_ascii=False),
+                         ex=entry["ttl"] + (self.max_staleness if max_staleness is None else max_staleness))
+            for source in entry["sources"]:
+                # Küme, içindeki en uzun ömürlü kayıt kadar yaşar; süresi dolmuş kayıtların anahtarları zararsızdır.
+                pipeline.sadd(self._source_key(source), key)
+                pipeline.expire(self._source_key(source), max(self.ttl, FAQ_CACHE_DOCUMENT_TTL) + self.max_staleness)
+            self._publish(key, pipeline)
+            pipeline.execute()
+        except Exception as e:
+            self._record_error("set", e)
+        # Redis'e ulaşılamasa bile bu süreç cevabı L1'den vermeye devam eder.
+        self._l1.set(key, value, ttl=min(self._l1.ttl, entry["ttl"]))
+
+    def delete(self, key: str):
+        try:
+            self._client.delete(self._redis_key(key))
+            self._publish(key)
+        except Exception as e:
+            self._record_error("delete", e)
+        self._l1.delete(key)
+
+    def provenance(self, key: str) -> tuple[list[str], Optional[int]]:
+        """Kaydın kaynak etiketlerini ve TTL'ini Redis'teki kayıttan döndürür (L1 kopyaları etiket taşımaz)."""
+        try:
+            entry = self._read(key, "provenance")
+        except Exception as e:
+            self._record_error("provenance", e)
+            return [], None
+        if entry is None:
+            return [], None
+        return entry.get("sources", []), entry.get("ttl")
+
+    def document_sources(self) -> frozenset[str]:
+        """
+        Paylaşımlı önbellekte süreç belleğinde etiketli kayıt yoktur (L1 kopyaları etiket taşımaz); Redis'teki kayıtlar
+        tüm replikalarca paylaşıldığı için manifest karşılaştırmasıyla yapılan silme hepsine yansır.
+        """
+        return frozenset()
+
+    def invalidate_sources(self, sources) -> int:
+        """Verilen kaynak etiketlerinden herhangi birini taşıyan kayıtları Redis'ten ve tüm L1 katmanlarından siler."""
+        keys = set()
+        try:
+            for source in sources:
+                members = self._client.smembers(self._source_key(source))
+                keys.update(member.decode() if isinstance(member, bytes) else member for member in members)
+                self._client.delete(self._source_key(source))
+            if keys:
+                self._client.delete(*(self._redis_key(key) for key in keys))
+                for key in keys:
+                    self._publish(key)
+        except Exception as e:
+            self._record_error("invalidate_sources", e)
+        for key in keys:
+            self._l1.delete(key)
+        self._source_invalidations += len(keys)
+        return len(keys)
+
+    def _publish(self, key: str, client=None):
+        (client or self._client).publish(self._channel, json.dumps({"key": key, "origin": self._origin}))
+
+    def _invalidate(self, key: str):
+        with self._lock:
+            self._generation += 1
+            if key == _CLEAR_ALL:
+                self._l1.clear()
+            else:
+                self._l1.delete(key)
+        self._invalidations += 1
+        metrics.increment("faq_cache_l1_invalidations")
+
+    def _handle_message(self, data):
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        # Kendi yazdığımız kaydın L1 kopyası zaten günceldir.
+        if message.get("origin") != self._origin:
+            self._invalidate(message.get("key", _CLEAR_ALL))
+
+    def _listen(self):
+        """Geçersiz kılma kanalını dinler; bağlantı koparsa tekrar abone olur."""
+        while not self._closed.is_set():
+            pubsub = None
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                # Abonelik kopukken gelen geçersiz kılmalar kaçırılmış olabilir.
+                self._invalidate(_CLEAR_ALL)
+                while not self._closed.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._handle_message(message["data"])
+            except Exception as e:
+                if self._closed.is_set():
+                    break
+                self._record_error("pubsub", e)
+                self._closed.wait(1.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def stats(self) -> dict:
+        """L1 ve Redis katmanlarının isabet bilgilerini döndürür."""
+        l1 = self._l1.stats()
+        lookups = l1["hits"] + self._hits + self._misses + self._errors
+        return {
+            "backend": "redis",
+            "hit_ratio": round((l1["hits"] + self._hits) / lookups, 4) if lookups else 0.0,
+            "l1": l1,
+            "shared_hits": self._hits,
+            "shared_misses": self._misses,
+            "stale_hits": self._stale_hits,
+            "l1_invalidations": self._invalidations,
+            "source_invalidations": self._source_invalidations,
+            "errors": self._errors,
+        }
+
+    def __contains__(self, key: str) -> bool:
+        if key in self._l1:
+            return True
+        try:
+            entry = self._read(key, "exists")
+        except Exception as e:
+            self._record_error("exists", e)
+            return False
+        return entry is not None and not self._is_stale(entry)
+
+    def flush(self) -> int:
+        """Yazmalar Redis'e doğrudan yapıldığı için bekleyen değişiklik yoktur (PersistentCacheManager ile aynı arayüz)."""
+        return 0
+
+    def close(self):
+        self._closed.set()
+        if self._listener is not None:
+            self._listener.join(timeout=2.0)
+
+
+def create_faq_cache_manager():
+    """
+    FAQ_CACHE_BACKEND=redis ise paylaşımlı önbelleği, değilse süreç içi PersistentCacheManager'ı oluşturur.
+    Redis istenip 'redis' paketi kurulu değilse RuntimeError fırlatır (uygulama açılmaz).
+    """
+    if FAQ_CACHE_BACKEND != "redis":
+        return PersistentCacheManager()
+
+    try:
+        import redis
+    except ImportError as e:
+        raise RuntimeError(
+            "FAQ_CACHE_BACKEND=redis seçildi ama 'redis' paketi kurulu değil (pip install -r requirements.txt). "
+            "Süreç başına önbellek isteniyorsa FAQ_CACHE_BACKEND=sqlite kullanın."
+        ) from e
+
+    client = redis.Redis.from_url(
+        FAQ_CACHE_REDIS_URL,
+        socket_timeout=FAQ_CACHE_REDIS_TIMEOUT,
+        socket_connect_timeout=FAQ_CACHE_REDIS_TIMEOUT,
+    )
+    print(f"🔗 SSS önbelleği paylaşımlı Redis katmanını kullanıyor: {FAQ_CACHE_REDIS_URL}")
+    return SharedCacheManager(client)
@@ -35,7 +35,7 @@ def summarize_tool_outputs(state: GraphState):
         if tool_name == 'get_recommendations_tool' and not content:
             continue  # Tavsiye aracından gelen boş cevabı tamamen yoksay
 
-        if "hatası oluştu" in content.lower():
+        if output.status == "error" or "hatası oluştu" in content.lower():
             summary_lines.append(f"- '{tool_name}' kullanılırken bir sorun yaşandı.")
         elif content:
             summary_lines.append(f"- {content}")
@@ -47,4 +47,12 @@ def summarize_tool_outputs(state: GraphState):
     summary = "Araçlardan şu bilgiler toplandı:\n" + "\n".join(summary_lines)
     print(f"📋 Akıllı Özetleme Tamamlandı:\n{summary}")
 
-    return {"messages": [SystemMessage(content=summary)]}
\ No newline at end of file
+    return {"messages": [SystemMessage(content=summary)]}
+
+
+async def asummarize_tool_outputs(state: GraphState):
+    """
+    summarize_tool_outputs düğümünün asenkron versiyonu.
+    Özetleme tamamen bellek içi olduğundan doğrudan senkron fonksiyon çağrılır.
+    """
+    return summarize_tool_outputs(state)
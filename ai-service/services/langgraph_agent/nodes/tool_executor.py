@@ -1,94 +1,199 @@
 # backend-fastapi/services/langgraph_agent/nodes/tool_executor.py
 
+import asyncio
+import os
+
 from ..graph_state import GraphState
 from ....services import supabase_client  # supabase_client.py dosyasını import ediyoruz
 from langchain_core.messages import AIMessage, ToolMessage
-from ..tools.search_documents_tool import search_documents_tool
+from ..tools.search_documents_tool import search_documents
+from ..deadline import check_deadline, DeadlineExceeded
+from ..metrics import metrics
+from ..tool_cache import tool_cache
+from ..budget import get_usage, CHAT_MAX_TOOL_CALLS
 
-def execute_tools(state: GraphState) -> dict:
+# Tek bir istekte aynı anda çalışabilecek en fazla araç çağrısı sayısı.
+# Model tek bir yanıtta birden fazla araç isteyebilir (örn: ödeme tutarı + ürün durumu + iade durumu).
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "4"))
+
+# Her bir araç çağrısının kendi zaman aşımı (saniye). Süre, çağrı çalışmaya başladığında işlemeye başlar.
+TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", "10"))
+
+
+def _run_tool(tool_name: str, args: dict, user_id: str):
     """
-    Bu düğüm, standart ToolNode'un yerine geçer.
-    Modelin çağırmak istediği araçları, state'ten aldığı 'user_id' ile birlikte 
-    güvenli bir şekilde çalıştırır.
+    Tek bir araç çağrısını, state'ten gelen 'user_id' ile GÜVENLİ bir şekilde çalıştırır.
+    Bloklayıcı bir fonksiyondur (psycopg2, FAISS); asenkron akışta bir iş parçacığında çağrılır.
+    Araç başarısız olursa istisna fırlatır; böylece hata sonucu önbelleğe yazılmaz.
+    Sonuç metindir; belge araması ise (metin, kaynak etiketleri) çifti döndürür.
     """
-    print("\n--- 🛠️  Güvenli Araç Çalıştırma Düğümü (execute_tools) Devrede ---")
-    
-    messages = state["messages"]
-    last_message = messages[-1]
-    
+    print(f"⚡️ Araç Çağrılıyor: '{tool_name}' | Argümanlar: {args}")
+
+    # === GÜVENLİK KONTROL NOKTASI ===
+    # Hangi araç çağrıldıysa, ona uygun ve GÜVENLİ supabase_client fonksiyonunu çağır.
+    if tool_name == "get_payment_amount_tool":
+        return supabase_client.get_payment_amount(
+            order_id=args.get("order_id"),
+            user_id=user_id  # GÜVENLİK: user_id'yi state'ten ekle
+        )
+    elif tool_name == "get_item_status_tool":
+        return supabase_client.get_item_status(
+            order_id=args.get("order_id"),
+            product_name=args.get("product_name"),
+            user_id=user_id  # GÜVENLİK: user_id'yi state'ten ekle
+        )
+    elif tool_name == "get_refund_status_tool":
+        return supabase_client.get_refund_status(
+            order_id=args.get("order_id"),
+            product_name=args.get("product_name"),
+            user_id=user_id  # GÜVENLİK: user_id'yi state'ten ekle
+        )
+    elif tool_name == "get_product_details_tool":
+        # Bu araç genel bir arama yaptığı için user_id gerektirmez.
+        return supabase_client.get_product_details_with_recommendations(
+            product_name=args.get("product_name")
+        )
+
+    # Agent, "search_documents_tool" aracını çağırdığında bu blok çalışacak.
+    elif tool_name == "search_documents_tool":
+        # Metinle birlikte bulunan belge parçalarının kaynak etiketleri de döner (bkz: _tool_message).
+        return search_documents(args.get("query"))
+
+    # DİKKAT: Diğer araçlarınız user_id gerektiriyorsa,
+    # onları da buraya `elif` bloğu olarak eklemelisiniz.
+    raise ValueError(f"'{tool_name}' adında bilinmeyen veya bu düğümde tanımlanmamış bir araç çağrıldı.")
+
+
+def _tool_message(response, tool_call: dict, status: str) -> ToolMessage:
+    """
+    Araç sonucundan ToolMessage oluşturur. Sonucun kaynak etiketleri (provenance) varsa mesajın artifact'ına
+    yazılır; model bunları görmez ama cache_final_answer cevabın hangi belge parçalarına dayandığını buradan okur.
+    """
+    sources = []
+    if isinstance(response, tuple):
+        response, sources = response
+    return ToolMessage(content=str(response), name=tool_call["name"], tool_call_id=tool_call["id"], status=status,
+                       artifact={"sources": sources} if sources else None)
+
+
+def _get_tool_calls(state: GraphState):
+    """State'ten çalıştırılacak araç çağrılarını ve kullanıcı kimliğini güvenli bir şekilde çıkarır."""
+    last_message = state["messages"][-1]
+
     user_id = state.get("user_id")
     if not user_id:
         raise ValueError("Tool execution failed: User ID is missing from the state.")
 
     print(f"Kullanıcı Kimliği: {user_id}")
 
-
-
-    # --- ANA GÜNCELLEME BURADA ---
-    # Döngüye girmeden önce, son mesajın bir AIMessage olduğunu ve araç çağrıları içerdiğini kontrol et.
+    # Son mesajın bir AIMessage olduğunu ve araç çağrıları içerdiğini kontrol et.
     # Bu, beklenmedik mesaj tiplerine karşı bir koruma sağlar.
     if not isinstance(last_message, AIMessage) or not last_message.tool_calls:
-        # Bu durum normalde oluşmamalıdır, ama bir güvenlik önlemidir.
-        return {}
-    # --- GÜNCELLEME SONU ---
-
+        return [], user_id
 
+    return last_message.tool_calls, user_id
 
 
-    tool_outputs = []
-    for tool_call in last_message.tool_calls:
-        # LLM'in çağırdığı aracın adı, sizin tools/ dizinindeki fonksiyon adınızla eşleşir.
-        tool_name = tool_call["name"]
-        args = tool_call["args"]
-        response = ""
-        
-        print(f"⚡️ Araç Çağrılıyor: '{tool_name}' | Argümanlar: {args}")
-
+async def _run_tool_call(tool_call: dict, user_id: str, semaphore: asyncio.Semaphore, state: GraphState) -> ToolMessage:
+    """
+    Tek bir araç çağrısını eşzamanlılık sınırı ve kendi zaman aşımı ile çalıştırır.
+    Hata veya zaman aşımı durumunda istisna fırlatmak yerine bir hata ToolMessage'ı döndürür;
+    böylece yavaş veya hatalı bir araç diğerlerini etkilemez.
+    İsteğin kendi süresi (deadline) araç zaman aşımından kısaysa, kalan süre kullanılır ve süre dolduğunda
+    DeadlineExceeded fırlatılır; bu durumda grafiğin devam etmesinin bir anlamı yoktur.
+    """
+    tool_name = tool_call["name"]
+    status = "success"
+
+    # Önbellekte geçerli bir sonuç varsa araç hiç çalıştırılmaz (iş parçacığı ve semafor beklenmez).
+    cached_response = tool_cache.get(tool_name, tool_call["args"], user_id)
+    if cached_response is not None:
+        print(f"⚡️ Araç sonucu önbellekten geldi: '{tool_name}'")
+        return _tool_message(cached_response, tool_call, status)
+
+    async with semaphore:
+        remaining = check_deadline(state, "tools")
+        timeout = TOOL_CALL_TIMEOUT if remaining is None else min(TOOL_CALL_TIMEOUT, remaining)
+
+        # Veritabanı sorguları da aynı süreyle sınırlanır (statement_timeout). asyncio.to_thread,
+        # context değişkenlerini iş parçacığına kopyaladığı için değer sadece bu araç çağrısında geçerlidir.
+        supabase_client.db_statement_timeout_ms.set(int(timeout * 1000))
         try:
-            # === GÜVENLİK KONTROL NOKTASI ===
-            # Hangi araç çağrıldıysa, ona uygun ve GÜVENLİ supabase_client fonksiyonunu çağır.
-
-            
-            if tool_name == "get_payment_amount_tool":
-                response = supabase_client.get_payment_amount(
-                    order_id=args.get("order_id"),
-                    user_id=user_id  # GÜVENLİK: user_id'yi state'ten ekle
-                )
-            elif tool_name == "get_item_status_tool":
-                response = supabase_client.get_item_status(
-                    order_id=args.get("order_id"),
-                    product_name=args.get("product_name"),
-                    user_id=user_id  # GÜVENLİK: user_id'yi state'ten ekle
-                )
-            elif tool_name == "get_refund_status_tool":
-                response = supabase_client.get_refund_status(
-                    order_id=args.get("order_id"),
-                    product_name=args.get("product_name"),
-                    user_id=user_id  # GÜVENLİK: user_id'yi state'ten ekle
-                )
-            elif tool_name == "get_product_details_tool":
-                 # Bu araç genel bir arama yaptığı için user_id gerektirmez.
-                 response = supabase_client.get_product_details_with_recommendations(
-                     product_name=args.get("product_name")
-                 )
-
-            # --- YENİ EKLENEN BLOK ---
-            # Agent, "search_documents_tool" aracını çağırdığında bu blok çalışacak.
-            elif tool_name == "search_documents_tool":
-                # 'search_documents_tool' fonksiyonu 'query' adında bir argüman bekliyor.
-                response = search_documents_tool(args.get("query"))
-            # ---------------------------
-
-
-            # DİKKAT: Diğer araçlarınız (search_documents_tool vb.) user_id gerektiriyorsa,
-            # onları da buraya `elif` bloğu olarak eklemelisiniz.
-            else:
-                response = f"Hata: '{tool_name}' adında bilinmeyen veya bu düğümde tanımlanmamış bir araç çağrıldı."
-        
+            response = await asyncio.wait_for(
+                asyncio.to_thread(_run_tool, tool_name, tool_call["args"], user_id),
+                timeout=timeout
+            )
+        except asyncio.CancelledError:
+            # İstemci bağlantısı koptu veya üst seviyede süre doldu. İş parçacığındaki sorgu statement_timeout ile biter.
+            metrics.increment("tool_calls_cancelled")
+            raise
+        except asyncio.TimeoutError:
+            metrics.increment("tool_calls_cancelled")
+            if timeout < TOOL_CALL_TIMEOUT:
+                raise DeadlineExceeded("tools")
+            print(f"⏱️ Araç zaman aşımına uğradı: '{tool_name}' ({timeout:.1f} sn)")
+            response = f"'{tool_name}' aracı çalıştırılırken bir zaman aşımı hatası oluştu."
+            status = "error"
         except Exception as e:
             print(f"❌ Araç çalıştırılırken hata oluştu: {e}")
             response = f"'{tool_name}' aracı çalıştırılırken bir hata oluştu: {e}"
+            status = "error"
+        else:
+            tool_cache.set(tool_name, tool_call["args"], user_id, response if isinstance(response, tuple) else str(response))
+
+    return _tool_message(response, tool_call, status)
+
 
-        tool_outputs.append(ToolMessage(content=str(response), tool_call_id=tool_call["id"]))
+async def aexecute_tools(state: GraphState) -> dict:
+    """
+    Bu düğüm, standart ToolNode'un yerine geçer.
+    Modelin çağırmak istediği araçları, state'ten aldığı 'user_id' ile birlikte
+    güvenli bir şekilde ve EŞZAMANLI olarak çalıştırır.
+    - Aynı anda en fazla TOOL_MAX_CONCURRENCY araç çalışır (istek başına sınır).
+    - Her çağrının kendi TOOL_CALL_TIMEOUT süresi vardır.
+    - ToolMessage'lar, modelin araçları istediği orijinal sırayla döndürülür.
+    """
+    print("\n--- 🛠️  Güvenli Araç Çalıştırma Düğümü (execute_tools) Devrede ---")
 
-    return {"messages": tool_outputs}
\ No newline at end of file
+    tool_calls, user_id = _get_tool_calls(state)
+    if not tool_calls:
+        # Bu durum normalde oluşmamalıdır, ama bir güvenlik önlemidir.
+        return {}
+
+    # İsteğin araç bütçesi: sığmayan çağrılar çalıştırılmaz ama model her çağrısına bir cevap beklediği için
+    # bunlara bir hata ToolMessage'ı döndürülür.
+    usage = get_usage(state)
+    allowed = max(0, CHAT_MAX_TOOL_CALLS - usage["tool_calls"])
+    if len(tool_calls) > allowed:
+        print(f"🧮 Araç bütçesi doldu: {len(tool_calls)} çağrıdan sadece {allowed} tanesi çalıştırılacak.")
+        metrics.increment("chat_budget_exhausted_tool_calls")
+    usage["tool_calls"] += min(len(tool_calls), allowed)
+
+    # Semafor her istek için ayrı oluşturulur; sınır bir isteğin kendi araç çağrıları için geçerlidir.
+    semaphore = asyncio.Semaphore(max(1, TOOL_MAX_CONCURRENCY))
+
+    # asyncio.gather sonuçları, görevlerin bitiş sırasından bağımsız olarak verilen sırayla döndürür.
+    tool_outputs = await asyncio.gather(
+        *(_run_tool_call(tool_call, user_id, semaphore, state) for tool_call in tool_calls[:allowed])
+    )
+    skipped_outputs = [
+        ToolMessage(
+            content=f"'{tool_call['name']}' aracı, istek için ayrılan araç çağrısı sınırı aşıldığı için çalıştırılmadı.",
+            name=tool_call["name"], tool_call_id=tool_call["id"], status="error"
+        )
+        for tool_call in tool_calls[allowed:]
+    ]
+    return {"messages": list(tool_outputs) + skipped_outputs, "usage": usage}
+
+
+def execute_tools(state: GraphState) -> dict:
+    """
+    aexecute_tools düğümünün senkron versiyonu (langgraph_app.invoke gibi senkron çağrılar için).
+    Aynı eşzamanlı çalıştırma mantığını, bu iş parçacığına ait geçici bir event loop içinde yürütür.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(aexecute_tools(state))
+    finally:
+        # close(), zaman aşımına uğramış araçların iş parçacıklarını BEKLEMEDEN kapatır.
+        loop.close()
@@ -0,0 +1,83 @@
+# Bu dosya, SSS önbelleğinin kullanıcıya özel bölümünü tutar: sipariş araçlarıyla üretilen cevaplar
+# ("123 numaralı siparişim nerede?"). Bu cevaplar genel önbellekten (persistent_cache.py / shared_cache.py)
+# tamamen ayrı tutulur:
+# - Kendi kapasitesi (FAQ_CACHE_USER_MAX_SIZE) vardır; kişisel cevaplar ne kadar artarsa artsın genel SSS
+#   cevaplarını önbellekten çıkaramaz.
+# - Sadece süreç belleğinde tutulur; kişisel sipariş bilgisi asla diske (faq_cache.db) veya Redis'e yazılmaz.
+#   Her worker'ın kendi bölümü vardır, süreç yeniden başladığında boş başlar.
+# - Süresi dolan kayıtlar okunmayı beklemeden, her okuma/yazmada baştan temizlenir.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ..metrics import metrics
+
+# Kullanıcıya özel cevapların geçerlilik süresi. Sipariş/iade durumu değişebildiği için kısa tutulur;
+# bu cevaplar bayat olarak hiç verilmez.
+FAQ_CACHE_USER_TTL = int(os.getenv("FAQ_CACHE_USER_TTL", "60"))
+FAQ_CACHE_USER_MAX_SIZE = int(os.getenv("FAQ_CACHE_USER_MAX_SIZE", "1000"))
+
+
+def user_cache_key(user_id: str, query_hash: str) -> str:
+    """GÜVENLİK: anahtar user_id içerdiği için bir kullanıcının cevabı başka bir kullanıcıya asla dönmez."""
+    return f"user:{user_id}|{query_hash}"
+
+
+class UserAnswerCache:
+    """
+    Sabit TTL'li, boyutu sınırlı, thread-safe bellek içi önbellek. TTL her kayıt için aynı olduğundan kayıtlar
+    yazılma sırasıyla aynı zamanda süre dolma sırasındadır: süresi dolanlar ve kapasite aşıldığında çıkarılanlar
+    her zaman listenin başındadır.
+    """
+    def __init__(self, max_size: int = FAQ_CACHE_USER_MAX_SIZE, ttl: float = FAQ_CACHE_USER_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # anahtar -> (son geçerlilik zamanı, cevap)
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def _purge_expired(self, now: float):
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[key]
+            self._stats["expirations"] += 1
+
+    def get(self, user_id: str, query_hash: str) -> Optional[str]:
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            entry = self._entries.get(user_cache_key(user_id, query_hash))
+            self._stats["hits" if entry else "misses"] += 1
+        if entry:
+            metrics.increment("faq_cache_user_hits")
+        return entry[1] if entry else None
+
+    def set(self, user_id: str, query_hash: str, value: str):
+        key = user_cache_key(user_id, query_hash)
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            return {**self._stats, "size": len(self._entries), "max_size": self.max_size}
+
+
+# Süreç boyunca paylaşılan tek kullanıcıya özel önbellek
+user_answer_cache = UserAnswerCache()
@@ -60,4 +60,12 @@ def validate_input(state: GraphState) -> dict:
     
     print("✅ Validasyon Başarılı.")
     # Hiçbir sorun yoksa, hata olmadığını belirterek devam et
-    return {"validation_error": False}
\ No newline at end of file
+    return {"validation_error": False}
+
+
+async def avalidate_input(state: GraphState) -> dict:
+    """
+    validate_input düğümünün asenkron versiyonu.
+    Kontroller tamamen bellek içi olduğundan doğrudan senkron fonksiyon çağrılır.
+    """
+    return validate_input(state)
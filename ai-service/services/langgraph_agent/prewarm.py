@@ -0,0 +1,173 @@
+# Bu dosya, SSS önbelleğini data/documents/faq.txt'deki sorularla önceden doldurur (pre-warming).
+# Önbellek her dağıtımdan sonra boş başlar; ilk kullanıcılar Gemini gecikmesini ödemesin diye sık sorulan sorular
+# ve yaygın farklı ifade biçimleri (faq_paraphrases.json) önbelleğe önceden yüklenir.
+#
+# İki yol vardır:
+# - "faq" (ucuz, varsayılan): Cevap olarak doğrudan SSS belgesindeki cevap metni kullanılır; hiç model çağrısı yapılmaz.
+# - "graph": Her soru LangGraph akışından geçirilir; önbelleğe kullanıcıların alacağı cevabın aynısı yazılır.
+#   Farklı ifade biçimleri için model tekrar çağrılmaz, asıl sorunun cevabı kullanılır.
+# Her iki yolda da cevaplar dayandıkları SSS parçalarının kaynak etiketleriyle yazılır; faq.txt değiştiğinde
+# sadece değişen sorular geçersiz olur (bkz: provenance.py).
+# İşlem idempotenttir: önbellekte geçerli cevabı olan sorular atlanır (--force ile yeniden yazılır).
+#
+# Çalıştırma (depo kök dizininden): python -m ai-service.services.langgraph_agent.prewarm --mode graph --concurrency 4
+# Uygulama başlarken çalıştırmak için: FAQ_CACHE_PREWARM=faq (veya graph)
+
+import argparse
+import asyncio
+import json
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.messages import HumanMessage
+
+from .graph_state import GraphState
+from .deadline import compute_deadline
+from .metrics import metrics
+from .nodes.check_cache import cache_manager, generate_query_hash
+from .nodes.persistent_cache import FAQ_CACHE_DOCUMENT_TTL
+from .nodes.semantic_cache import semantic_cache
+from .fingerprint import fingerprint
+from .provenance import DOCUMENTS_DIR, chunk_tag, document_tag, load_document_chunks
+
+# Uygulama başlarken önbelleğin doldurulacağı yol: "off" (varsayılan), "faq" veya "graph"
+FAQ_CACHE_PREWARM = os.getenv("FAQ_CACHE_PREWARM", "off").lower()
+FAQ_CACHE_PREWARM_CONCURRENCY = int(os.getenv("FAQ_CACHE_PREWARM_CONCURRENCY", "4"))
+# "graph" yolunda araç çalıştırıcısı bir kullanıcı kimliği ister. Kullanıcıya özel araçların cevapları zaten
+# önbelleğe yazılmadığı için sabit bir servis kimliği kullanılır.
+PREWARM_USER_ID = "faq-cache-prewarm"
+
+FAQ_FILE = DOCUMENTS_DIR / "faq.txt"
+PARAPHRASES_FILE = DOCUMENTS_DIR / "faq_paraphrases.json"
+
+# "7. İade süresi ne kadardır?" biçimindeki soru satırları
+_QUESTION_PATTERN = re.compile(r"^\s*\d+\.\s+(.+?)\s*$")
+
+
+def parse_faq(path: Path = FAQ_FILE) -> list[tuple[str, str]]:
+    """SSS belgesindeki (soru, cevap) çiftlerini döndürür. Cevap, sorudan sonraki boş olmayan satırlardır."""
+    pairs = []
+    question, answer_lines = None, []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            match = _QUESTION_PATTERN.match(line)
+            if match or line.startswith("==="):
+                if question and answer_lines:
+                    pairs.append((question, " ".join(answer_lines)))
+                question, answer_lines = (match.group(1) if match else None), []
+            elif question and line.strip():
+                answer_lines.append(line.strip())
+    if question and answer_lines:
+        pairs.append((question, " ".join(answer_lines)))
+    return pairs
+
+
+def load_paraphrases(path: Path = PARAPHRASES_FILE) -> dict[str, list[str]]:
+    """{soru anahtarı: [farklı ifade biçimleri]} döndürür. Dosya yoksa boş sözlük döner."""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {generate_query_hash(question): variants for question, variants in json.load(f).items()}
+
+
+def faq_sources(question: str, chunks: list, faq_path: Path = FAQ_FILE) -> list[str]:
+    """SSS cevabının kaynak etiketleri: sorunun geçtiği parçalar (bulunamazsa belgenin tamamı)."""
+    tags = [chunk_tag(chunk.metadata["source"], chunk.page_content) for chunk in chunks if question in chunk.page_content]
+    return tags or [document_tag(str(faq_path), fingerprint(faq_path.read_text(encoding="utf-8")))]
+
+
+def _store(question: str, answer: str, sources: list[str], ttl: Optional[int]):
+    query_hash = generate_query_hash(question)
+    cache_manager.set(query_hash, answer, sources=sources, ttl=ttl)
+    if semantic_cache is not None:
+        semantic_cache.add(question, query_hash)
+
+
+async def _answer_with_graph(question: str) -> Optional[str]:
+    """Soruyu LangGraph akışından geçirir. Cevap önbelleğe cache_final_answer düğümü tarafından yazılır."""
+    from . import run_langgraph_chat
+
+    result = await run_langgraph_chat(GraphState(
+        messages=[HumanMessage(content=question)],
+        user_id=PREWARM_USER_ID,
+        deadline=compute_deadline()
+    ))
+    if result["timed_out"] or generate_query_hash(question) not in cache_manager:
+        return None
+    return result["output"]
+
+
+async def prewarm_answer_cache(mode: str = "faq", concurrency: int = FAQ_CACHE_PREWARM_CONCURRENCY,
+                               force: bool = False, faq_path: Path = FAQ_FILE,
+                               paraphrases_path: Path = PARAPHRASES_FILE) -> dict:
+    """
+    SSS sorularını ve farklı ifade biçimlerini önbelleğe yükler; en fazla 'concurrency' soru aynı anda işlenir.
+    {"cached": ..., "skipped": ..., "failed": ...} döndürür.
+    """
+    if mode not in ("faq", "graph"):
+        raise ValueError(f"Bilinmeyen ön yükleme yolu: '{mode}'")
+
+    pairs = parse_faq(faq_path)
+    paraphrases = load_paraphrases(paraphrases_path)
+    chunks = load_document_chunks([faq_path])
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    report = {"cached": 0, "skipped": 0, "failed": 0}
+
+    async def warm(question: str, faq_answer: str):
+        questions = [question] + paraphrases.get(generate_query_hash(question), [])
+        missing = [text for text in questions if force or generate_query_hash(text) not in cache_manager]
+        report["skipped"] += len(questions) - len(missing)
+        if not missing:
+            return
+
+        async with semaphore:
+            answer = faq_answer
+            sources, ttl = faq_sources(question, chunks, faq_path), FAQ_CACHE_DOCUMENT_TTL
+            if mode == "graph":
+                try:
+                    if question in missing:
+                        # --force ile yeniden yazılıyorsa check_cache eski cevabı döndürmesin.
+                        cache_manager.delete(generate_query_hash(question))
+                        answer = await _answer_with_graph(question)
+                    else:
+                        # Asıl soru zaten önbellekte; model çağrılmaz, sadece eksik ifade biçimleri yazılır.
+                        answer = cache_manager.get(generate_query_hash(question))
+                except Exception as e:
+                    print(f"❌ Ön yükleme sırasında '{question}' sorusu cevaplanamadı: {e}")
+                    answer = None
+                if answer is None:
+                    report["failed"] += len(missing)
+                    return
+                # Etiketler, cevabı üreten akışın (cache_final_answer) asıl soruya yazdığı etiketlerdir.
+                sources, ttl = cache_manager.provenance(generate_query_hash(question))
+            for text in missing:
+                await asyncio.to_thread(_store, text, answer, sources, ttl)
+        report["cached"] += len(missing)
+
+    print(f"🔥 SSS önbelleği ön yüklemesi başladı ({mode}): {len(pairs)} soru, {sum(map(len, paraphrases.values()))} farklı ifade")
+    await asyncio.gather(*(warm(question, answer) for question, answer in pairs))
+    metrics.increment("faq_cache_prewarmed", report["cached"])
+    print(f"🔥 SSS önbelleği ön yüklemesi bitti: {report}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSS önbelleğini önceden doldurur")
+    parser.add_argument("--mode", choices=["faq", "graph"], default="faq")
+    parser.add_argument("--concurrency", type=int, default=FAQ_CACHE_PREWARM_CONCURRENCY)
+    parser.add_argument("--force", action="store_true", help="Önbellekte olan cevapları da yeniden yaz")
+    parser.add_argument("--faq", type=Path, default=FAQ_FILE)
+    parser.add_argument("--paraphrases", type=Path, default=PARAPHRASES_FILE)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(prewarm_answer_cache(args.mode, args.concurrency, args.force, args.faq, args.paraphrases))
+    finally:
+        # Write-behind ile biriken değişiklikler süreç bitmeden diske yazılır.
+        cache_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# Bu dosya, SSS önbelleğindeki cevapların hangi araçlardan ve hangi belge parçalarından (chunk) üretildiğini
+# (provenance) etiketlemek ve belgeler değiştiğinde sadece etkilenen cevapları geçersiz kılmak için kullanılır.
+#
+# Kaynak etiketleri:
+# - "tool:<araç adı>"             Cevap üretilirken çağrılan araç
+# - "chunk:<belge>#<parmak izi>"  Belge aramasının döndürdüğü parça; parmak izi parçanın metninden hesaplanır,
+#                                 böylece metni değişen parçanın etiketi de değişir
+# - "doc:<belge>#<parmak izi>"    Belgenin tamamına bağlı cevaplar; parmak izi dosyanın metninden hesaplanır,
+#                                 böylece belgede herhangi bir değişiklik olunca etiket geçersiz olur
+#
+# Belgelerin son görülen hâli (dosya ve parça parmak izleri) bir manifest dosyasında tutulur. Uygulama başlarken
+# (veya aşağıdaki komutla) güncel belgeler manifestle karşılaştırılır; kaybolan/değişen parçalara bağlı cevaplar silinir.
+# Etiketler içerik parmak izi taşıdığı için her süreç ayrıca kendi belleğindeki kayıtların etiketlerini güncel
+# belgelerle karşılaştırır: birden fazla worker'da manifesti ilk worker günceller, diğerleri değişikliği manifestten
+# göremez ama aynı eski kayıtları belleklerine yüklemiş olabilir.
+#
+# Çalıştırma (depo kök dizininden, belgeler düzenlendikten sonra): python -m ai-service.services.langgraph_agent.provenance
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from langchain_community.document_loaders import TextLoader
+from langchain_text_splitters import CharacterTextSplitter
+
+from .fingerprint import fingerprint
+from .metrics import metrics
+
+DOCUMENTS_DIR = Path(__file__).resolve().parents[2] / "data" / "documents"
+# Vektör deposuna indekslenen ve cevapların dayanabileceği temel belgeler. Belge klasörüne eklenen diğer .txt
+# dosyaları da indekslenir (bkz: document_paths).
+DOCUMENT_FILES = ("faq.txt", "policy.txt")
+
+# Belgelerin parçalara bölünme ayarları (vektör deposu da aynı ayarlarla oluşturulur)
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+
+# Belgelerin son görülen parmak izlerinin tutulduğu dosya
+DOCUMENT_MANIFEST_PATH = os.getenv("DOCUMENT_MANIFEST_PATH", "document_manifest.json")
+
+
+def tool_tag(tool_name: str) -> str:
+    return f"tool:{tool_name}"
+
+
+def document_tag(source: str, file_hash: str) -> str:
+    return f"doc:{Path(source).name}#{file_hash[:16]}"
+
+
+def chunk_tag(source: str, text: str) -> str:
+    return f"chunk:{Path(source).name}#{fingerprint(text)[:16]}"
+
+
+def is_document_tag(tag: str) -> bool:
+    return tag.startswith(("doc:", "chunk:"))
+
+
+def document_paths(documents_dir: Path = DOCUMENTS_DIR) -> list[Path]:
+    extra = sorted(path for path in documents_dir.glob("*.txt") if path.name not in DOCUMENT_FILES)
+    return [documents_dir / name for name in DOCUMENT_FILES] + extra
+
+
+def load_document_chunks(paths: list[Path]) -> list:
+    """Belgeleri yükler ve vektör deposuyla aynı ayarlarla parçalara böler. Bulunamayan belgeler atlanır."""
+    docs = []
+    for path in paths:
+        if not path.exists():
+            print(f"⚠️ Uyarı: Belge dosyası bulunamadı, atlanıyor: {path}")
+            continue
+        docs.extend(TextLoader(str(path), encoding="utf-8").load())
+    splitter = CharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    return splitter.split_documents(docs)
+
+
+def build_document_manifest(documents_dir: Path = DOCUMENTS_DIR) -> dict:
+    """{belge adı: {"hash": dosya parmak izi, "chunks": [parça etiketleri]}} döndürür."""
+    manifest = {}
+    for path in document_paths(documents_dir):
+        if not path.exists():
+            continue
+        manifest[path.name] = {
+            "hash": fingerprint(path.read_text(encoding="utf-8")),
+            "chunks": sorted({chunk_tag(chunk.metadata["source"], chunk.page_content)
+                              for chunk in load_document_chunks([path])}),
+        }
+    return manifest
+
+
+def stale_sources(previous: dict, current: dict) -> set[str]:
+    """Önceki manifestte olup artık geçerli olmayan kaynak etiketlerini döndürür."""
+    stale = set()
+    for name, document in previous.items():
+        current_document = current.get(name)
+        if current_document is not None and current_document["hash"] == document["hash"]:
+            continue
+        stale.add(document_tag(name, document["hash"]))
+        current_chunks = set(current_document["chunks"]) if current_document else set()
+        stale.update(tag for tag in document["chunks"] if tag not in current_chunks)
+    return stale
+
+
+def current_sources(manifest: dict) -> set[str]:
+    """Manifestteki belgelerin güncel belge ve parça etiketlerini döndürür."""
+    sources = set()
+    for name, document in manifest.items():
+        sources.add(document_tag(name, document["hash"]))
+        sources.update(document["chunks"])
+    return sources
+
+
+def read_document_manifest(path: str = DOCUMENT_MANIFEST_PATH) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+
+
+def write_document_manifest(manifest: dict, path: str = DOCUMENT_MANIFEST_PATH):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def invalidate_changed_documents(cache, manifest_path: str = DOCUMENT_MANIFEST_PATH,
+                                 documents_dir: Path = DOCUMENTS_DIR) -> int:
+    """
+    Belgeleri manifestle karşılaştırır ve değişen belgelere/parçalara bağlı cevapları önbellekten siler. Önbelleğin
+    bu süreçte yüklü kayıtlarının belge etiketleri de güncel belgelerle karşılaştırılır; böylece manifesti başka bir
+    worker güncellemiş olsa bile eski kayıtlar silinir. Silinen cevap sayısını döndürür.
+    """
+    current = build_document_manifest(documents_dir)
+    previous = read_document_manifest(manifest_path)
+    stale = stale_sources(previous or {}, current) | (cache.document_sources() - current_sources(current))
+    if previous == current and not stale:
+        return 0
+
+    # Önbelleğe alınmış belge araması sonuçları eski parçaları içerebilir; bunlar kalırsa cevap yeniden üretilip
+    # güncel kaynak etiketleriyle tekrar önbelleğe yazılırdı. Döngüsel import: tool_cache -> tools -> provenance
+    from .tool_cache import tool_cache
+    tool_cache.clear("search_documents_tool")
+
+    removed = 0
+    if stale:
+        removed = cache.invalidate_sources(stale)
+        metrics.increment("faq_cache_provenance_invalidations", removed)
+        changed = sorted({tag.split(":", 1)[1].split("#", 1)[0] for tag in stale})
+        print(f"📄 Değişen belgeler: {changed}; {len(stale)} etiket geçersiz, {removed} cevap önbellekten silindi.")
+    if previous != current:
+        write_document_manifest(current, manifest_path)
+    return removed
+
+
+def main():
+    from .nodes.check_cache import cache_manager
+
+    try:
+        invalidate_changed_documents(cache_manager)
+    finally:
+        cache_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Bu dosya, belge aramasının hangi indekslerle yapılacağını belirler (RETRIEVAL_MODE):
+# - hybrid (varsayılan): FAISS vektör araması ile yerel BM25 araması (lexical_index.py) birleştirilir.
+#   Vektör deposu hazır değilse veya embedding API'si hata verirse arama BM25 ile cevaplanır.
+# - vector: sadece FAISS (eski davranış)
+# - lexical: sadece BM25; hiç ağ çağrısı yapılmaz ve vektör deposu yüklenmez.
+#
+# Sonuçlar Reciprocal Rank Fusion ile birleştirilir: BM25 puanı ile FAISS uzaklığı aynı ölçekte olmadığından
+# puanlar yerine her listedeki sıralar kullanılır (puan = Σ 1 / (RRF_K + sıra)).
+# Modların isabet ve gecikme kıyaslaması: python -m ai-service.benchmarks.evaluate_retrieval
+
+import os
+from typing import Optional
+
+from .lexical_index import get_lexical_index
+from .provenance import chunk_tag
+from .vector_store import get_vector_store, vector_store_status
+from .metrics import metrics
+
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+RETRIEVAL_MODES = ("hybrid", "vector", "lexical")
+if RETRIEVAL_MODE not in RETRIEVAL_MODES:
+    print(f"⚠️ Geçersiz RETRIEVAL_MODE '{RETRIEVAL_MODE}', 'hybrid' kullanılıyor.")
+    RETRIEVAL_MODE = "hybrid"
+# Kullanıcıya/modele döndürülen parça sayısı ve birleştirmeden önce her indeksten alınan aday sayısı
+RETRIEVAL_TOP_K = 3
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "10"))
+RRF_K = 60
+
+
+def _chunk_id(document) -> str:
+    return chunk_tag(document.metadata.get("source", "unknown"), document.page_content)
+
+
+def reciprocal_rank_fusion(rankings: list[list], k: int = RETRIEVAL_TOP_K) -> list:
+    """Sıralı parça listelerini birleştirir; aynı parça (aynı kimlik) her listede puan toplar."""
+    scores: dict[str, float] = {}
+    documents = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking, start=1):
+            chunk_id = _chunk_id(document)
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1 / (RRF_K + rank)
+            documents.setdefault(chunk_id, document)
+    return [documents[chunk_id] for chunk_id in sorted(scores, key=scores.get, reverse=True)[:k]]
+
+
+def retrieve(query: str, mode: str = RETRIEVAL_MODE, k: int = RETRIEVAL_TOP_K) -> Optional[list]:
+    """
+    Soruyla ilgili en fazla k belge parçasını döndürür. Seçilen modda arama yapılamıyorsa
+    (vector modunda vektör deposu hazır değil) None döner; embedding API'sinin hatası vector modunda yükseltilir.
+    """
+    lexical = []
+    if mode != "vector":
+        lexical = [document for document, _ in get_lexical_index().search(query, RETRIEVAL_CANDIDATES)]
+        if mode == "lexical":
+            return lexical[:k]
+
+    db = get_vector_store()
+    if db is None:
+        if mode == "vector":
+            return None
+        metrics.increment("retrieval_lexical_fallbacks")
+        return lexical[:k]
+
+    try:
+        vector = db.similarity_search(query, k=RETRIEVAL_CANDIDATES if mode == "hybrid" else k)
+    except Exception as e:
+        if mode == "vector":
+            raise
+        metrics.increment("retrieval_lexical_fallbacks")
+        print(f"⚠️ Vektör araması yapılamadı, sözcüksel (BM25) sonuçlar kullanılıyor: {e}")
+        return lexical[:k]
+
+    if mode == "vector":
+        return vector
+    return reciprocal_rank_fusion([vector, lexical], k)
+
+
+def retrieval_status() -> dict:
+    """
+    Belge aramasının hazır olup olmadığını döndürür (GET /ready). Sadece vector modunda vektör deposu beklenir;
+    lexical ve hybrid modlarında BM25 hemen cevap verebildiği için arama hazırdır. hybrid modunda vektör deposu
+    yüklenene kadar 'degraded' true döner (arama kalitesi tam değildir).
+    """
+    vector_store = vector_store_status()
+    ready = RETRIEVAL_MODE != "vector" or vector_store["ready"]
+    degraded = RETRIEVAL_MODE == "hybrid" and not vector_store["ready"]
+    return {"ready": ready, "degraded": degraded, "mode": RETRIEVAL_MODE, "vector_store": vector_store}
@@ -0,0 +1,108 @@
+# Bu dosya, SSS önbelleğinde süresi dolmuş (bayat) cevapların arka planda yenilenmesini sağlar (stale-while-revalidate).
+# check_cache, süresi geçmiş ama FAQ_CACHE_MAX_STALENESS sınırını aşmamış bir cevabı kullanıcıya hemen verir ve
+# yenilemeyi buraya bırakır; böylece hiçbir kullanıcı bir saat önce cevapladığımız bir soru için model gecikmesini beklemez.
+#
+# - Aynı soru için aynı anda sadece bir yenileme çalışır; en fazla FAQ_CACHE_REFRESH_CONCURRENCY yenileme aynı anda yapılır.
+# - Yenileme, soruyu önbelleği atlayarak (cache_refresh) LangGraph akışından geçirir; yeni cevap cache_final_answer
+#   tarafından önbelleğe yazılır. Yenileme başarısız olursa bayat cevap, sınır dolana kadar verilmeye devam eder.
+
+import asyncio
+import os
+import threading
+import time
+
+from langchain_core.messages import HumanMessage
+
+from .graph_state import GraphState
+from .deadline import compute_deadline
+from .metrics import metrics
+
+FAQ_CACHE_REFRESH_CONCURRENCY = int(os.getenv("FAQ_CACHE_REFRESH_CONCURRENCY", "2"))
+# Yenileme çalıştırmalarında araç çalıştırıcısının istediği kullanıcı kimliği. Kullanıcıya özel araçların cevapları
+# zaten önbelleğe yazılmadığı için sabit bir servis kimliği kullanılır.
+REFRESH_USER_ID = "faq-cache-refresh"
+
+
+class CacheRevalidator:
+    """
+    Bayat önbellek cevaplarını arka plan görevleriyle yeniler. schedule() hem event loop'tan hem de bir iş
+    parçacığından (örn: asyncio.to_thread içinde çalışan check_cache) çağrılabilir; görevler her zaman
+    uygulamanın event loop'unda çalışır.
+    """
+    def __init__(self, concurrency: int = FAQ_CACHE_REFRESH_CONCURRENCY):
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._lock = threading.Lock()
+        self._inflight: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._loop = None
+
+    def start(self):
+        """Uygulama başlarken event loop içinde çağrılır; iş parçacıklarından gelen yenilemeler bu loop'ta çalışır."""
+        self._loop = asyncio.get_running_loop()
+
+    def schedule(self, query: str, query_hash: str) -> bool:
+        """Soru için bir yenileme başlatır. Aynı soru zaten yenileniyorsa veya loop yoksa False döner."""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        loop = running_loop or self._loop
+        if loop is None or loop.is_closed():
+            return False
+
+        with self._lock:
+            if query_hash in self._inflight:
+                return False
+            self._inflight.add(query_hash)
+
+        metrics.increment("faq_cache_refreshes_scheduled")
+        if loop is running_loop:
+            self._spawn(query, query_hash)
+        else:
+            loop.call_soon_threadsafe(self._spawn, query, query_hash)
+        return True
+
+    def _spawn(self, query: str, query_hash: str):
+        task = asyncio.create_task(self._refresh(query, query_hash))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, query: str, query_hash: str):
+        from . import run_langgraph_chat
+        from .nodes.check_cache import cache_manager
+
+        try:
+            async with self._semaphore:
+                started_at = time.perf_counter()
+                result = await run_langgraph_chat(GraphState(
+                    messages=[HumanMessage(content=query)],
+                    user_id=REFRESH_USER_ID,
+                    deadline=compute_deadline(),
+                    cache_refresh=True
+                ))
+                metrics.observe("faq_cache_refresh_latency", time.perf_counter() - started_at)
+            # Yeni cevap önbelleğe yazılmadıysa (zaman aşımı, hatalı/olumsuz cevap) bayat cevap yerinde kalır.
+            if result["timed_out"] or query_hash not in cache_manager:
+                metrics.increment("faq_cache_refresh_failures")
+                print(f"⚠️ Bayat önbellek cevabı yenilenemedi: '{query}'")
+            else:
+                metrics.increment("faq_cache_refreshes")
+                print(f"🔄 Bayat önbellek cevabı yenilendi: '{query}'")
+        except Exception as e:
+            metrics.increment("faq_cache_refresh_failures")
+            print(f"❌ Önbellek yenilemesi sırasında hata: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(query_hash)
+
+    async def stop(self):
+        """Uygulama kapanırken devam eden yenilemeleri iptal eder."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = None
+
+
+# Uygulama boyunca paylaşılan tek yenileyici
+cache_revalidator = CacheRevalidator()
@@ -0,0 +1,60 @@
+# Bu dosya, aynı soruyu soran eşzamanlı isteklerin tek bir grafik çalıştırmasını paylaşmasını sağlar (single-flight).
+# Bir kampanya sonrası yüzlerce kullanıcı aynı soruyu sorduğunda, ilk cevap önbelleğe yazılana kadar
+# gelen tüm istekler Gemini'ye gitmek yerine devam eden çalıştırmanın sonucunu bekler.
+
+import asyncio
+
+from .metrics import metrics
+
+
+class SingleFlight:
+    """
+    Aynı anahtarla gelen eşzamanlı çağrıları tek bir çalıştırmada birleştirir.
+    İlk gelen çağrı (lider) işi başlatır; iş bitene kadar aynı anahtarla gelen diğer çağrılar
+    aynı sonucu bekler. İş bittiğinde anahtar temizlenir; sonraki çağrılar yeni bir iş başlatır.
+    Bir işi bekleyen TÜM çağrılar iptal edilirse (örn: hepsinin istemcisi bağlantıyı kapattı), iş de iptal edilir.
+    Tek bir event loop içinde kullanılmak üzere tasarlanmıştır (uvicorn worker başına bir tane).
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+
+    async def run(self, key: str, coro_factory):
+        """
+        'key' için devam eden bir iş varsa onun sonucunu bekler, yoksa 'coro_factory()' ile yeni bir iş başlatır.
+        (sonuç, paylaşıldı_mı) ikilisini döndürür.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            metrics.increment(f"{self.name}_coalesced")
+            return await self._wait(task), True
+
+        task = asyncio.ensure_future(coro_factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda finished: self._forget(key, finished))
+        metrics.increment(f"{self.name}_leaders")
+        return await self._wait(task), False
+
+    async def _wait(self, task: asyncio.Task):
+        """
+        Ortak işi bekler. shield sayesinde bekleyen bir isteğin iptali ortak işi doğrudan iptal etmez;
+        iş yalnızca onu bekleyen son istek de iptal edildiğinde iptal edilir.
+        """
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(task) == 1 and not task.done():
+                print(f"🛑 '{self.name}': Ortak işi bekleyen istek kalmadı, iş iptal ediliyor.")
+                metrics.increment(f"{self.name}_cancelled")
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if self._waiters[task] == 0:
+                del self._waiters[task]
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
@@ -0,0 +1,137 @@
+# Bu dosya, execute_tools düğümünün çalıştırdığı araçların sonuçlarını araç başına bir TTL/LRU önbelleğinde tutar.
+# Katalog araçlarının (ürün detayı, belge araması) anahtarları tüm kullanıcılar için ortaktır;
+# sipariş araçlarının anahtarları ise user_id içerir, böylece bir kullanıcının verisi başka birine asla dönmez.
+# Hata ile biten araç çağrıları önbelleğe yazılmaz.
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Union
+
+from .metrics import metrics
+from .tools import USER_SCOPED_TOOL_NAMES
+
+# Araç önbelleği tamamen kapatılabilir (örn: hata ayıklarken)
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+
+
+def _tool_setting(tool_name: str, setting: str, default: int) -> int:
+    """Araç ayarını ortam değişkeninden okur. Örn: TOOL_CACHE_GET_PRODUCT_DETAILS_TOOL_TTL=60"""
+    return int(os.getenv(f"TOOL_CACHE_{tool_name.upper()}_{setting}", str(default)))
+
+
+# Araç başına varsayılan süre (saniye) ve boyut. Listede olmayan araçlar önbelleğe alınmaz.
+# - Ürün detayı: fiyat/stok değişebildiği için kısa tutulur.
+# - Belge araması: belgeler sadece yeniden indekslemede değişir; indeks yüklendiğinde veya belgeler değiştiğinde
+#   bu aracın önbelleği tamamen temizlenir (bkz: vector_store.get_vector_store, provenance.invalidate_changed_documents).
+# - Sipariş araçları: kullanıcıya özeldir; aynı sohbet içindeki tekrarları karşılayacak kadar kısa tutulur.
+TOOL_CACHE_DEFAULTS = {
+    "get_product_details_tool": {"ttl": 60, "maxsize": 256},
+    "search_documents_tool": {"ttl": 3600, "maxsize": 512},
+    "get_payment_amount_tool": {"ttl": 30, "maxsize": 1024},
+    "get_item_status_tool": {"ttl": 30, "maxsize": 1024},
+    "get_refund_status_tool": {"ttl": 30, "maxsize": 1024},
+}
+
+
+# Araç sonucu: metin veya belge araması için (metin, kaynak etiketleri) çifti
+ToolResult = Union[str, tuple[str, list[str]]]
+
+
+class TTLCache:
+    """
+    Thread-safe, boyut sınırlı (LRU) ve süreli (TTL) basit bir önbellek.
+    Araçlar iş parçacıklarında çalıştığı için tüm işlemler bir kilit altında yapılır.
+    """
+    def __init__(self, name: str, ttl: int, maxsize: int):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, ToolResult]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[ToolResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                metrics.increment(f"tool_cache_{self.name}_misses")
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                metrics.increment(f"tool_cache_{self.name}_expired")
+                metrics.increment(f"tool_cache_{self.name}_misses")
+                return None
+            self._entries.move_to_end(key)
+            metrics.increment(f"tool_cache_{self.name}_hits")
+            return value
+
+    def set(self, key: str, value: ToolResult):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                metrics.increment(f"tool_cache_{self.name}_evictions")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class ToolResultCache:
+    """Her araç için ayrı bir TTLCache tutar ve araç çağrısından önbellek anahtarını üretir."""
+    def __init__(self, enabled: bool = TOOL_CACHE_ENABLED):
+        self.enabled = enabled
+        self._caches: dict[str, TTLCache] = {}
+        for tool_name, defaults in TOOL_CACHE_DEFAULTS.items():
+            ttl = _tool_setting(tool_name, "TTL", defaults["ttl"])
+            maxsize = _tool_setting(tool_name, "SIZE", defaults["maxsize"])
+            if ttl > 0 and maxsize > 0:
+                self._caches[tool_name] = TTLCache(tool_name, ttl, maxsize)
+
+    @staticmethod
+    def make_key(tool_name: str, args: dict, user_id: Optional[str]) -> str:
+        """
+        Argümanlardan sıradan bağımsız bir anahtar üretir. Metin argümanları küçük harfe çevrilir ve
+        boşlukları sadeleştirilir (veritabanı aramaları zaten ILIKE ile büyük/küçük harf duyarsızdır).
+        GÜVENLİK: Kullanıcıya özel araçların anahtarı user_id içerir.
+        """
+        normalized = {
+            name: " ".join(value.lower().split()) if isinstance(value, str) else value
+            for name, value in args.items()
+        }
+        key = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+        if tool_name in USER_SCOPED_TOOL_NAMES:
+            return f"user:{user_id}|{key}"
+        return f"global|{key}"
+
+    def get(self, tool_name: str, args: dict, user_id: Optional[str]) -> Optional[ToolResult]:
+        cache = self._caches.get(tool_name) if self.enabled else None
+        if cache is None:
+            return None
+        return cache.get(self.make_key(tool_name, args, user_id))
+
+    def set(self, tool_name: str, args: dict, user_id: Optional[str], value: ToolResult):
+        """Sadece BAŞARILI araç sonuçları için çağrılmalıdır; hatalar asla önbelleğe yazılmaz."""
+        cache = self._caches.get(tool_name) if self.enabled else None
+        if cache is not None:
+            cache.set(self.make_key(tool_name, args, user_id), value)
+
+    def clear(self, tool_name: Optional[str] = None):
+        for name, cache in self._caches.items():
+            if tool_name is None or name == tool_name:
+                cache.clear()
+
+    def sizes(self) -> dict:
+        return {name: len(cache) for name, cache in self._caches.items()}
+
+
+# Uygulama boyunca paylaşılan tek araç önbelleği
+tool_cache = ToolResultCache()
@@ -21,6 +21,20 @@ all_tools = [
     search_documents_tool,
 ]
 
+# Sonucu çağıran kullanıcıya özel olan (user_id ile sorgulanan) araçlar.
+# Bu araçların ürettiği cevaplar asla başka bir kullanıcıyla paylaşılmamalıdır.
+USER_SCOPED_TOOL_NAMES = {
+    "get_payment_amount_tool",
+    "get_item_status_tool",
+    "get_refund_status_tool",
+}
+
+# Sonucu sadece belgelere (SSS, politika) dayanan araçlar. Yalnızca bu araçlarla üretilen cevaplar belge
+# değiştiğinde hedefli olarak silinebildiği için önbellekte daha uzun tutulur (FAQ_CACHE_DOCUMENT_TTL).
+DOCUMENT_TOOL_NAMES = {
+    "search_documents_tool",
+}
+
 # İyi bir pratik olarak, dışa aktarılacakları __all__ listesinde belirtelim.
 # "from .tools import *" kullanıldığında sadece all_tools'un import edilmesini sağlar.
-__all__ = ["all_tools"]
\ No newline at end of file
+__all__ = ["all_tools", "USER_SCOPED_TOOL_NAMES", "DOCUMENT_TOOL_NAMES"]
\ No newline at end of file
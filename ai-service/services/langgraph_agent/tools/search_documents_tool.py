@@ -1,6 +1,34 @@
 from langchain_core.tools import tool
-# DİKKAT: Artık `db`'yi aynı klasördeki `vector_store`'dan alıyoruz.
-from ..vector_store import db
+# DİKKAT: Arama, RETRIEVAL_MODE'a göre FAISS ve/veya yerel BM25 indeksiyle yapılır (bkz: retrieval.py).
+from ..retrieval import retrieve
+from ..provenance import chunk_tag
+
+
+class DocumentSearchError(Exception):
+    """Belge araması yapılamadığında fırlatılır; hata sonuçları araç önbelleğine yazılmaz."""
+
+
+def search_documents(query: str) -> tuple[str, list[str]]:
+    """
+    Belge aramasını yapar; bulunan metni ve cevabın dayandığı parçaların kaynak etiketlerini döndürür.
+    Etiketler, SSS önbelleğinde belge değiştiğinde hangi cevapların silineceğini belirlemek için kullanılır.
+    """
+    try:
+        print(f"📄 Belge araması (RAG) yapılıyor: '{query}'")
+        docs = retrieve(query)
+    except Exception as e:
+        print(f"❌ Belge arama sırasında hata: {e}")
+        raise DocumentSearchError("Belgeleri ararken bir sorunla karşılaşıldı. Lütfen daha sonra tekrar deneyin.") from e
+
+    if docs is None:
+        raise DocumentSearchError("Belge arama servisi şu anda kullanılamıyor.")
+    if not docs:
+        return "Belgelerde bu konuyla ilgili bir bilgi bulunamadı.", []
+
+    context = "\n\n---\n\n".join(doc.page_content for doc in docs)
+    sources = [chunk_tag(doc.metadata.get("source", "unknown"), doc.page_content) for doc in docs]
+    return f"Konuyla ilgili belgelerden şu bilgiler bulundu:\n\n{context}", sources
+
 
 @tool
 def search_documents_tool(query: str) -> str:
@@ -9,19 +37,4 @@ def search_documents_tool(query: str) -> str:
     kullanım koşulları veya sıkça sorulan sorular (SSS) gibi genel bir sorusu olduğunda kullanılır.
     Ürün fiyatı, stok durumu gibi spesifik veritabanı bilgileri için KULLANILMAZ.
     """
-    try:
-        if not db:
-            return "Belge arama servisi şu anda kullanılamıyor."
-        
-        print(f"📄 Belge araması (RAG) yapılıyor: '{query}'")
-        docs = db.similarity_search(query, k=3)
-        
-        if not docs:
-            return "Belgelerde bu konuyla ilgili bir bilgi bulunamadı."
-            
-        context = "\n\n---\n\n".join(doc.page_content for doc in docs)
-        return f"Konuyla ilgili belgelerden şu bilgiler bulundu:\n\n{context}"
-    
-    except Exception as e:
-        print(f"❌ Belge arama sırasında hata: {e}")
-        return "Belgeleri ararken bir sorunla karşılaşıldı. Lütfen daha sonra tekrar deneyin."
\ No newline at end of file
+    return search_documents(query)[0]
\ No newline at end of file
@@ -1,97 +1,259 @@
-# Bu dosya, FAISS vektör veritabanını başlatmaktan ve diğer modüllerin kullanımına hazır bir db nesnesi sunmaktan sorumludur.
+# Bu dosya, FAISS vektör veritabanını yönetmekten ve diğer modüllere get_vector_store() ile sunmaktan sorumludur.
+# İndeks import sırasında yüklenmez; böylece araçları import etmek (ve uvicorn'un açılması) indeks yüklemesini
+# veya belgelerin Gemini ile embed edilmesini beklemez:
+# - Sunucuda indeks, VECTOR_STORE_PRELOAD=true ise (varsayılan) uygulama başlarken arka planda, değilse ilk belge
+#   aramasında yüklenir. Yüklenip yüklenmediği GET /ready ile izlenir.
+# - İndeks diskte yoksa ve VECTOR_STORE_AUTO_BUILD=true ise (varsayılan) sunucu belgelerden indeksi oluşturur.
+#   Üretimde indeks imaj oluşturulurken veya CI'da aşağıdaki komutla önceden oluşturulmalı ve
+#   VECTOR_STORE_AUTO_BUILD=false yapılmalıdır; böylece soğuk başlangıçta hiç embedding çağrısı yapılmaz.
+#
+# İndeks artımlı olarak güncellenir: her parçanın kimliği metninin parmak izidir (önbellek kaynak etiketiyle aynı,
+# bkz: provenance.py). Belgeler değiştiğinde sadece yeni/değişen parçalar embed edilir, artık bulunmayan parçaların
+# vektörleri kimlikleriyle silinir; belge klasörüne eklenen yeni .txt dosyaları da aynı şekilde eklenir.
+# Embedding modeli veya parça ayarları değişirse (indeks manifestine bakılarak) indeks baştan oluşturulur.
+#
+# İndeksi güncelleme (depo kök dizininden): python -m ai-service.services.langgraph_agent.vector_store [--force]
 
+import argparse
+import asyncio
 import os
+import threading
+import time
 from dotenv import load_dotenv
 from pathlib import Path
 
 # Gerekli LangChain kütüphaneleri
 from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import TextLoader
-from langchain_text_splitters import CharacterTextSplitter
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
+from .provenance import (CHUNK_SIZE, CHUNK_OVERLAP, chunk_tag, document_paths, load_document_chunks,
+                         read_document_manifest, write_document_manifest)
+from .metrics import metrics
+from .embedding_cache import create_embedding_cache
+from .embedding_batcher import batch_query_embeddings
+
 # Ortam değişkenlerini yükle
 load_dotenv()
 
-# Embedding modelini (metinleri vektöre çeviren model) yükle
+VECTOR_STORE_PRELOAD = os.getenv("VECTOR_STORE_PRELOAD", "true").lower() == "true"
+VECTOR_STORE_AUTO_BUILD = os.getenv("VECTOR_STORE_AUTO_BUILD", "true").lower() == "true"
+# Yükleme başarısız olursa (örn: embedding servisine ulaşılamadı) tekrar denemeden önce beklenecek süre (saniye)
+VECTOR_STORE_RETRY_INTERVAL = float(os.getenv("VECTOR_STORE_RETRY_INTERVAL", "30"))
+
+# Embedding modelini (metinleri vektöre çeviren model) yükle. Aynı metinler tekrar embed edilmesin diye
+# model diskte kalıcı bir önbellekle sarılır (bkz: embedding_cache.py); önbellekte olmayan ve aynı anda gelen
+# sorular tek bir API çağrısında toplanır (bkz: embedding_batcher.py).
 try:
-    embedding_model = GoogleGenerativeAIEmbeddings(
+    embedding_model = create_embedding_cache(batch_query_embeddings(GoogleGenerativeAIEmbeddings(
         model="models/embedding-001",
         google_api_key=os.getenv("GEMINI_API_KEY")
-    )
+    )))
 except Exception as e:
     print(f"❌ Embedding modeli başlatılamadı: {e}")
     embedding_model = None
 
 
-def load_or_create_vector_store():
+def _find_project_root() -> Path:
+    """Bu dosyadan yukarı doğru çıkarak 'ai-service' klasörünü bulur."""
+    project_root = Path(__file__).resolve()
+    while project_root.name != 'ai-service':
+        project_root = project_root.parent
+        if project_root == project_root.parent: # Kök dizine ulaşıldı ve bulunamadı
+            raise FileNotFoundError("Proje kök dizini 'ai-service' bulunamadı.")
+    return project_root
+
+
+PROJECT_ROOT = _find_project_root()
+VECTOR_STORE_PATH = Path(os.getenv("VECTOR_STORE_PATH", str(PROJECT_ROOT / "embeddings" / "vector_store")))
+DOCUMENTS_DIR_PATH = PROJECT_ROOT / "data" / "documents"
+# İndeks klasöründe, indeksin hangi ayarlarla ve hangi belge parçalarından oluşturulduğunu tutan dosya
+INDEX_MANIFEST_NAME = "index_manifest.json"
+
+
+def _index_settings() -> dict:
+    """Değiştiğinde eski vektörlerin yeniden kullanılamayacağı ayarlar."""
+    return {
+        "embedding_model": getattr(embedding_model, "model", None),
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+    }
+
+
+def document_chunks(documents_dir_path: Path = DOCUMENTS_DIR_PATH) -> dict:
+    """Belgelerin parçalarını {parça kimliği: parça} olarak döndürür. Aynı belgedeki birebir aynı parçalar tek kayıttır."""
+    chunks = {}
+    for chunk in load_document_chunks(document_paths(documents_dir_path)):
+        chunks.setdefault(chunk_tag(chunk.metadata["source"], chunk.page_content), chunk)
+    return chunks
+
+
+def _write_index_manifest(vector_store_path: Path, chunks: dict):
+    documents = {}
+    for chunk_id, chunk in chunks.items():
+        documents.setdefault(Path(chunk.metadata["source"]).name, []).append(chunk_id)
+    write_document_manifest(
+        {**_index_settings(), "documents": {name: sorted(ids) for name, ids in sorted(documents.items())}},
+        str(vector_store_path / INDEX_MANIFEST_NAME)
+    )
+
+
+def _load_vector_store(vector_store_path: Path):
+    return FAISS.load_local(
+        str(vector_store_path),
+        embedding_model,
+        allow_dangerous_deserialization=True
+    )
+
+
+def build_vector_store(vector_store_path: Path = VECTOR_STORE_PATH, documents_dir_path: Path = DOCUMENTS_DIR_PATH):
+    """Tüm belgeleri parçalara böler, embed eder ve indeksi baştan oluşturup diske yazar. Başarısız olursa istisna fırlatır."""
+    if not embedding_model:
+        raise RuntimeError("Embedding modeli olmadan vektör deposu oluşturulamaz.")
+
+    chunks = document_chunks(documents_dir_path)
+    if not chunks:
+        raise FileNotFoundError("Yüklenecek hiçbir belge dosyası bulunamadı. Vektör deposu oluşturulamıyor.")
+
+    vector_db = FAISS.from_documents(list(chunks.values()), embedding_model, ids=list(chunks))
+    vector_db.save_local(str(vector_store_path))
+    _write_index_manifest(vector_store_path, chunks)
+    metrics.increment("vector_store_chunks_embedded", len(chunks))
+    print(f"✅ Vektör veritabanı {len(chunks)} parça ile oluşturuldu ve '{vector_store_path}' konumuna kaydedildi.")
+    return vector_db
+
+
+def update_vector_store(vector_store_path: Path = VECTOR_STORE_PATH, documents_dir_path: Path = DOCUMENTS_DIR_PATH,
+                        vector_db=None) -> tuple:
     """
-    Vektör veritabanını diskten yükler. Eğer mevcut değilse,
-    belirtilen dokümanlardan yeni bir tane oluşturur ve kaydeder.
+    İndeksi belgelerle artımlı olarak eşitler ve (indeks, {"mode", "added", "removed", "unchanged"}) döndürür.
+    İndeks yoksa, manifesti yoksa veya farklı ayarlarla oluşturulduysa baştan oluşturulur.
     """
+    manifest = read_document_manifest(str(vector_store_path / INDEX_MANIFEST_NAME))
+    settings = _index_settings()
+    if (not (vector_store_path / "index.faiss").exists() or manifest is None
+            or any(manifest.get(key) != value for key, value in settings.items())):
+        vector_db = build_vector_store(vector_store_path, documents_dir_path)
+        return vector_db, {"mode": "full", "added": vector_db.index.ntotal, "removed": 0, "unchanged": 0}
+
     if not embedding_model:
-        print("⚠️ Embedding modeli olmadan vektör deposu yüklenemez.")
-        return None
+        raise RuntimeError("Embedding modeli olmadan vektör deposu güncellenemez.")
+    if vector_db is None:
+        vector_db = _load_vector_store(vector_store_path)
 
-    
+    chunks = document_chunks(documents_dir_path)
+    indexed = set(vector_db.index_to_docstore_id.values())
+    removed = sorted(indexed - chunks.keys())
+    added = [chunk_id for chunk_id in chunks if chunk_id not in indexed]
 
-    # --- KESİN ÇÖZÜM BURADA ---
-    # Bu dosyanın tam yolunu al: C:\...\backend-fastapi\ai-service\services\vector_store.py
-    this_file_path = Path(__file__).resolve()
+    if removed:
+        vector_db.delete(removed)
+    if added:
+        vector_db.add_documents([chunks[chunk_id] for chunk_id in added], ids=added)
+        metrics.increment("vector_store_chunks_embedded", len(added))
+    if removed or added:
+        vector_db.save_local(str(vector_store_path))
+        print(f"✅ Vektör veritabanı güncellendi: {len(added)} parça eklendi, {len(removed)} parça silindi.")
+    _write_index_manifest(vector_store_path, chunks)
+    return vector_db, {"mode": "incremental", "added": len(added), "removed": len(removed),
+                       "unchanged": len(chunks) - len(added)}
 
-    # 'ai-service' klasörünü bulana kadar yukarı çık.
-    project_root = this_file_path
-    while project_root.name != 'ai-service':
-        project_root = project_root.parent
-        if project_root == project_root.parent: # Kök dizine ulaşıldı ve bulunamadı
-            raise FileNotFoundError("Proje kök dizini 'ai-service' bulunamadı.")
-            
-    # Artık tüm yolları bu doğru kök dizine göre hesaplıyoruz.
-    vector_store_path = project_root / "embeddings" / "vector_store"
-    documents_dir_path = project_root / "data" / "documents"
-    # --- DÜZELTME SONU ---
 
-    try:
-        if not (vector_store_path / "index.faiss").exists():
-            print(f"Vektör veritabanı bulunamadı, '{vector_store_path}' konumunda oluşturuluyor...")
-            
-            file_paths = [
-                documents_dir_path / "faq.txt", 
-                documents_dir_path / "policy.txt"
-            ]
-            
-            docs = []
-            for path in file_paths:
-                if not path.exists():
-                    print(f"⚠️ Uyarı: Belge dosyası bulunamadı, atlanıyor: {path}")
-                    continue
-                
-                print(f"✅ Belge yükleniyor: {path}")
-                loader = TextLoader(str(path), encoding="utf-8")
-                docs.extend(loader.load())
-
-            if not docs:
-                print("❌ Yüklenecek hiçbir belge dosyası bulunamadı. Vektör deposu oluşturulamıyor.")
-                return None
-            
-            splitter = CharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-            chunks = splitter.split_documents(docs)
-            
-            vector_db = FAISS.from_documents(chunks, embedding_model)
-            vector_db.save_local(str(vector_store_path))
-            print(f"✅ Vektör veritabanı başarıyla oluşturuldu ve '{vector_store_path}' konumuna kaydedildi.")
-            return vector_db
-        else:
-            print(f"Mevcut vektör veritabanı '{vector_store_path}' konumundan yükleniyor...")
-            vector_db = FAISS.load_local(
-                str(vector_store_path), 
-                embedding_model, 
-                allow_dangerous_deserialization=True
+def load_or_create_vector_store(vector_store_path: Path = VECTOR_STORE_PATH, auto_build: bool = VECTOR_STORE_AUTO_BUILD):
+    """
+    Vektör veritabanını diskten yükler. auto_build açıksa indeks yoksa belgelerden oluşturulur, varsa belgelerdeki
+    değişiklikler artımlı olarak uygulanır. Başarısız olursa istisna fırlatır.
+    """
+    if not embedding_model:
+        raise RuntimeError("Embedding modeli olmadan vektör deposu yüklenemez.")
+
+    if not (vector_store_path / "index.faiss").exists():
+        if not auto_build:
+            raise FileNotFoundError(
+                f"Vektör veritabanı '{vector_store_path}' konumunda bulunamadı. "
+                "'python -m ai-service.services.langgraph_agent.vector_store' ile oluşturun."
             )
-            print("✅ Vektör veritabanı başarıyla yüklendi.")
-            return vector_db
-    except Exception as e:
-        print(f"❌ Vektör veritabanı yüklenirken kritik bir hata oluştu: {e}")
+        print(f"Vektör veritabanı bulunamadı, '{vector_store_path}' konumunda oluşturuluyor...")
+        return build_vector_store(vector_store_path)
+
+    print(f"Mevcut vektör veritabanı '{vector_store_path}' konumundan yükleniyor...")
+    vector_db = _load_vector_store(vector_store_path)
+    if auto_build:
+        vector_db, _ = update_vector_store(vector_store_path, vector_db=vector_db)
+    print("✅ Vektör veritabanı başarıyla yüklendi.")
+    return vector_db
+
+
+# Süreç boyunca paylaşılan indeks ve yükleme durumu ("cold" -> "loading" -> "ready" | "failed")
+_db = None
+_load_lock = threading.Lock()
+_failed_at = None
+_status = {"state": "cold", "error": None, "load_seconds": None, "chunks": None}
+
+
+def get_vector_store(wait: bool = False):
+    """
+    Yüklü indeksi döndürür; henüz yüklenmediyse bu çağrıda yükler. Başka bir iş parçacığı yüklemeyi sürdürüyorsa
+    (wait=False iken) veya son başarısız denemeden bu yana VECTOR_STORE_RETRY_INTERVAL geçmediyse beklemeden
+    None döner; böylece belge araması indeks hazır olana kadar istekleri bekletmez.
+    """
+    global _db, _failed_at
+    if _db is not None:
+        return _db
+    if not _load_lock.acquire(blocking=wait):
         return None
+    try:
+        if _db is not None:
+            return _db
+        if _failed_at is not None and time.monotonic() - _failed_at < VECTOR_STORE_RETRY_INTERVAL:
+            return None
+
+        _status.update(state="loading", error=None)
+        started_at = time.perf_counter()
+        try:
+            vector_db = load_or_create_vector_store()
+        except Exception as e:
+            _failed_at = time.monotonic()
+            _status.update(state="failed", error=str(e))
+            metrics.increment("vector_store_load_failures")
+            print(f"❌ Vektör veritabanı yüklenirken kritik bir hata oluştu: {e}")
+            return None
+
+        elapsed = time.perf_counter() - started_at
+        metrics.observe("vector_store_load_latency", elapsed)
+        _status.update(state="ready", load_seconds=round(elapsed, 3), chunks=vector_db.index.ntotal)
+        _db, _failed_at = vector_db, None
+        # İndeks hazır olmadan önce (sadece BM25 ile) veya yüklenirken güncellenen belgelerle üretilmiş
+        # belge araması sonuçları artık verilmemeli. Döngüsel import: tool_cache -> tools -> retrieval -> vector_store
+        from .tool_cache import tool_cache
+        tool_cache.clear("search_documents_tool")
+        return _db
+    finally:
+        _load_lock.release()
+
+
+def vector_store_status() -> dict:
+    """Belge aramasının hazır olup olmadığını ve son yükleme bilgisini döndürür (GET /ready)."""
+    return {"ready": _db is not None, **_status}
+
+
+async def warm_vector_store() -> bool:
+    """İndeksi event loop'u bloklamadan yükler. Uygulama başlarken arka plan görevi olarak çalıştırılır."""
+    return await asyncio.to_thread(get_vector_store, True) is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS vektör indeksini belgelerden oluşturur/günceller (CI / imaj oluşturma)")
+    parser.add_argument("--force", action="store_true", help="Sadece değişen parçaları değil, tüm indeksi baştan oluştur")
+    parser.add_argument("--path", type=Path, default=VECTOR_STORE_PATH)
+    args = parser.parse_args()
+
+    if args.force:
+        build_vector_store(args.path)
+        return
+    _, stats = update_vector_store(args.path)
+    print(f"ℹ️ İndeks güncel ({stats['mode']}): {stats['added']} eklendi, {stats['removed']} silindi, "
+          f"{stats['unchanged']} parça yeniden kullanıldı.")
+
 
-db = load_or_create_vector_store()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 import os
 import base64
 import psycopg2
+from contextvars import ContextVar
+from typing import Optional
 from psycopg2.pool import SimpleConnectionPool
 from dotenv import load_dotenv
 from supabase import create_client, Client
-from functools import lru_cache
 from urllib.parse import quote_plus
 
 # --- 1. İstemci Başlatma ve Yönetim ---
@@ -16,6 +17,17 @@ load_dotenv()
 db_pool = None
 supabase: Client = None
 
+# O anki isteğin kalan süresi (milisaniye). Tanımlıysa, alınan bağlantıdaki sorgular bu süreyle sınırlanır.
+# Sohbet araçları her çağrıdan önce bu değeri ayarlar (bkz: langgraph_agent/nodes/tool_executor.py).
+db_statement_timeout_ms: ContextVar[Optional[int]] = ContextVar("db_statement_timeout_ms", default=None)
+
+
+class DatabaseQueryError(Exception):
+    """
+    Sohbet araçlarının sorgu fonksiyonları bir veritabanı hatasında bu istisnayı, kullanıcıya gösterilebilecek
+    bir mesajla fırlatır. Hata mesajı normal bir sonuç gibi döndürülmediği için araç önbelleğine yazılmaz.
+    """
+
 def initialize_clients():
     """
     Uygulama başladığında çalıştırılacak olan her iki istemciyi de başlatır.
@@ -77,22 +89,44 @@ def get_db_connection():
         # boş bir sorgu çalıştırmaktır.
         with conn.cursor() as cur:
             cur.execute("SELECT 1")
+            _apply_statement_timeout(cur)
         # Eğer buraya kadar hata almadıysak, bağlantı sağlamdır.
         return conn
     except psycopg2.OperationalError:
         # Bağlantı kopmuş! Havuzdan bu bozuk bağlantıyı kaldır ve yenisini al.
         print("⚠️ Kopuk veritabanı bağlantısı tespit edildi. Yenileniyor...")
         db_pool.putconn(conn, close=True) # close=True ile bağlantıyı tamamen kapat
-        return db_pool.getconn() # Yeni bir bağlantı al ve döndür
+        conn = db_pool.getconn() # Yeni bir bağlantı al ve döndür
+        with conn.cursor() as cur:
+            _apply_statement_timeout(cur)
+        return conn
     except Exception as e:
         # Beklenmedik başka bir hata olursa, bağlantıyı geri bırak ve hatayı yükselt
         release_db_connection(conn)
         raise e
 
 
+def _apply_statement_timeout(cursor):
+    """
+    İsteğin kalan süresini bu bağlantının açık işlemi (transaction) için statement_timeout olarak ayarlar.
+    set_config(..., true), SET LOCAL'in parametreli halidir: değer yalnızca işlem sonuna kadar geçerlidir ve
+    bağlantı havuza bırakılırken yapılan rollback ile sıfırlanır.
+    """
+    timeout_ms = db_statement_timeout_ms.get()
+    if timeout_ms is not None:
+        cursor.execute("SELECT set_config('statement_timeout', %s, true)", (str(max(1, timeout_ms)),))
+
+
 def release_db_connection(conn):
     """Kullanılan bir veritabanı bağlantısını havuza geri bırakır."""
     if db_pool:
+        # Açık işlem geri alınır; böylece SET LOCAL ile ayarlanan statement_timeout sonraki kullanıcıya taşınmaz.
+        try:
+            if not conn.closed and conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except psycopg2.Error:
+            db_pool.putconn(conn, close=True)
+            return
         db_pool.putconn(conn)
 
 
@@ -109,7 +143,8 @@ def shutdown_clients():
     print("ℹ️ Supabase istemcisi temizlendi.")
 
 
-@lru_cache(maxsize=128)
+# NOT: Sonuçlar artık burada değil, süreli araç önbelleğinde tutulur (bkz: langgraph_agent/tool_cache.py).
+# Eski @lru_cache, değişen stok/fiyat bilgisini ve veritabanı hata mesajlarını süresiz saklıyordu.
 def get_product_details_with_recommendations(product_name: str) -> str:
     """
     Bir ürün veya ürünler hakkında detayları bulur. Eğer tek bir ürün bulunursa,
@@ -172,7 +207,28 @@ def get_product_details_with_recommendations(product_name: str) -> str:
     except Exception as e:
         # HATA AYIKLAMA İÇİN KRİTİK EKLEME: Gerçek hatayı terminale yazdır!
         print(f"\n\n--- VERİTABANI HATASI DETAYI ---\n{e}\n------------------------------\n")
-        return f"Ürün bilgisi alınırken bir veritabanı hatası oluştu. Lütfen sistem yöneticisine başvurun."
+        raise DatabaseQueryError("Ürün bilgisi alınırken bir veritabanı hatası oluştu. Lütfen sistem yöneticisine başvurun.") from e
+    finally:
+        if conn:
+            release_db_connection(conn)
+
+
+
+def get_product_names() -> Optional[list[str]]:
+    """
+    Katalogdaki tüm ürün adlarını döndürür.
+    Niyet yönlendiricisi (intent router), mesajda bir ürün adı geçip geçmediğini bu liste ile anlar.
+    Hata durumunda None döner; yönlendirici boş bir katalogla hatayı ayırt edip listeyi kısa süre sonra yeniden okur.
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT product_name FROM product WHERE product_name IS NOT NULL")
+            return [row[0] for row in cursor.fetchall()]
+    except Exception as e:
+        print(f"❌ Veritabanı Hatası (get_product_names): {e}")
+        return None
     finally:
         if conn:
             release_db_connection(conn)
@@ -205,7 +261,7 @@ def get_payment_amount(order_id: int, user_id: str) -> str:
                 return f"Size ait '{order_id}' numaralı bir sipariş bulunamadı veya ödeme bilgisi mevcut değil."
     except Exception as e:
         print(f"❌ Veritabanı Hatası (get_payment_amount): {e}")
-        return f"Ödeme bilgisi alınırken bir veritabanı hatası oluştu."
+        raise DatabaseQueryError("Ödeme bilgisi alınırken bir veritabanı hatası oluştu.") from e
     finally:
         if conn:
             release_db_connection(conn)
@@ -238,7 +294,7 @@ def get_item_status(order_id: int, product_name: str, user_id: str) -> str:
                 return f"Size ait '{order_id}' numaralı siparişte '{product_name}' adında bir ürün bulunamadı."
     except Exception as e:
         print(f"❌ Veritabanı Hatası (get_item_status): {e}")
-        return f"Ürün durumu alınırken bir veritabanı hatası oluştu."
+        raise DatabaseQueryError("Ürün durumu alınırken bir veritabanı hatası oluştu.") from e
     finally:
         if conn:
             release_db_connection(conn)
@@ -272,7 +328,7 @@ def get_refund_status(order_id: int, product_name: str, user_id: str) -> str:
                 return f"Size ait '{order_id}' numaralı siparişte '{product_name}' ürünü için iade bilgisi bulunamadı."
     except Exception as e:
         print(f"❌ Veritabanı Hatası (get_refund_status): {e}")
-        return f"İade durumu alınırken bir veritabanı hatası oluştu."
+        raise DatabaseQueryError("İade durumu alınırken bir veritabanı hatası oluştu.") from e
     finally:
         if conn:
             release_db_connection(conn)
@@ -0,0 +1,34 @@
+# Testler depo kök dizininden çalıştırılır: python -m pytest ai-service/tests
+# Servis paketi import edilmeden önce ortam ayarlanır: Gemini anahtarı sahte, önbellek/manifest dosyaları geçici
+# bir klasörde, vektör deposu uygulama başlarken yüklenmez (ağ erişimi gerekmez).
+
+import importlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_TEMP_DIR = tempfile.mkdtemp(prefix="ai-service-tests-")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("FAQ_CACHE_PATH", os.path.join(_TEMP_DIR, "faq_cache.db"))
+os.environ.setdefault("DOCUMENT_MANIFEST_PATH", os.path.join(_TEMP_DIR, "document_manifest.json"))
+os.environ.setdefault("EMBEDDING_CACHE_PATH", os.path.join(_TEMP_DIR, "embedding_cache.db"))
+os.environ.setdefault("VECTOR_STORE_PRELOAD", "false")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+@pytest.fixture
+def client():
+    """Kimlik doğrulaması 'u1' kullanıcısıyla atlanmış, uygulamanın lifespan'ını çalıştırmayan bir TestClient."""
+    from fastapi.testclient import TestClient
+
+    app = importlib.import_module("ai-service.main").app
+    security = importlib.import_module("ai-service.services.langgraph_agent.security")
+    app.dependency_overrides[security.get_current_user_claims] = lambda: security.UserClaims(user_id="u1", roles=["USER"])
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
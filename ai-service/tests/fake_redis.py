@@ -0,0 +1,168 @@
+# Testlerde Redis sunucusu yerine kullanılan, süreç içi ve thread-safe bir redis-py benzeri istemci.
+# Sadece SharedCacheManager'ın kullandığı komutları (get/set/delete/sadd/smembers/expire/ttl/publish/pubsub/pipeline) destekler.
+# Aynı FakeRedisServer'a bağlanan istemciler aynı veriyi ve pub/sub kanallarını paylaşır; böylece birden fazla
+# süreç (replika) tek bir test içinde benzetilebilir. 'down' true iken her komut ConnectionError fırlatır.
+# 'round_trips', sunucuya yapılan ağ turlarını sayar: her komut bir, bir pipeline'ın execute() çağrısı bir tur.
+
+import contextlib
+import queue
+import threading
+import time
+
+
+class FakeRedisServer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # anahtar -> (değer, son geçerlilik zamanı veya None)
+        self.data: dict = {}
+        self.subscribers: list[tuple[str, queue.Queue]] = []
+        self.down = False
+        self.commands: list[str] = []
+        self.round_trips = 0
+
+
+class FakePubSub:
+    def __init__(self, server: FakeRedisServer):
+        self._server = server
+        self._queue = queue.Queue()
+
+    def subscribe(self, channel: str):
+        if self._server.down:
+            raise ConnectionError("Redis bağlantısı yok")
+        with self._server.lock:
+            self._server.subscribers.append((channel, self._queue))
+
+    def get_message(self, timeout: float = 1.0):
+        if self._server.down:
+            raise ConnectionError("Redis bağlantısı yok")
+        try:
+            return self._queue.get(timeout=min(timeout, 0.05))
+        except queue.Empty:
+            return None
+
+    def close(self):
+        with self._server.lock:
+            self._server.subscribers = [item for item in self._server.subscribers if item[1] is not self._queue]
+
+
+class FakePipeline:
+    """Komutları biriktirir ve execute() ile sırayla, tek bir ağ turunda uygular (transaction=False gibi)."""
+    def __init__(self, client: "FakeRedis"):
+        self._client = client
+        self._commands = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self._client, name)
+
+        def queue_command(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+        return queue_command
+
+    def execute(self) -> list:
+        if self._client.server.down:
+            raise ConnectionError("Redis bağlantısı yok")
+        self._client.server.round_trips += 1
+        commands, self._commands = self._commands, []
+        with self._client.pipelined():
+            return [method(*args, **kwargs) for method, args, kwargs in commands]
+
+
+class FakeRedis:
+    """redis.Redis ile aynı imzalı komutlar; değerler redis-py gibi bytes olarak döner."""
+    def __init__(self, server: FakeRedisServer = None):
+        self.server = server or FakeRedisServer()
+        self._in_pipeline = False
+
+    def _command(self, name: str):
+        if self.server.down:
+            raise ConnectionError("Redis bağlantısı yok")
+        self.server.commands.append(name)
+        if not self._in_pipeline:
+            self.server.round_trips += 1
+
+    @contextlib.contextmanager
+    def pipelined(self):
+        self._in_pipeline = True
+        try:
+            yield
+        finally:
+            self._in_pipeline = False
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    def _live(self, key: str):
+        """Süresi dolmamış kaydın değerini döndürür (kilit tutulurken çağrılır)."""
+        item = self.server.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.server.data[key]
+            return None
+        return value
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+    def get(self, key: str):
+        self._command("get")
+        with self.server.lock:
+            return self._live(key)
+
+    def set(self, key: str, value, ex: int = None):
+        self._command("set")
+        with self.server.lock:
+            self.server.data[key] = (self._encode(value), time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        self._command("delete")
+        with self.server.lock:
+            return sum(self.server.data.pop(key, None) is not None for key in keys)
+
+    def sadd(self, key: str, *members) -> int:
+        self._command("sadd")
+        with self.server.lock:
+            members_set = self._live(key)
+            if members_set is None:
+                members_set = set()
+                self.server.data[key] = (members_set, None)
+            before = len(members_set)
+            members_set.update(self._encode(member) for member in members)
+            return len(members_set) - before
+
+    def smembers(self, key: str) -> set:
+        self._command("smembers")
+        with self.server.lock:
+            return set(self._live(key) or ())
+
+    def expire(self, key: str, seconds: int) -> bool:
+        self._command("expire")
+        with self.server.lock:
+            value = self._live(key)
+            if value is None:
+                return False
+            self.server.data[key] = (value, time.monotonic() + seconds)
+            return True
+
+    def ttl(self, key: str) -> int:
+        self._command("ttl")
+        with self.server.lock:
+            if self._live(key) is None:
+                return -2
+            expires_at = self.server.data[key][1]
+            return -1 if expires_at is None else int(expires_at - time.monotonic())
+
+    def publish(self, channel: str, message) -> int:
+        self._command("publish")
+        with self.server.lock:
+            subscribers = [subscriber for name, subscriber in self.server.subscribers if name == channel]
+        for subscriber in subscribers:
+            subscriber.put({"type": "message", "channel": channel.encode(), "data": self._encode(message)})
+        return len(subscribers)
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> FakePubSub:
+        return FakePubSub(self.server)
@@ -0,0 +1,91 @@
+# Testlerde Gemini yerine kullanılan sahte sohbet ve embedding modelleri.
+
+import asyncio
+import importlib
+import json
+import re
+import zlib
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+def import_service(module: str = ""):
+    """'ai-service' klasör adı tire içerdiği için modüller importlib ile yüklenir."""
+    return importlib.import_module("ai-service.services.langgraph_agent" + (f".{module}" if module else ""))
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Her çağrıda 'respond(messages)' ile üretilen mesajı, 'delay' saniye bekledikten sonra döndürür.
+    Gecikme asyncio.sleep ile beklenir; böylece eşzamanlı sohbetlerin gerçekten eşzamanlı çalışıp çalışmadığı ölçülebilir.
+    """
+    respond: Any
+    delay: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=self.respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=self.respond(messages))])
+
+
+class StreamingFakeChatModel(FakeChatModel):
+    """FakeChatModel gibi cevap verir; metin cevaplarını kelime kelime token olarak akıtır (bkz: /ai/chat-stream)."""
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        self.calls += 1
+        message = self.respond(messages)
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                for index, call in enumerate(message.tool_calls)
+            ]))
+            return
+        for index, word in enumerate(message.content.split(" ")):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word if index == 0 else f" {word}"))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class KeywordEmbeddings(Embeddings):
+    """
+    Metni, kelimelerinin (crc32) hash'lerine göre sayan sabit boyutlu bir vektöre çevirir; aynı kelimeleri paylaşan
+    metinler birbirine yakındır. 'calls', embed_documents çağrılarının, 'texts' embedding'i hesaplanan metinlerin sayısıdır.
+    """
+    model = "fake-keywords"
+
+    def __init__(self, dimensions: int = 64):
+        self.dimensions = dimensions
+        self.calls = 0
+        self.texts = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode("utf-8")) % self.dimensions] += 1.0
+        return vector
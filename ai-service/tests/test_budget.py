@@ -0,0 +1,58 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from fakes import FakeChatModel, import_service
+
+agent = import_service()
+budget = import_service("budget")
+route_intent = import_service("nodes.route_intent")
+tool_executor = import_service("nodes.tool_executor")
+
+
+def _looping_model() -> FakeChatModel:
+    """Hiç cevap vermeden her seferinde yeni bir ürün soran, kafası karışmış bir model."""
+    def respond(messages):
+        call = {"name": "get_product_details_tool", "args": {"product_name": f"ürün {len(messages)}"}, "id": f"call_{len(messages)}"}
+        return AIMessage(content="", tool_calls=[call])
+    return FakeChatModel(respond=respond)
+
+
+def test_tool_loop_stops_at_the_llm_call_budget_with_the_findings(monkeypatch):
+    monkeypatch.setattr(route_intent, "INTENT_ROUTER_ENABLED", False)
+    monkeypatch.setattr(tool_executor, "_run_tool", lambda tool_name, args, user_id: f"{args['product_name']} stokta")
+    monkeypatch.setattr(budget, "CHAT_MAX_LLM_CALLS", 3)
+    model = _looping_model()
+    monkeypatch.setattr(agent, "model_with_tools", model)
+
+    result = asyncio.run(agent.run_langgraph_chat(
+        {"messages": [HumanMessage(content="bütçe testi hangi ürünler stokta")], "user_id": "u1"}))
+
+    assert model.calls == 3
+    assert result["usage"]["llm_calls"] == 3
+    assert result["usage"]["tool_calls"] == 3
+    assert result["output"].startswith("İsteğiniz için ayrılan işlem sınırına ulaşıldı.")
+    assert "stokta" in result["output"]
+
+
+def test_tool_calls_over_the_budget_are_answered_without_running(monkeypatch):
+    monkeypatch.setattr(tool_executor, "_run_tool", lambda tool_name, args, user_id: f"{args['product_name']} stokta")
+    monkeypatch.setattr(tool_executor, "CHAT_MAX_TOOL_CALLS", 3)
+    calls = [{"name": "get_product_details_tool", "args": {"product_name": f"araç bütçesi {index}"}, "id": f"call_{index}"}
+             for index in range(3)]
+    state = {"messages": [HumanMessage(content="soru"), AIMessage(content="", tool_calls=calls)], "user_id": "u1",
+             "usage": {**budget.new_usage(), "tool_calls": 2}}
+
+    result = asyncio.run(tool_executor.aexecute_tools(state))
+
+    assert [message.status for message in result["messages"]] == ["success", "error", "error"]
+    assert [message.tool_call_id for message in result["messages"]] == ["call_0", "call_1", "call_2"]
+    assert result["usage"]["tool_calls"] == 3
+
+
+def test_token_budgets_stop_further_model_calls():
+    usage = budget.new_usage()
+    assert budget.exhausted_llm_budget(usage) is None
+    assert budget.exhausted_llm_budget({**usage, "prompt_tokens": budget.CHAT_MAX_PROMPT_TOKENS}) == "prompt_tokens"
+    assert budget.exhausted_llm_budget({**usage, "completion_tokens": budget.CHAT_MAX_COMPLETION_TOKENS}) == "completion_tokens"
+    assert budget.exhausted_llm_budget({**usage, "llm_calls": budget.CHAT_MAX_LLM_CALLS}) == "llm_calls"
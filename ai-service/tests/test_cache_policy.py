@@ -0,0 +1,82 @@
+from fakes import import_service
+
+cache_policy = import_service("nodes.cache_policy")
+cache_storage = import_service("nodes.cache_storage")
+persistent_cache = import_service("nodes.persistent_cache")
+
+
+def _manager(policy: str, max_size: int = 100):
+    return persistent_cache.PersistentCacheManager(max_size=max_size, storage=cache_storage.MemoryCacheStorage(),
+                                                   policy=policy, write_behind=False)
+
+
+def _ask(manager, key: str):
+    """Bir sorunun gelişini taklit eder: önce önbelleğe bakılır, ıskada cevap yazılır."""
+    if manager.get(key) is None:
+        manager.set(key, f"{key} cevabı")
+
+
+def test_one_off_questions_do_not_evict_popular_answers():
+    manager = _manager("tinylfu")
+    popular = [f"popüler {index}" for index in range(50)]
+    for _ in range(3):
+        for key in popular:
+            _ask(manager, key)
+
+    for index in range(1000):
+        _ask(manager, f"tek seferlik {index}")
+
+    assert all(key in manager for key in popular)
+    assert len(manager) <= 100
+    assert manager.stats()["admission_rejections"] > 0
+
+
+def test_lru_lets_a_scan_evict_popular_answers():
+    manager = _manager("lru")
+    popular = [f"popüler {index}" for index in range(50)]
+    for _ in range(3):
+        for key in popular:
+            _ask(manager, key)
+
+    for index in range(1000):
+        _ask(manager, f"tek seferlik {index}")
+
+    assert not any(key in manager for key in popular)
+
+
+def test_frequent_newcomer_is_admitted_over_a_cold_entry():
+    policy = cache_policy.WTinyLFUPolicy(capacity=3, window_ratio=0.34)
+    for key in ("soğuk 1", "soğuk 2"):
+        policy.record_access(key)
+        assert policy.on_insert(key) == []
+
+    for _ in range(3):
+        policy.record_access("sıcak")
+    assert policy.on_insert("sıcak") == []
+    policy.record_access("yeni")
+    # Pencereden taşan 'sıcak' aday, ana bölümün en eski kaydından daha sık sorulmuştur.
+    assert policy.on_insert("yeni") == ["soğuk 1"]
+    policy.record_access("başka")
+    # Pencereden taşan 'yeni' bir kez sorulmuştur; ana bölüme alınmaz.
+    assert policy.on_insert("başka") == ["yeni"]
+    assert policy.rejections == 1
+
+
+def test_sketch_ages_old_counts():
+    sketch = cache_policy.CountMinSketch(capacity=10)
+    for _ in range(8):
+        sketch.increment("eski popüler")
+    assert sketch.estimate("eski popüler") == 8
+
+    sketch._age()
+    assert sketch.estimate("eski popüler") == 4
+    assert sketch.estimate("hiç sorulmamış") == 0
+
+
+def test_unknown_policy_is_rejected():
+    try:
+        cache_policy.create_cache_policy("fifo", 10)
+    except ValueError as e:
+        assert "fifo" in str(e)
+    else:
+        raise AssertionError("ValueError bekleniyordu")
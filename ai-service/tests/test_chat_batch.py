@@ -0,0 +1,56 @@
+import asyncio
+import importlib
+
+from langchain_core.messages import AIMessage
+
+from fakes import FakeChatModel, import_service
+from test_chat_stream import _events
+
+agent = import_service()
+route_intent = import_service("nodes.route_intent")
+chatbot = importlib.import_module("ai-service.routers.chatbot")
+
+
+def test_duplicate_questions_run_once_and_results_keep_request_order(client, monkeypatch):
+    monkeypatch.setattr(route_intent, "INTENT_ROUTER_ENABLED", False)
+    model = FakeChatModel(respond=lambda messages: AIMessage(content=f"Cevap: {messages[-1].content}"))
+    monkeypatch.setattr(agent, "model_with_tools", model)
+
+    messages = ["toplu test iade süresi nedir", "toplu test kargo ücreti", "Toplu test iade süresi nedir?"]
+    response = client.post("/ai/chat-batch", json={"messages": messages})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["message"] for result in results] == messages
+    assert results[2]["output"] == results[0]["output"] == "Cevap: toplu test iade süresi nedir"
+    assert not any(result["error"] for result in results)
+    assert model.calls == 2
+
+
+def test_streamed_results_arrive_as_they_finish(client, monkeypatch):
+    delays = {"yavaş soru": 0.3, "hızlı soru": 0.0, "hatalı soru": 0.1}
+
+    async def answer(initial_state, usage=None):
+        question = initial_state["messages"][-1].content
+        await asyncio.sleep(delays[question])
+        if question == "hatalı soru":
+            raise RuntimeError("model hatası")
+        return f"Cevap: {question}"
+    monkeypatch.setattr(agent, "run_langgraph_chat_coalesced", answer)
+
+    response = client.post("/ai/chat-batch", json={"messages": list(delays), "stream": True})
+
+    events = _events(response)
+    assert [event for event, _ in events] == ["result", "result", "result", "done"]
+    assert [data["index"] for _, data in events[:3]] == [1, 2, 0]
+    assert events[1][1]["error"] is True
+    assert events[2][1]["output"] == "Cevap: yavaş soru"
+    assert events[3][1] == {"count": 3}
+
+
+def test_too_many_questions_are_rejected(client, monkeypatch):
+    monkeypatch.setattr(chatbot, "CHAT_BATCH_MAX_SIZE", 2)
+
+    response = client.post("/ai/chat-batch", json={"messages": ["bir", "iki", "üç"]})
+    assert response.status_code == 413
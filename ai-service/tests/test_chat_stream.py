@@ -0,0 +1,49 @@
+import json
+
+from langchain_core.messages import AIMessage
+
+from fakes import StreamingFakeChatModel, import_service
+
+agent = import_service()
+route_intent = import_service("nodes.route_intent")
+
+
+def _events(response) -> list[tuple[str, dict]]:
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_answer_is_streamed_token_by_token(client, monkeypatch):
+    monkeypatch.setattr(route_intent, "INTENT_ROUTER_ENABLED", False)
+    monkeypatch.setattr(agent, "model_with_tools", StreamingFakeChatModel(
+        respond=lambda messages: AIMessage(content="Hediye paketi ücretsiz olarak eklenir.")))
+
+    response = client.post("/ai/chat-stream", json={"message": "akış testi hediye paketi ekleniyor mu",
+                                                     "include_usage": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(response)
+    assert events[0] == ("progress", {"node": "start", "message": "Sorunuz inceleniyor..."})
+    tokens = [data["content"] for event, data in events if event == "token"]
+    assert len(tokens) == 5
+    assert events[-1][0] == "done"
+    assert events[-1][1]["output"] == "".join(tokens) == "Hediye paketi ücretsiz olarak eklenir."
+    assert events[-1][1]["usage"]["llm_calls"] == 1
+
+
+def test_expired_deadline_ends_the_stream_with_a_fallback(client, monkeypatch):
+    monkeypatch.setattr(route_intent, "INTENT_ROUTER_ENABLED", False)
+    monkeypatch.setattr(agent, "model_with_tools", StreamingFakeChatModel(
+        respond=lambda messages: AIMessage(content="Geç gelen cevap."), delay=1.0))
+
+    response = client.post("/ai/chat-stream", json={"message": "akış testi süre dolunca ne olur"},
+                           headers={"X-Request-Timeout": "0.2"})
+
+    event, data = _events(response)[-1]
+    assert event == "done"
+    assert data["timed_out"] is True
+    assert data["output"] == import_service("deadline").DEADLINE_FALLBACK_MESSAGE
@@ -0,0 +1,75 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fakes import KeywordEmbeddings, import_service
+
+embedding_batcher = import_service("embedding_batcher")
+
+
+class TaskTypeEmbeddings(KeywordEmbeddings):
+    """Gemini gibi toplu çağrıda task_type kabul eden, her toplu çağrının metinlerini kaydeden sahte model."""
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.batches = []
+        self.fail = fail
+
+    def embed_documents(self, texts, task_type=None):
+        self.batches.append((list(texts), task_type))
+        if self.fail:
+            raise RuntimeError("kota aşıldı")
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.embed_documents([text], task_type="RETRIEVAL_QUERY")[0]
+
+
+def _embed_concurrently(embeddings, texts: list[str]) -> list:
+    barrier = threading.Barrier(len(texts))
+
+    def embed(text):
+        barrier.wait()
+        try:
+            return embeddings.embed_query(text)
+        except RuntimeError as e:
+            return e
+    with ThreadPoolExecutor(len(texts)) as pool:
+        return list(pool.map(embed, texts))
+
+
+def test_concurrent_queries_share_one_call_and_get_their_own_vectors():
+    model = TaskTypeEmbeddings()
+    batched = embedding_batcher.BatchedQueryEmbeddings(model, window_ms=200)
+    texts = [f"iade süresi {index}" for index in range(6)]
+
+    vectors = _embed_concurrently(batched, texts)
+
+    assert len(model.batches) == 1
+    assert sorted(model.batches[0][0]) == sorted(texts)
+    assert model.batches[0][1] == "RETRIEVAL_QUERY"
+    assert vectors == [KeywordEmbeddings().embed_query(text) for text in texts]
+
+
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    model = TaskTypeEmbeddings()
+    batched = embedding_batcher.BatchedQueryEmbeddings(model, window_ms=10_000, max_batch=3)
+
+    _embed_concurrently(batched, [f"kargo {index}" for index in range(6)])
+
+    assert [len(texts) for texts, _ in model.batches] == [3, 3]
+
+
+def test_batch_error_is_raised_to_every_caller():
+    batched = embedding_batcher.BatchedQueryEmbeddings(TaskTypeEmbeddings(fail=True), window_ms=200)
+
+    results = _embed_concurrently(batched, ["garanti 1", "garanti 2", "garanti 3"])
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_zero_window_passes_queries_through():
+    model = KeywordEmbeddings()
+    batched = embedding_batcher.BatchedQueryEmbeddings(model, window_ms=0)
+
+    assert batched.embed_query("hediye paketi") == model.embed_query("hediye paketi")
+    assert model.calls == 2
+    assert embedding_batcher.batch_query_embeddings(None) is None
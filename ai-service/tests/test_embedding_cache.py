@@ -0,0 +1,51 @@
+import importlib
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+from fakes import import_service
+
+embedding_cache = import_service("embedding_cache")
+
+
+class CountingEmbeddings(Embeddings):
+    model = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_default_path_is_next_to_the_index(monkeypatch, tmp_path):
+    monkeypatch.delenv("EMBEDDING_CACHE_PATH")
+    monkeypatch.chdir(tmp_path)
+    try:
+        default = Path(importlib.reload(embedding_cache).EMBEDDING_CACHE_PATH)
+    finally:
+        monkeypatch.undo()
+        importlib.reload(embedding_cache)
+    assert default == Path(__file__).resolve().parents[1] / "embeddings" / "embedding_cache.db"
+
+
+def test_database_is_opened_on_first_use(tmp_path):
+    path = tmp_path / "embeddings" / "embedding_cache.db"
+    model = CountingEmbeddings()
+    cache = embedding_cache.CachedEmbeddings(model, path=str(path))
+    assert not path.exists()
+    assert cache.stats()["disk_entries"] == 0
+
+    assert cache.embed_query("iade süresi") == [11.0, 1.0]
+    assert path.exists()
+    cache.close()
+
+    reopened = embedding_cache.CachedEmbeddings(model, path=str(path))
+    assert reopened.embed_query("iade süresi") == [11.0, 1.0]
+    assert model.calls == 1
+    assert reopened.stats()["disk_entries"] == 1
+    reopened.close()
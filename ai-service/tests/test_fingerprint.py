@@ -0,0 +1,32 @@
+import hashlib
+
+from fakes import import_service
+
+fingerprint = import_service("fingerprint")
+
+
+def test_turkish_casefold_handles_dotted_and_dotless_i():
+    assert fingerprint.turkish_casefold("IŞIK İADE") == "ışık iade"
+    assert "i̇" not in fingerprint.turkish_casefold("İPTAL")
+
+
+def test_spelling_variants_share_one_fingerprint():
+    variants = ["İade süresi ne kadardır?", "İADE SÜRESİ NE KADARDIR", "acaba iade suresi ne kadardir lütfen",
+                "ne kadardır iade süresi"]
+    assert len({fingerprint.query_fingerprint(variant) for variant in variants}) == 1
+
+
+def test_meaningful_words_are_kept():
+    # Soru kelimeleri ve olumsuzluk anlamı değiştirir; farklı anahtarlara düşmelidir.
+    assert fingerprint.query_fingerprint("iade var mı") != fingerprint.query_fingerprint("iade yok mu")
+    assert fingerprint.query_fingerprint("kargo ne zaman") != fingerprint.query_fingerprint("kargo nasıl")
+
+
+def test_greeting_only_questions_keep_their_words():
+    assert fingerprint.canonical_query("merhaba") == "merhaba"
+    assert fingerprint.query_fingerprint("merhaba") != fingerprint.query_fingerprint("selam")
+
+
+def test_fingerprint_does_not_depend_on_installed_packages():
+    # Anahtarlar diske ve Redis'e yazılır; her ortamda aynı algoritma (blake2b, 128 bit) kullanılmalıdır.
+    assert fingerprint.fingerprint("iade süre") == hashlib.blake2b("iade süre".encode("utf-8"), digest_size=16).hexdigest()
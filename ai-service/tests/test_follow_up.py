@@ -0,0 +1,43 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from fakes import import_service
+
+history = import_service("history")
+check_cache = import_service("nodes.check_cache")
+route_intent = import_service("nodes.route_intent")
+
+FIRST_TURN = [HumanMessage(content="Kargo kaç günde gelir?"), AIMessage(content="2-3 iş günü içinde teslim edilir.")]
+
+
+def _state(question: str, earlier=FIRST_TURN) -> dict:
+    return {"messages": [*earlier, HumanMessage(content=question)], "user_id": "u1"}
+
+
+def test_follow_up_is_decided_from_the_message():
+    assert not history.is_follow_up(_state("peki iadesi?", earlier=[]))
+    assert history.is_follow_up(_state("peki iadesi?"))
+    assert history.is_follow_up(_state("Bunun ücreti ne kadar?"))
+    assert history.is_follow_up(_state("kargo ücreti?"))
+    assert not history.is_follow_up(_state("İade süresi kaç gün?"))
+
+
+def test_standalone_second_turn_is_answered_from_the_cache(monkeypatch):
+    monkeypatch.setattr(check_cache, "semantic_cache", None)
+    question = "Ürün iade süresi kaç gündür?"
+    check_cache.cache_manager.set(check_cache.generate_query_hash(question), "İade süresi 14 gündür.")
+
+    result = check_cache.check_cache(_state(question))
+    assert result["cached"] is True
+    assert result["messages"][0].content == "İade süresi 14 gündür."
+    assert check_cache.check_cache(_state("peki bunun iadesi?")) == {}
+
+
+def test_standalone_second_turn_reaches_the_intent_router(monkeypatch):
+    monkeypatch.setattr(route_intent, "INTENT_ROUTER_ENABLED", True)
+    calls = []
+    monkeypatch.setattr(route_intent, "classify_intent", lambda message, product_names: calls.append(message))
+    monkeypatch.setattr(route_intent, "_get_product_names", lambda: [])
+
+    route_intent.route_intent(_state("123 numaralı siparişimin durumu nedir?"))
+    route_intent.route_intent(_state("peki onun?"))
+    assert calls == ["123 numaralı siparişimin durumu nedir?"]
@@ -0,0 +1,35 @@
+import json
+import os
+
+from fakes import import_service
+
+persistent_cache = import_service("nodes.persistent_cache")
+
+
+def test_legacy_file_is_resolved_independently_of_the_working_directory():
+    assert persistent_cache.LEGACY_CACHE_FILE.is_absolute()
+
+
+def test_legacy_entries_are_retired_not_imported(tmp_path):
+    # Eski anahtarlar (MD5) yeni parmak iziyle hiç bulunamaz; aktarılsalar sadece kapasite işgal ederlerdi.
+    legacy_file = tmp_path / "faq_cache.json"
+    legacy_file.write_text(json.dumps({"e3b0c44298fc1c149afbf4c8996fb924": {"response": "cevap", "timestamp": 4102444800}}),
+                           encoding="utf-8")
+
+    manager = persistent_cache.PersistentCacheManager(cache_file=str(tmp_path / "faq_cache.db"), write_behind=False)
+    assert legacy_file.exists()
+
+    assert manager.retire_legacy_cache(legacy_file) == 1
+    assert len(manager) == 0
+    assert not legacy_file.exists()
+    assert (tmp_path / "faq_cache.json.migrated").exists()
+    manager.close()
+
+
+def test_empty_legacy_file_is_left_untouched(tmp_path):
+    legacy_file = tmp_path / "faq_cache.json"
+    legacy_file.write_text("{}", encoding="utf-8")
+    manager = persistent_cache.PersistentCacheManager(cache_file=str(tmp_path / "faq_cache.db"), write_behind=False)
+    assert manager.retire_legacy_cache(legacy_file) == 0
+    assert os.path.exists(legacy_file)
+    manager.close()
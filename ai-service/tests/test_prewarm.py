@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage
+
+from fakes import FakeChatModel, import_service
+
+agent = import_service()
+prewarm = import_service("prewarm")
+route_intent = import_service("nodes.route_intent")
+cache_storage = import_service("nodes.cache_storage")
+persistent_cache = import_service("nodes.persistent_cache")
+
+FAQ = """Sık Sorulan Sorular (FAQ)
+
+=== A. Ön Yükleme ===
+
+1. Ön yükleme hediye çeki geçerli mi?
+Hediye çekleri tüm ürünlerde geçerlidir.
+Süresi bir yıldır.
+
+2. Ön yükleme taksit var mı?
+Stripe ile taksit yapılabilir.
+
+=== B. Boş ===
+"""
+
+
+def _write_faq(tmp_path, paraphrases: dict):
+    faq_path, paraphrases_path = tmp_path / "faq.txt", tmp_path / "faq_paraphrases.json"
+    faq_path.write_text(FAQ, encoding="utf-8")
+    paraphrases_path.write_text(json.dumps(paraphrases, ensure_ascii=False), encoding="utf-8")
+    return faq_path, paraphrases_path
+
+
+def test_faq_is_parsed_into_question_answer_pairs(tmp_path):
+    faq_path, _ = _write_faq(tmp_path, {})
+    assert prewarm.parse_faq(faq_path) == [
+        ("Ön yükleme hediye çeki geçerli mi?", "Hediye çekleri tüm ürünlerde geçerlidir. Süresi bir yıldır."),
+        ("Ön yükleme taksit var mı?", "Stripe ile taksit yapılabilir."),
+    ]
+
+
+def test_faq_answers_and_paraphrases_are_stored_once(tmp_path, monkeypatch):
+    manager = persistent_cache.PersistentCacheManager(storage=cache_storage.MemoryCacheStorage(), write_behind=False)
+    monkeypatch.setattr(prewarm, "cache_manager", manager)
+    faq_path, paraphrases_path = _write_faq(tmp_path, {"Ön yükleme taksit var mı?": ["Ön yükleme taksitle ödeyebilir miyim?"]})
+
+    report = asyncio.run(prewarm.prewarm_answer_cache("faq", faq_path=faq_path, paraphrases_path=paraphrases_path))
+    assert report == {"cached": 3, "skipped": 0, "failed": 0}
+    paraphrase_hash = prewarm.generate_query_hash("Ön yükleme taksitle ödeyebilir miyim?")
+    assert manager.get(paraphrase_hash) == "Stripe ile taksit yapılabilir."
+    sources, ttl = manager.provenance(paraphrase_hash)
+    assert sources and all(source.startswith("chunk:") for source in sources)
+    assert ttl == prewarm.FAQ_CACHE_DOCUMENT_TTL
+
+    again = asyncio.run(prewarm.prewarm_answer_cache("faq", faq_path=faq_path, paraphrases_path=paraphrases_path))
+    assert again == {"cached": 0, "skipped": 3, "failed": 0}
+
+
+def test_graph_mode_calls_the_model_once_per_question(tmp_path, monkeypatch):
+    monkeypatch.setattr(route_intent, "INTENT_ROUTER_ENABLED", False)
+    model = FakeChatModel(respond=lambda messages: AIMessage(content=f"Model cevabı: {messages[-1].content}"))
+    monkeypatch.setattr(agent, "model_with_tools", model)
+    faq_path, paraphrases_path = _write_faq(tmp_path, {"Ön yükleme hediye çeki geçerli mi?": ["Ön yükleme hediye çekini kullanabilir miyim?"]})
+
+    report = asyncio.run(prewarm.prewarm_answer_cache("graph", faq_path=faq_path, paraphrases_path=paraphrases_path))
+
+    assert report == {"cached": 3, "skipped": 0, "failed": 0}
+    assert model.calls == 2
+    paraphrase_hash = prewarm.generate_query_hash("Ön yükleme hediye çekini kullanabilir miyim?")
+    assert prewarm.cache_manager.get(paraphrase_hash) == "Model cevabı: Ön yükleme hediye çeki geçerli mi?"
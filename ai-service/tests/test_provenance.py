@@ -0,0 +1,42 @@
+from fakes import import_service
+
+provenance = import_service("provenance")
+persistent_cache = import_service("nodes.persistent_cache")
+
+OLD_TEXT = "İade süresi 14 gündür."
+NEW_TEXT = "İade süresi 30 gündür."
+
+
+def _worker(tmp_path):
+    return persistent_cache.PersistentCacheManager(cache_file=str(tmp_path / "faq_cache.db"), write_behind=False)
+
+
+def test_every_worker_drops_answers_built_from_changed_documents(tmp_path):
+    documents_dir = tmp_path / "documents"
+    documents_dir.mkdir()
+    faq = documents_dir / "faq.txt"
+    faq.write_text(OLD_TEXT, encoding="utf-8")
+    manifest_path = str(tmp_path / "document_manifest.json")
+
+    writer = _worker(tmp_path)
+    provenance.invalidate_changed_documents(writer, manifest_path, documents_dir)
+    writer.set("iade", "14 gün", sources=[provenance.chunk_tag(str(faq), OLD_TEXT)])
+    writer.set("kargo", "3 gün", sources=["tool:get_product_details_tool"])
+    writer.close()
+
+    # Belge değişir, iki worker eski kayıtları belleğe yükler; manifesti ilk worker günceller.
+    faq.write_text(NEW_TEXT, encoding="utf-8")
+    first, second = _worker(tmp_path), _worker(tmp_path)
+    assert first.get("iade") == second.get("iade") == "14 gün"
+
+    assert provenance.invalidate_changed_documents(first, manifest_path, documents_dir) == 1
+    assert provenance.invalidate_changed_documents(second, manifest_path, documents_dir) == 1
+    assert first.get("iade") is None and second.get("iade") is None
+    assert second.get("kargo") == "3 gün"
+    first.close()
+    second.close()
+
+
+def test_document_tags_change_with_the_file_content():
+    assert provenance.document_tag("faq.txt", "a" * 32) != provenance.document_tag("faq.txt", "b" * 32)
+    assert provenance.is_document_tag(provenance.document_tag("faq.txt", "a" * 32))
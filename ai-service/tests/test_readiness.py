@@ -0,0 +1,35 @@
+import importlib
+
+from fastapi.testclient import TestClient
+
+from fakes import import_service
+
+retrieval = import_service("retrieval")
+agent = import_service()
+
+
+def _client():
+    return TestClient(importlib.import_module("ai-service.main").app)
+
+
+def test_hybrid_mode_is_ready_before_the_vector_store_loads(monkeypatch):
+    monkeypatch.setattr(retrieval, "RETRIEVAL_MODE", "hybrid")
+    response = _client().get("/ready")
+    assert response.status_code == 200
+    assert response.json()["retrieval"]["degraded"] is True
+
+
+def test_lazy_vector_mode_starts_loading_from_readiness(monkeypatch):
+    monkeypatch.setattr(retrieval, "RETRIEVAL_MODE", "vector")
+    loads = []
+    monkeypatch.setattr(agent, "warm_vector_store", lambda: _record(loads))
+    monkeypatch.setattr(agent, "_vector_store_task", None)
+
+    response = _client().get("/ready")
+    assert response.status_code == 503
+    assert loads == [True]
+
+
+async def _record(loads):
+    loads.append(True)
+    return False
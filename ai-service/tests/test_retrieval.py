@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+from langchain_core.documents import Document
+
+from fakes import import_service
+
+lexical_index = import_service("lexical_index")
+retrieval = import_service("retrieval")
+metrics = import_service("metrics").metrics
+
+
+def _document(text: str, source: str = "policy.txt") -> Document:
+    return Document(page_content=text, metadata={"source": source})
+
+
+def test_turkish_inflections_share_a_term():
+    assert lexical_index.tokenize("İADELER iadesi iade") == ["iade", "iade", "iade"]
+    assert lexical_index.tokenize("Gönderim") == lexical_index.tokenize("gönderiyor")
+
+
+def test_bm25_ranks_rare_matching_terms_first():
+    documents = [
+        _document("Kargo ücreti 50 TL üzeri siparişlerde ücretsizdir. Kargo 2 günde teslim edilir."),
+        _document("Hasarlı ürünler için iade süresi 30 gündür. Kargo ücreti satıcıya aittir."),
+        _document("Hediye paketi seçeneği ödeme adımında eklenir."),
+    ]
+    index = lexical_index.BM25Index(documents)
+
+    results = index.search("hasarlı ürünün iadesi", k=3)
+    assert [document for document, _ in results] == [documents[1]]
+    assert [document for document, _ in index.search("kargo ücreti", k=3)][:2] == documents[:2]
+    assert index.search("garanti belgesi") == []
+
+
+def test_fusion_prefers_chunks_found_by_both_indexes():
+    first, second, shared = _document("birinci"), _document("ikinci"), _document("ortak")
+
+    fused = retrieval.reciprocal_rank_fusion([[first, shared], [second, shared]], k=3)
+    assert fused[0] is shared
+    assert set(map(id, fused[1:])) == {id(first), id(second)}
+
+
+def test_lexical_mode_answers_from_the_documents_without_the_vector_store(monkeypatch):
+    def get_vector_store():
+        raise AssertionError("lexical modunda vektör deposu kullanılmamalı")
+    monkeypatch.setattr(retrieval, "get_vector_store", get_vector_store)
+
+    results = retrieval.retrieve("iade süresi kaç gün", mode="lexical", k=2)
+    assert len(results) == 2
+    assert "İade süresi" in results[0].page_content
+
+
+def test_hybrid_mode_falls_back_to_bm25_when_vector_search_fails(monkeypatch):
+    def failing_search(query, k):
+        raise ConnectionError("embedding API erişilemiyor")
+    monkeypatch.setattr(retrieval, "get_vector_store", lambda: SimpleNamespace(similarity_search=failing_search))
+    fallbacks = metrics.snapshot()["counters"].get("retrieval_lexical_fallbacks", 0)
+
+    results = retrieval.retrieve("iade süresi kaç gün", mode="hybrid", k=2)
+    assert results == retrieval.retrieve("iade süresi kaç gün", mode="lexical", k=2)
+    assert metrics.snapshot()["counters"]["retrieval_lexical_fallbacks"] == fallbacks + 1
+
+
+def test_hybrid_mode_fuses_vector_and_bm25_results(monkeypatch):
+    vector_only = _document("Vektör aramasının bulduğu, kelime paylaşmayan bir parça.")
+    monkeypatch.setattr(retrieval, "get_vector_store", lambda: SimpleNamespace(similarity_search=lambda query, k: [vector_only]))
+
+    lexical = retrieval.retrieve("iade süresi kaç gün", mode="lexical", k=3)
+    hybrid = retrieval.retrieve("iade süresi kaç gün", mode="hybrid", k=3)
+    # İki listenin birincileri aynı RRF puanını alır; sonrakiler BM25 sırasıyla gelir.
+    assert hybrid == [vector_only, lexical[0], lexical[1]]
@@ -0,0 +1,61 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from fakes import FakeChatModel, import_service
+
+agent = import_service()
+revalidate = import_service("revalidate")
+check_cache = import_service("nodes.check_cache")
+route_intent = import_service("nodes.route_intent")
+cache_storage = import_service("nodes.cache_storage")
+persistent_cache = import_service("nodes.persistent_cache")
+
+
+def test_expired_entry_is_served_stale_until_max_staleness():
+    manager = persistent_cache.PersistentCacheManager(storage=cache_storage.MemoryCacheStorage(), write_behind=False)
+    manager.set("bayat", "eski cevap", ttl=-1, max_staleness=3600)
+    manager.set("ölü", "çok eski cevap", ttl=-1, max_staleness=0)
+
+    assert manager.lookup("bayat") == ("eski cevap", True)
+    assert manager.get("bayat") is None
+    assert manager.lookup("ölü") == (None, False)
+    assert len(manager) == 1
+    assert manager.stats()["stale_hits"] == 1
+
+
+def test_stale_answer_is_returned_and_refreshed_in_the_background(monkeypatch):
+    monkeypatch.setattr(route_intent, "INTENT_ROUTER_ENABLED", False)
+    model = FakeChatModel(respond=lambda messages: AIMessage(content="Yeni cevap: kargo ücretsizdir."), delay=0.1)
+    monkeypatch.setattr(agent, "model_with_tools", model)
+    revalidator = revalidate.CacheRevalidator()
+    monkeypatch.setattr(check_cache, "cache_revalidator", revalidator)
+
+    question = "yenileme testi kargo ücreti ne kadar"
+    query_hash = check_cache.generate_query_hash(question)
+    check_cache.cache_manager.set(query_hash, "Eski cevap: kargo 30 TL.", ttl=-1, max_staleness=3600)
+
+    async def scenario():
+        revalidator.start()
+        answers = await asyncio.gather(*(
+            agent.run_langgraph_chat({"messages": [HumanMessage(content=question)], "user_id": f"u{index}"})
+            for index in range(3)
+        ))
+        calls_before_refresh = model.calls
+        refreshes = list(revalidator._tasks)
+        await asyncio.gather(*refreshes)
+        await revalidator.stop()
+        return [answer["output"] for answer in answers], calls_before_refresh, len(refreshes)
+
+    outputs, calls_before_refresh, refreshes = asyncio.run(scenario())
+
+    assert outputs == ["Eski cevap: kargo 30 TL."] * 3
+    assert calls_before_refresh == 0
+    # Aynı soru için tek bir yenileme çalışır.
+    assert refreshes == 1
+    assert model.calls == 1
+    assert check_cache.cache_manager.lookup(query_hash) == ("Yeni cevap: kargo ücretsizdir.", False)
+
+
+def test_schedule_without_an_event_loop_is_ignored():
+    assert revalidate.CacheRevalidator().schedule("soru", "anahtar") is False
@@ -0,0 +1,28 @@
+from fakes import import_service
+
+route_intent = import_service("nodes.route_intent")
+
+PRODUCT_NAMES = ["Apple iPhone 15 Pro", "Sony Playstation 5"]
+
+
+def test_numbers_without_an_order_marker_are_not_order_ids():
+    assert route_intent.extract_order_id("siparişimi 14 gün içinde iade edebilir miyim?") is None
+    assert route_intent.extract_order_id("sipariş no: 4521 ne kadar ödedim") == 4521
+
+
+def test_single_product_word_is_not_a_product_name():
+    assert route_intent.classify_intent("Apple Pay ile ödeme yapabilir miyim?", PRODUCT_NAMES) is None
+    assert route_intent.classify_intent("Playstation 5 kaç para", PRODUCT_NAMES) == (
+        "get_product_details_tool", {"product_name": "Playstation 5"})
+
+
+def test_failed_product_name_load_is_retried(monkeypatch):
+    responses = [None, ["Sony Playstation 5"]]
+    monkeypatch.setattr(route_intent.supabase_client, "get_product_names", lambda: responses.pop(0))
+    monkeypatch.setattr(route_intent, "_product_names_cache", {"names": [], "loaded_at": 0.0, "retry_at": 0.0})
+    monkeypatch.setattr(route_intent, "PRODUCT_NAMES_RETRY_INTERVAL", 0)
+
+    assert route_intent._get_product_names() == []
+    assert route_intent._get_product_names() == ["Sony Playstation 5"]
+    assert route_intent._get_product_names() == ["Sony Playstation 5"]
+    assert responses == []
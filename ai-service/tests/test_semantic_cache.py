@@ -0,0 +1,65 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from fakes import FakeChatModel, KeywordEmbeddings, import_service
+
+agent = import_service()
+semantic_cache = import_service("nodes.semantic_cache")
+check_cache = import_service("nodes.check_cache")
+cache_final_answer = import_service("nodes.cache_final_answer")
+route_intent = import_service("nodes.route_intent")
+
+
+def test_paraphrase_matches_and_unrelated_question_does_not():
+    cache = semantic_cache.SemanticCache(KeywordEmbeddings(), threshold=0.8)
+    cache.add("iade süresi kaç gün", "iade")
+    cache.add("kargo ücreti ne kadar", "kargo")
+
+    key, similarity = cache.lookup("iade süresi kaç gün olur")
+    assert key == "iade"
+    assert 0.8 < similarity < 1.0
+    assert cache.lookup("hediye paketi var mı") is None
+
+
+def test_embedding_of_a_miss_is_reused_when_its_answer_is_cached():
+    embeddings = KeywordEmbeddings()
+    cache = semantic_cache.SemanticCache(embeddings, threshold=0.8)
+
+    assert cache.lookup("garanti süresi nedir", key="garanti") is None
+    cache.add("garanti süresi nedir", "garanti")
+    assert embeddings.texts == 1
+    assert cache.lookup("garanti süresi nedir")[0] == "garanti"
+
+
+def test_oldest_question_is_evicted_and_removed_keys_stop_matching():
+    cache = semantic_cache.SemanticCache(KeywordEmbeddings(), threshold=0.8, max_size=2)
+    cache.add("iade süresi kaç gün", "iade")
+    cache.add("kargo ücreti ne kadar", "kargo")
+    cache.add("garanti süresi nedir", "garanti")
+    assert len(cache) == 2
+    assert cache.lookup("iade süresi kaç gün") is None
+
+    cache.remove("kargo")
+    assert cache.lookup("kargo ücreti ne kadar") is None
+    assert cache.lookup("garanti süresi nedir")[0] == "garanti"
+
+
+def test_paraphrased_question_is_answered_from_the_cache(monkeypatch):
+    cache = semantic_cache.SemanticCache(KeywordEmbeddings(), threshold=0.8)
+    monkeypatch.setattr(check_cache, "semantic_cache", cache)
+    monkeypatch.setattr(cache_final_answer, "semantic_cache", cache)
+    monkeypatch.setattr(route_intent, "INTENT_ROUTER_ENABLED", False)
+    model = FakeChatModel(respond=lambda messages: AIMessage(content="Hasarlı ürünler 30 gün içinde değiştirilir."))
+    monkeypatch.setattr(agent, "model_with_tools", model)
+
+    def ask(question: str) -> str:
+        return asyncio.run(agent.run_langgraph_chat({"messages": [HumanMessage(content=question)], "user_id": "u1"}))["output"]
+
+    first = ask("anlamsal test hasarlı ürün değişim süresi")
+    second = ask("anlamsal test hasarlı ürün değişim süresi nedir")
+
+    assert second == first
+    assert model.calls == 1
+    # Anlamsal isabet, ifadenin kendi anahtarıyla da önbelleğe yazılır.
+    assert check_cache.generate_query_hash("anlamsal test hasarlı ürün değişim süresi nedir") in check_cache.cache_manager
@@ -0,0 +1,43 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from fakes import FakeChatModel, import_service
+
+agent = import_service()
+checkpointer = import_service("checkpointer")
+history = import_service("history")
+
+
+def test_session_state_stays_bounded_over_many_turns_and_sessions(monkeypatch):
+    saver = checkpointer.BoundedMemorySaver(max_threads=5, ttl=3600)
+    monkeypatch.setattr(agent, "langgraph_session_app", agent.workflow.compile(checkpointer=saver))
+    monkeypatch.setattr(agent, "model_with_tools",
+                        FakeChatModel(respond=lambda messages: AIMessage(content=f"Cevap {len(messages)}")))
+    monkeypatch.setattr(agent, "prune_session_history",
+                        lambda messages: history.prune_session_history(messages, max_turns=4))
+
+    async def chat(session: int, turn: int):
+        state = agent.GraphState(messages=[HumanMessage(content=f"oturum {session} tur {turn} hakkında bilgi")],
+                                 user_id="u1", session_id=f"s{session}")
+        return await agent.run_langgraph_chat(state)
+
+    async def run():
+        for session in range(12):
+            for turn in range(10):
+                await chat(session, turn)
+        return await agent.langgraph_session_app.aget_state({"configurable": {"thread_id": "u1:s11"}})
+
+    snapshot = asyncio.run(run())
+
+    assert len(saver.storage) == 5
+    assert saver.evictions == 7
+    assert all(len(checkpoints) == 1 for namespaces in saver.storage.values() for checkpoints in namespaces.values())
+    assert {key[0] for key in saver.blobs} == set(saver.storage)
+    # Her oturumda kanal başına sadece son sürüm saklanır.
+    assert len(saver.blobs) == len({(key[0], key[2]) for key in saver.blobs})
+    assert {key[0] for key in saver.writes} <= set(saver.storage)
+
+    messages = snapshot.values["messages"]
+    assert sum(isinstance(message, HumanMessage) for message in messages) <= 5
+    assert messages[-2].content == "oturum 11 tur 9 hakkında bilgi"
@@ -0,0 +1,85 @@
+import sys
+import time
+
+import pytest
+
+from fake_redis import FakeRedis, FakeRedisServer
+from fakes import import_service
+
+shared_cache = import_service("nodes.shared_cache")
+
+
+def _wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_corrupt_value_is_a_miss_and_is_deleted():
+    client = FakeRedis()
+    cache = shared_cache.SharedCacheManager(client, prefix="test")
+    client.set("test:soru", b"\xff{bozuk")
+
+    assert cache.get("soru") is None
+    assert client.get("test:soru") is None
+    assert cache.provenance("soru") == ([], None)
+    assert "soru" not in cache
+
+
+def test_listener_starts_only_when_requested():
+    cache = shared_cache.SharedCacheManager(FakeRedis(), prefix="test")
+    assert cache._listener is None
+    cache.start()
+    cache.start()
+    assert cache._listener.is_alive()
+    cache.close()
+    assert not cache._listener.is_alive()
+
+
+def test_writes_invalidate_other_replicas_l1():
+    server = FakeRedisServer()
+    first = shared_cache.SharedCacheManager(FakeRedis(server), prefix="test")
+    second = shared_cache.SharedCacheManager(FakeRedis(server), prefix="test")
+    second.start()
+    try:
+        assert _wait_for(lambda: server.subscribers)
+        first.set("soru", "eski cevap")
+        assert second.get("soru") == "eski cevap"
+
+        first.set("soru", "yeni cevap")
+        assert _wait_for(lambda: second.get("soru") == "yeni cevap")
+    finally:
+        second.close()
+
+
+def test_source_invalidation_removes_entries_from_redis():
+    client = FakeRedis()
+    cache = shared_cache.SharedCacheManager(client, prefix="test")
+    cache.set("iade", "14 gün", sources=["chunk:iade"])
+    cache.set("kargo", "3 gün", sources=["chunk:kargo"])
+
+    assert cache.invalidate_sources(["chunk:iade"]) == 1
+    assert client.get("test:iade") is None
+    assert cache.get("kargo") == "3 gün"
+
+
+def test_set_sends_entry_and_source_sets_in_one_round_trip():
+    client = FakeRedis()
+    cache = shared_cache.SharedCacheManager(client, prefix="test")
+    cache.set("iade", "14 gün", sources=["chunk:iade", "chunk:kargo", "tool:search_documents_tool"])
+
+    assert client.server.round_trips == 1
+    assert client.server.commands == ["set"] + ["sadd", "expire"] * 3 + ["publish"]
+    assert client.smembers("test:source:chunk:kargo") == {b"iade"}
+    assert 0 < client.ttl("test:source:chunk:kargo")
+
+
+def test_redis_backend_without_the_package_fails_loudly(monkeypatch):
+    monkeypatch.setattr(shared_cache, "FAQ_CACHE_BACKEND", "redis")
+    monkeypatch.setitem(sys.modules, "redis", None)
+
+    with pytest.raises(RuntimeError, match="redis"):
+        shared_cache.create_faq_cache_manager()
@@ -0,0 +1,54 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from fakes import FakeChatModel, import_service
+
+agent = import_service()
+route_intent = import_service("nodes.route_intent")
+tool_executor = import_service("nodes.tool_executor")
+
+
+def _state(question: str, user_id: str) -> dict:
+    return {"messages": [HumanMessage(content=question)], "user_id": user_id}
+
+
+async def _ask_concurrently(*states):
+    usages = [{} for _ in states]
+    answers = await asyncio.gather(*(agent.run_langgraph_chat_coalesced(state, usage)
+                                     for state, usage in zip(states, usages)))
+    return answers, usages
+
+
+def test_identical_questions_share_one_graph_run(monkeypatch):
+    monkeypatch.setattr(route_intent, "INTENT_ROUTER_ENABLED", False)
+    model = FakeChatModel(respond=lambda messages: AIMessage(content="Kargo 2 günde teslim edilir."), delay=0.2)
+    monkeypatch.setattr(agent, "model_with_tools", model)
+
+    question = "birleştirme testi kargo kaç günde gelir"
+    answers, usages = asyncio.run(_ask_concurrently(*(_state(question, f"u{index}") for index in range(3))))
+
+    assert answers == ["Kargo 2 günde teslim edilir."] * 3
+    assert model.calls == 1
+    assert sorted(usage["shared"] for usage in usages) == [False, True, True]
+
+
+def test_user_scoped_answer_is_not_shared_with_other_users(monkeypatch):
+    monkeypatch.setattr(route_intent, "INTENT_ROUTER_ENABLED", False)
+    monkeypatch.setattr(tool_executor, "_run_tool", lambda tool_name, args, user_id: f"{user_id} iadesi onaylandı")
+
+    def respond(messages):
+        tool_results = [message for message in messages if isinstance(message, ToolMessage)]
+        if tool_results:
+            return AIMessage(content=tool_results[-1].content)
+        return AIMessage(content="", tool_calls=[{"name": "get_refund_status_tool", "args": {}, "id": "call_0"}])
+    model = FakeChatModel(respond=respond, delay=0.2)
+    monkeypatch.setattr(agent, "model_with_tools", model)
+
+    question = "birleştirme testi iadem ne durumda"
+    answers, usages = asyncio.run(_ask_concurrently(_state(question, "u1"), _state(question, "u2"),
+                                                    _state(question, "u1")))
+
+    assert answers == ["u1 iadesi onaylandı", "u2 iadesi onaylandı", "u1 iadesi onaylandı"]
+    assert [usage["shared"] for usage in usages] == [False, False, True]
+    assert model.calls == 4
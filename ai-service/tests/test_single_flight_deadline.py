@@ -0,0 +1,29 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from fakes import FakeChatModel, import_service
+
+agent = import_service()
+deadline = import_service("deadline")
+
+
+def test_short_deadline_leader_does_not_hand_fallback_to_longer_waiter(monkeypatch):
+    monkeypatch.setattr(agent, "model_with_tools",
+                        FakeChatModel(respond=lambda messages: AIMessage(content="Kargo 3 günde teslim edilir."), delay=0.5))
+    question = "single flight süre testi kargo kaç günde gelir"
+
+    async def ask(timeout: str):
+        state = agent.GraphState(messages=[HumanMessage(content=question)], user_id="u1",
+                                 deadline=deadline.compute_deadline(timeout))
+        return await agent.run_langgraph_chat_coalesced(state)
+
+    async def main():
+        leader = asyncio.ensure_future(ask("0.2"))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(ask("10"))
+        return await leader, await waiter
+
+    short, long = asyncio.run(main())
+    assert short == deadline.DEADLINE_FALLBACK_MESSAGE
+    assert long == "Kargo 3 günde teslim edilir."
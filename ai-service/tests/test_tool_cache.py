@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+from fakes import import_service
+
+tool_cache_module = import_service("tool_cache")
+provenance = import_service("provenance")
+vector_store = import_service("vector_store")
+
+SEARCH = "search_documents_tool"
+
+
+def test_order_tool_results_are_scoped_to_the_user():
+    cache = tool_cache_module.ToolResultCache(enabled=True)
+    cache.set("get_item_status_tool", {"order_id": 123}, "ali", "Kargoda")
+
+    assert cache.get("get_item_status_tool", {"order_id": 123}, "ali") == "Kargoda"
+    assert cache.get("get_item_status_tool", {"order_id": 123}, "veli") is None
+
+
+def test_catalog_keys_ignore_case_whitespace_and_argument_order():
+    make_key = tool_cache_module.ToolResultCache.make_key
+    assert make_key(SEARCH, {"query": "İade  Süresi", "k": 3}, "ali") == make_key(SEARCH, {"k": 3, "query": "İade süresi"}, "veli")
+
+
+def test_entries_expire_and_least_recently_used_is_evicted():
+    expired = tool_cache_module.TTLCache("test", ttl=0, maxsize=2)
+    expired.set("a", "1")
+    assert expired.get("a") is None
+
+    cache = tool_cache_module.TTLCache("test", ttl=60, maxsize=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+
+def test_document_search_results_are_dropped_when_documents_change(monkeypatch, tmp_path):
+    cache = tool_cache_module.ToolResultCache(enabled=True)
+    monkeypatch.setattr(tool_cache_module, "tool_cache", cache)
+    documents_dir = tmp_path / "documents"
+    documents_dir.mkdir()
+    (documents_dir / "faq.txt").write_text("İade süresi 14 gündür.", encoding="utf-8")
+    manifest_path = str(tmp_path / "document_manifest.json")
+    answers = SimpleNamespace(invalidate_sources=lambda sources: 0, document_sources=frozenset)
+
+    provenance.invalidate_changed_documents(answers, manifest_path, documents_dir)
+    cache.set(SEARCH, {"query": "iade"}, None, "İade süresi 14 gündür.")
+    provenance.invalidate_changed_documents(answers, manifest_path, documents_dir)
+    assert cache.get(SEARCH, {"query": "iade"}, None) is not None
+
+    (documents_dir / "faq.txt").write_text("İade süresi 30 gündür.", encoding="utf-8")
+    provenance.invalidate_changed_documents(answers, manifest_path, documents_dir)
+    assert cache.get(SEARCH, {"query": "iade"}, None) is None
+
+
+def test_document_search_results_are_dropped_when_the_index_becomes_ready(monkeypatch):
+    cache = tool_cache_module.ToolResultCache(enabled=True)
+    monkeypatch.setattr(tool_cache_module, "tool_cache", cache)
+    monkeypatch.setattr(vector_store, "_db", None)
+    monkeypatch.setattr(vector_store, "_failed_at", None)
+    monkeypatch.setattr(vector_store, "_status", dict(vector_store._status))
+    monkeypatch.setattr(vector_store, "load_or_create_vector_store",
+                        lambda: SimpleNamespace(index=SimpleNamespace(ntotal=1)))
+    # İndeks hazır olmadan sadece BM25 ile üretilmiş sonuç
+    cache.set(SEARCH, {"query": "iade"}, None, "BM25 sonucu")
+    cache.set("get_product_details_tool", {"product_name": "telefon"}, None, "Ürün")
+
+    assert vector_store.get_vector_store() is not None
+    assert cache.get(SEARCH, {"query": "iade"}, None) is None
+    assert cache.get("get_product_details_tool", {"product_name": "telefon"}, None) == "Ürün"
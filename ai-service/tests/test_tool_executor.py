@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from fakes import import_service
+
+tool_executor = import_service("nodes.tool_executor")
+tool_cache = import_service("tool_cache")
+
+
+def _state(*tool_calls) -> dict:
+    calls = [{"name": name, "args": args, "id": f"call_{index}"} for index, (name, args) in enumerate(tool_calls)]
+    return {"messages": [HumanMessage(content="soru"), AIMessage(content="", tool_calls=calls)], "user_id": "u1"}
+
+
+def _slow_tools(monkeypatch, delays: dict):
+    """Araçları, argümandaki ürün adına göre bekleyip cevap veren bloklayıcı bir fonksiyonla değiştirir."""
+    monkeypatch.setattr(tool_executor, "tool_cache", tool_cache.ToolResultCache(enabled=False))
+
+    def run_tool(tool_name, args, user_id):
+        name = args["product_name"]
+        if name == "hatalı":
+            raise RuntimeError("veritabanı hatası")
+        time.sleep(delays.get(name, 0))
+        return f"{name} bilgisi"
+    monkeypatch.setattr(tool_executor, "_run_tool", run_tool)
+
+
+def test_tool_calls_run_concurrently_and_keep_their_order(monkeypatch):
+    _slow_tools(monkeypatch, {"yavaş": 0.4, "orta": 0.3, "hızlı": 0.1})
+    state = _state(*(("get_product_details_tool", {"product_name": name}) for name in ("yavaş", "orta", "hızlı")))
+
+    started_at = time.perf_counter()
+    result = asyncio.run(tool_executor.aexecute_tools(state))
+    elapsed = time.perf_counter() - started_at
+
+    assert elapsed < 0.7
+    assert [message.content for message in result["messages"]] == ["yavaş bilgisi", "orta bilgisi", "hızlı bilgisi"]
+    assert [message.tool_call_id for message in result["messages"]] == ["call_0", "call_1", "call_2"]
+
+
+def test_failing_or_slow_tool_does_not_affect_the_others(monkeypatch):
+    _slow_tools(monkeypatch, {"takılan": 1.0})
+    monkeypatch.setattr(tool_executor, "TOOL_CALL_TIMEOUT", 0.2)
+    state = _state(("get_product_details_tool", {"product_name": "hatalı"}),
+                   ("get_product_details_tool", {"product_name": "takılan"}),
+                   ("get_product_details_tool", {"product_name": "telefon"}))
+
+    messages = asyncio.run(tool_executor.aexecute_tools(state))["messages"]
+    assert [message.status for message in messages] == ["error", "error", "success"]
+    assert "zaman aşımı" in messages[1].content
+    assert messages[2].content == "telefon bilgisi"
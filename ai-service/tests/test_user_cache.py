@@ -0,0 +1,44 @@
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from fakes import import_service
+
+user_cache = import_service("nodes.user_cache")
+check_cache = import_service("nodes.check_cache")
+cache_final_answer = import_service("nodes.cache_final_answer")
+
+
+def test_user_scoped_answers_skip_the_global_cache(monkeypatch):
+    store = user_cache.UserAnswerCache(max_size=3, ttl=60)
+    monkeypatch.setattr(cache_final_answer, "user_answer_cache", store)
+    global_size = check_cache.cache_manager.stats()["size"]
+    for i in range(10):
+        question = f"{i} numaralı siparişim nerede?"
+        cache_final_answer.cache_final_answer({
+            "user_id": "u1",
+            "messages": [HumanMessage(content=question),
+                         AIMessage(content="", tool_calls=[{"name": "get_item_status_tool", "args": {}, "id": f"c{i}"}]),
+                         ToolMessage(content="Kargoda", tool_call_id=f"c{i}"),
+                         AIMessage(content=f"Siparişiniz {i} kargoda.")],
+        })
+    assert check_cache.cache_manager.stats()["size"] == global_size
+    assert len(store) == 3
+    assert store.stats()["evictions"] == 7
+    assert store.get("u1", check_cache.generate_query_hash("9 numaralı siparişim nerede?")) == "Siparişiniz 9 kargoda."
+
+
+def test_user_entries_are_not_shared_between_users():
+    cache = user_cache.UserAnswerCache(max_size=10, ttl=60)
+    cache.set("u1", "soru", "u1'in siparişi")
+    assert cache.get("u2", "soru") is None
+
+
+def test_expired_user_entries_are_removed_without_being_read():
+    cache = user_cache.UserAnswerCache(max_size=10, ttl=0.05)
+    for i in range(5):
+        cache.set(f"user-{i}", "soru", "cevap")
+    time.sleep(0.1)
+    cache.set("user-new", "soru", "cevap")
+    assert len(cache._entries) == 1
+    assert cache.stats()["expirations"] == 5
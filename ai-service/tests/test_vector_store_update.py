@@ -0,0 +1,57 @@
+from fakes import KeywordEmbeddings, import_service
+
+vector_store = import_service("vector_store")
+
+
+def _paragraph(topic: str) -> str:
+    """Tek başına bir parça olacak uzunlukta (CHUNK_SIZE'a yakın) bir paragraf."""
+    return " ".join([f"{topic} hakkında bilgi"] * 20)
+
+
+def _write_documents(documents_dir, documents: dict):
+    documents_dir.mkdir(exist_ok=True)
+    for path in documents_dir.glob("*.txt"):
+        path.unlink()
+    for name, topics in documents.items():
+        (documents_dir / name).write_text("\n\n".join(map(_paragraph, topics)), encoding="utf-8")
+
+
+def test_only_changed_chunks_are_embedded(tmp_path, monkeypatch):
+    embeddings = KeywordEmbeddings()
+    monkeypatch.setattr(vector_store, "embedding_model", embeddings)
+    documents_dir, store_path = tmp_path / "documents", tmp_path / "vector_store"
+    _write_documents(documents_dir, {"iade.txt": ["iade", "değişim", "garanti"], "kargo.txt": ["kargo", "teslimat"]})
+
+    vector_db, report = vector_store.update_vector_store(store_path, documents_dir)
+    assert report == {"mode": "full", "added": 5, "removed": 0, "unchanged": 0}
+    assert embeddings.texts == 5
+
+    vector_db, report = vector_store.update_vector_store(store_path, documents_dir)
+    assert report == {"mode": "incremental", "added": 0, "removed": 0, "unchanged": 5}
+    assert embeddings.texts == 5
+
+    # Bir paragraf değişti, bir belge silindi.
+    _write_documents(documents_dir, {"iade.txt": ["iade", "hediye", "garanti"]})
+    vector_db, report = vector_store.update_vector_store(store_path, documents_dir)
+    assert report == {"mode": "incremental", "added": 1, "removed": 3, "unchanged": 2}
+    assert embeddings.texts == 6
+    assert vector_db.index.ntotal == 3
+    assert "hediye" in vector_db.similarity_search("hediye hakkında bilgi", k=1)[0].page_content
+
+    # Diske yazılan indeks de aynı parçaları içerir.
+    reloaded = vector_store._load_vector_store(store_path)
+    assert sorted(reloaded.index_to_docstore_id.values()) == sorted(vector_db.index_to_docstore_id.values())
+
+
+def test_index_is_rebuilt_when_the_embedding_model_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "embedding_model", KeywordEmbeddings())
+    documents_dir, store_path = tmp_path / "documents", tmp_path / "vector_store"
+    _write_documents(documents_dir, {"iade.txt": ["iade", "garanti"]})
+    vector_store.update_vector_store(store_path, documents_dir)
+
+    other_model = KeywordEmbeddings()
+    other_model.model = "fake-keywords-v2"
+    monkeypatch.setattr(vector_store, "embedding_model", other_model)
+    _, report = vector_store.update_vector_store(store_path, documents_dir)
+    assert report["mode"] == "full"
+    assert other_model.texts == 2
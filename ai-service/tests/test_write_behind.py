@@ -0,0 +1,96 @@
+import asyncio
+
+from fakes import import_service
+
+cache_storage = import_service("nodes.cache_storage")
+persistent_cache = import_service("nodes.persistent_cache")
+
+
+class RecordingStorage(cache_storage.MemoryCacheStorage):
+    """Toplu yazmaları kaydeden, istenirse bir sonraki yazmada hata veren bellek içi depolama."""
+    def __init__(self):
+        self.batches = []
+        self.fail_next = False
+
+    def write_batch(self, puts: dict, deletes: list[str]):
+        if self.fail_next:
+            self.fail_next = False
+            raise OSError("disk dolu")
+        self.batches.append((dict(puts), sorted(deletes)))
+
+
+def _manager(storage, **kwargs):
+    return persistent_cache.PersistentCacheManager(storage=storage, write_behind=True, **kwargs)
+
+
+def test_changes_are_written_in_one_batch_on_flush():
+    storage = RecordingStorage()
+    manager = _manager(storage)
+    manager.set("iade", "14 gün")
+    manager.set("iade", "30 gün")
+    manager.set("kargo", "ücretsiz")
+    manager.delete("kargo")
+    assert storage.batches == []
+    assert manager.stats()["pending_writes"] == 2
+
+    manager.flush()
+    assert len(storage.batches) == 1
+    puts, deletes = storage.batches[0]
+    assert list(puts) == ["iade"]
+    assert puts["iade"]["response"] == "30 gün"
+    assert deletes == ["kargo"]
+    assert manager.flush() == 0
+    assert manager.stats()["pending_writes"] == 0
+
+
+def test_full_batch_is_flushed_immediately_without_a_flusher_task():
+    storage = RecordingStorage()
+    manager = _manager(storage, flush_batch_size=2)
+    manager.set("iade", "14 gün")
+    assert storage.batches == []
+    manager.set("kargo", "ücretsiz")
+    assert len(storage.batches) == 1
+
+
+def test_failed_write_is_retried_without_overwriting_newer_changes():
+    storage = RecordingStorage()
+    manager = _manager(storage)
+    manager.set("iade", "14 gün")
+    storage.fail_next = True
+    assert manager.flush() == 0
+
+    manager.set("iade", "30 gün")
+    assert manager.flush() == 1
+    assert storage.batches[0][0]["iade"]["response"] == "30 gün"
+
+
+def test_flusher_task_writes_in_the_background():
+    storage = RecordingStorage()
+    manager = _manager(storage)
+
+    async def scenario():
+        flusher = asyncio.create_task(manager.run_flusher(interval=0.05))
+        await asyncio.sleep(0.01)
+        manager.set("iade", "14 gün")
+        await asyncio.sleep(0.2)
+        periodic = len(storage.batches)
+        flusher.cancel()
+        try:
+            await flusher
+        except asyncio.CancelledError:
+            pass
+        return periodic
+
+    assert asyncio.run(scenario()) == 1
+    assert storage.batches[0][0]["iade"]["response"] == "14 gün"
+
+
+def test_close_drains_pending_writes_to_disk(tmp_path):
+    path = str(tmp_path / "faq_cache.db")
+    manager = persistent_cache.PersistentCacheManager(cache_file=path, write_behind=True)
+    manager.set("iade", "14 gün")
+    manager.close()
+
+    reopened = persistent_cache.PersistentCacheManager(cache_file=path, write_behind=True)
+    assert reopened.get("iade") == "14 gün"
+    reopened.close()